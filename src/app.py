@@ -4,6 +4,7 @@ from typing import Any
 
 from dash import Dash
 from dash_bootstrap_components.themes import BOOTSTRAP
+from flask import Response, request
 
 from callbacks import (
     data_callbacks,
@@ -13,7 +14,11 @@ from callbacks import (
     map_callbacks,
     page_callbacks,
 )
+from components.constants import QUERY_DATABASE, ExportSettings
 from components.layout import create_layout
+from utils.background_jobs import create_job_manager
+from utils.export import EXPORT_ROUTE, export_filename, parse_export_args, stream_export
+from utils.warmup import check_readiness, start_warm_up
 
 logging.basicConfig(
     level=logging.INFO,
@@ -41,10 +46,13 @@ def create_app() -> Dash:
             "https://cdnjs.cloudflare.com/ajax/libs/chroma-js/2.1.0/chroma.min.js"
         ],
         suppress_callback_exceptions=True,
+        background_callback_manager=create_job_manager(),
     )
     app.layout = create_layout(app)
     register_callbacks(app)
     register_health_endpoint(app)
+    register_readiness_endpoint(app)
+    register_export_endpoint(app)
 
     return app
 
@@ -67,9 +75,40 @@ def register_health_endpoint(app: Dash) -> None:
         return "OK", 200
 
 
+def register_readiness_endpoint(app: Dash) -> None:
+    @app.server.route("/ready")
+    def ready():
+        """Report whether this worker has warmed up and can query the data."""
+        is_ready, reason = check_readiness(QUERY_DATABASE)
+        return reason, 200 if is_ready else 503
+
+
+def register_export_endpoint(app: Dash) -> None:
+    @app.server.route(f"{EXPORT_ROUTE}/<export_format>")
+    def export(export_format: str):
+        """Stream the data of a filter selection as a file download."""
+        if export_format not in ExportSettings.FORMATS:
+            return f"Unknown export format: {export_format}", 404
+
+        try:
+            selected_years, query = parse_export_args(request.args)
+            chunks = stream_export(QUERY_DATABASE, query, export_format)
+        except ValueError as e:
+            return str(e), 400
+
+        mimetype, _ = ExportSettings.FORMATS[export_format]
+        filename = export_filename(selected_years, export_format)
+        return Response(
+            chunks,
+            mimetype=mimetype,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+
 def main():
     app = create_app()
     config = get_app_config()
+    start_warm_up(QUERY_DATABASE)
 
     logger.info("Starting ClimateFinanceBERT UI server...")
     logger.info(f"Debug mode: {config['debug']}")
@@ -0,0 +1,162 @@
+// Clientside callbacks of the presentation updates that only transform data
+// already in the browser. The countries layer is styled by the valuesStyle
+// handler in dashExtensions_default.js, which reads the hideout built here.
+
+function formatLegendValue(value) {
+    const formatted = value >= 1000
+        ? Math.trunc(value).toLocaleString("en-US")
+        : value.toFixed(2);
+    return "$" + formatted + " M";
+}
+
+function htmlComponent(type, props) {
+    return {
+        type: type,
+        namespace: "dash_html_components",
+        props: props
+    };
+}
+
+function continuousLegend(min, max, colorscale) {
+    const stops = colorscale.map(function(color, i) {
+        return color + " " + (i / (colorscale.length - 1)) * 100 + "%";
+    });
+    return htmlComponent("Div", {
+        children: [
+            htmlComponent("Div", {
+                children: "Color Legend:",
+                style: {fontWeight: "bold", marginBottom: "8px"}
+            }),
+            htmlComponent("Div", {
+                children: [
+                    htmlComponent("Div", {
+                        style: {
+                            height: "10px",
+                            background: "linear-gradient(to right, " + stops.join(", ") + ")",
+                            marginBottom: "5px"
+                        }
+                    }),
+                    htmlComponent("Div", {
+                        children: [
+                            htmlComponent("Span", {
+                                children: formatLegendValue(min),
+                                style: {float: "left"}
+                            }),
+                            htmlComponent("Span", {
+                                children: formatLegendValue(max),
+                                style: {float: "right"}
+                            })
+                        ]
+                    })
+                ]
+            })
+        ]
+    });
+}
+
+function classLegend(breaks, colors, prefix) {
+    if (!breaks || breaks.length < 2) {
+        return htmlComponent("Div", {});
+    }
+
+    const items = [];
+    for (let i = 0; i < breaks.length - 1; i++) {
+        const range = formatLegendValue(breaks[i]) + " - " + formatLegendValue(breaks[i + 1]);
+        items.push(htmlComponent("Div", {
+            children: [
+                htmlComponent("Span", {
+                    style: {
+                        display: "inline-block",
+                        width: "15px",
+                        height: "15px",
+                        marginRight: "5px",
+                        backgroundColor: colors[i]
+                    }
+                }),
+                htmlComponent("Span", {children: prefix + (i + 1) + ": " + range})
+            ],
+            style: {marginBottom: "2px"}
+        }));
+    }
+
+    return htmlComponent("Div", {
+        children: [
+            htmlComponent("H6", {
+                children: "Color Legend:",
+                style: {fontWeight: "bold", marginBottom: "8px"}
+            }),
+            htmlComponent("Div", {children: items})
+        ]
+    });
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    map: {
+        // Hideout of the countries layer and whether clicking a country zooms
+        // to it. During playback of a timeline the values and styling of the
+        // slider year are taken from the timeline, otherwise from the map
+        // values of the server.
+        hideout: function(mapValues, colorMode, year, timeline, playing) {
+            const noUpdate = window.dash_clientside.no_update;
+            let values;
+            let styling;
+
+            const index = playing && timeline ? timeline.years.indexOf(year) : -1;
+            if (index >= 0) {
+                const row = timeline.values[index];
+                values = {};
+                timeline.countries.forEach(function(code, column) {
+                    if (row[column] !== null) {
+                        values[code] = row[column];
+                    }
+                });
+                styling = timeline.frames[index];
+            } else if (mapValues) {
+                values = mapValues.values;
+                styling = mapValues.styling;
+            } else {
+                return [noUpdate, noUpdate];
+            }
+
+            const classification = styling.classifications[colorMode] || {
+                class_breaks: [],
+                class_colors: []
+            };
+            const hideout = {
+                values: values,
+                style: styling.style,
+                colorMode: colorMode,
+                colorscale: styling.colorscale,
+                min: styling.min,
+                max: styling.max,
+                class_breaks: classification.class_breaks,
+                class_colors: classification.class_colors
+            };
+            return [hideout, values !== null];
+        },
+
+        // Color legend of the values shown by the countries layer
+        colorLegend: function(hideout) {
+            if (!hideout || !hideout.values) {
+                return [];
+            }
+            if (hideout.colorMode === "continuous") {
+                return [continuousLegend(hideout.min, hideout.max, hideout.colorscale)];
+            }
+            const prefix = hideout.colorMode === "jenks" ? "C" : "Q";
+            return [classLegend(hideout.class_breaks, hideout.class_colors, prefix)];
+        }
+    },
+
+    visibility: {
+        // Data table of the map page, hidden in base mode
+        mapTable: function(mapMode) {
+            return {display: mapMode === "base" ? "none" : "block"};
+        },
+
+        // Data table of the download page, shown once a query was run
+        downloadTable: function(nClicks) {
+            return {display: nClicks ? "block" : "none"};
+        }
+    }
+});
@@ -1,50 +1,48 @@
 window.dashExtensions = Object.assign({}, window.dashExtensions, {
     default: {
-        function0: function(feature, context) {
+        valuesStyle: function(feature, context) {
             const {
+                values,
+                style,
+                colorMode,
                 min,
                 max,
                 colorscale,
-                style,
-                polyColoring
+                class_breaks,
+                class_colors
             } = context.hideout;
-            const value = feature.properties[polyColoring];
-            if (value === null || value === undefined) {
-                style.fillColor = "#A9A9A9";
+            if (!values) {
                 return style;
             }
-            const normalized = Math.min(Math.max((value - min) / (max - min), 0), 1);
-            const color = chroma.scale(colorscale).domain([0, 1])(normalized).hex();
-            style.fillColor = color;
-            return style;
-        },
-        function1: function(feature, context) {
-            const {
-                min,
-                max,
-                style,
-                polyColoring,
-                quartile_breaks,
-                quartile_colors
-            } = context.hideout;
-            const value = feature.properties[polyColoring];
 
+            const value = values[feature.id];
             if (value === null || value === undefined) {
-                style.fillColor = "#A9A9A9";
-                return style;
+                return Object.assign({}, style, {
+                    opacity: 0,
+                    fillOpacity: 0,
+                    interactive: false
+                });
             }
 
-            // Find which quartile the value belongs to
-            let colorIndex = 0;
-            for (let i = 1; i < quartile_breaks.length; i++) {
-                if (value <= quartile_breaks[i]) {
-                    colorIndex = i - 1;
-                    break;
+            if (colorMode !== "continuous") {
+                // Find which class the value belongs to
+                let colorIndex = 0;
+                for (let i = 1; i < class_breaks.length; i++) {
+                    if (value <= class_breaks[i]) {
+                        colorIndex = i - 1;
+                        break;
+                    }
                 }
+                return Object.assign({}, style, {
+                    fillColor: class_colors[colorIndex]
+                });
             }
 
-            style.fillColor = quartile_colors[colorIndex];
-            return style;
+            const normalized = max > min ? Math.min(Math.max((value - min) / (max - min), 0), 1) : 0.5;
+            const color = chroma.scale(colorscale).domain([0, 1])(normalized).hex();
+            return Object.assign({}, style, {
+                fillColor: color
+            });
         }
     }
 });
\ No newline at end of file
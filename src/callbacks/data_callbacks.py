@@ -3,42 +3,56 @@ import time
 
 import dash_bootstrap_components as dbc
 import pandas as pd
-from dash import Input, Output, State, dash_table, html
+import pyarrow as pa
+from dash import ClientsideFunction, Input, Output, State, html
 from dash.exceptions import PreventUpdate
 
 from components import ids
-from components.constants import CATEGORIES_DF, DUCKDB_PATH
+from components.constants import (
+    QUERY_DATABASE,
+    YEAR_RANGE,
+    ClimateCategories,
+    PrefetchSettings,
+)
+from components.paged_table import PagedTableAIO
 from components.widgets.year import PlaybackSliderAIO
-from utils.data_operations import create_mode_data, reshape_by_type
+from utils.arrow_tables import filter_equal, slice_sorted, to_arrow
+from utils.data_operations import (
+    SQL_MAP_MODES,
+    build_value_map,
+    create_mode_data,
+    query_mode_data,
+    reshape_by_type,
+)
+from utils.frame_store import frame_store
+from utils.prefetch import playback_prefetcher, upcoming_years
 from utils.query_duckdb import (
     construct_aggregated_query,
     construct_country_summary_query,
     query_duckdb,
 )
+from utils.query_generations import SupersededQueryError, query_generations
+from utils.result_cache import make_filter_key, versioned_key
+from utils.style_statistics import get_style_statistics, map_values_version
+from utils.timeline import build_timeline, query_timeline, timeline_enabled
 
 logger = logging.getLogger(__name__)
 
 
-def create_table_from_dataframe(df: pd.DataFrame) -> dash_table.DataTable:
-    """Create a formatted data table from a DataFrame.
+def create_table_from_dataframe(df: pd.DataFrame | pa.Table) -> PagedTableAIO:
+    """Create a server-side paginated data table from a DataFrame.
+
+    The data is kept in the frame store, the table only fetches the rows of
+    its current page.
 
     Args:
-        df: DataFrame containing the data to display
+        df: DataFrame or Arrow table containing the data to display
 
     Returns:
-        Formatted DataTable component
+        Paginated DataTable component
     """
-    return dash_table.DataTable(
-        data=df.to_dict("records"),
-        columns=[{"name": i, "id": i} for i in df.columns],
-        page_size=15,
-        sort_action="native",
-        style_cell={
-            "overflow": "hidden",
-            "textOverflow": "ellipsis",
-            "maxWidth": 0,
-        },
-    )
+    table = to_arrow(df)
+    return PagedTableAIO(frame_store.put(table), table.column_names)
 
 
 def build_country_data_header(country_name: str) -> list[html.H4]:
@@ -65,22 +79,292 @@ def build_flow_data_header(country_name: str) -> list[html.H4]:
     return [html.H4(f"Flow Data for {country_name}:")]
 
 
-def filter_country_data(df: pd.DataFrame, country_code: str) -> pd.DataFrame:
+def filter_country_data(
+    df: pd.DataFrame | pa.Table, country_code: str
+) -> pd.DataFrame | pa.Table:
     """Filter data for a specific country.
 
+    Arrow tables are expected to be sorted by country code, as stored by the
+    data callbacks, and are sliced without copying.
+
     Args:
-        df: DataFrame to filter
+        df: DataFrame or Arrow table to filter
         country_code: Country code to filter by
 
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame or Arrow table
 
     Raises:
         KeyError: If country_code column doesn't exist
     """
+    if isinstance(df, pa.Table):
+        if "CountryCode" not in df.column_names:
+            raise KeyError("CountryCode")
+        return slice_sorted(df, "CountryCode", country_code)
     return df[df["CountryCode"] == country_code]
 
 
+def store_by_country(df: pd.DataFrame | pa.Table, key: str | None = None) -> str:
+    """Put data into the frame store, sorted by country code.
+
+    The rows of each country are then contiguous, so that country lookups
+    can slice the stored table (see filter_country_data).
+
+    Args:
+        df: DataFrame or Arrow table with a CountryCode column
+        key: Key to store the table under, a random key if None
+
+    Returns:
+        Key of the stored table
+    """
+    return frame_store.put(to_arrow(df).sort_by("CountryCode"), key=key)
+
+
+def stored_data_key(
+    selected_type,
+    selected_year,
+    selected_donor_types,
+    selected_categories,
+    selected_subcategories,
+    selected_flow_types,
+):
+    """Derive the frame store key of the stored data of a filter selection.
+
+    Args:
+        selected_type: Either 'donors' or 'recipients'
+        selected_year: Selected year for data filtering
+        selected_donor_types: Types of donors to include
+        selected_categories: Categories to include
+        selected_subcategories: Subcategories to include
+        selected_flow_types: Types of flows to include
+
+    Returns:
+        Key that is the same for the same selection and database state
+    """
+    filter_key = make_filter_key(
+        f"stored_{selected_type}",
+        selected_year,
+        selected_categories,
+        selected_subcategories,
+        selected_donor_types,
+        selected_flow_types,
+    )
+    return versioned_key(QUERY_DATABASE, filter_key)
+
+
+def build_stored_data(
+    selected_type,
+    selected_year,
+    selected_donor_types,
+    selected_categories,
+    selected_subcategories,
+    selected_flow_types,
+):
+    """Query, reshape and store the country summary of a filter selection.
+
+    The data is stored under a key derived from the selection, so data that
+    is still stored, e.g. prefetched during playback, is reused.
+
+    Args:
+        selected_type: Either 'donors' or 'recipients'
+        selected_year: Selected year for data filtering
+        selected_donor_types: Types of donors to include
+        selected_categories: Categories to include
+        selected_subcategories: Subcategories to include
+        selected_flow_types: Types of flows to include
+
+    Returns:
+        Key of the filtered data in the frame store
+    """
+    key = stored_data_key(
+        selected_type,
+        selected_year,
+        selected_donor_types,
+        selected_categories,
+        selected_subcategories,
+        selected_flow_types,
+    )
+    if frame_store.get(key) is not None:
+        return key
+
+    # Construct and execute query based on selected filters
+    query = construct_country_summary_query(
+        selected_year=selected_year,
+        selected_categories=selected_categories,
+        selected_subcategories=selected_subcategories,
+        selected_donor_types=selected_donor_types,
+        selected_flow_types=selected_flow_types,
+    )
+
+    table_queried = query_duckdb(
+        duckdb_db=QUERY_DATABASE,
+        query=query,
+        cache_key=make_filter_key(
+            "country_summary",
+            selected_year,
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
+        ),
+        result_format="arrow",
+    )
+
+    # Reshape data based on selected view type
+    table_reshaped = reshape_by_type(table_queried, selected_type)
+
+    columns_to_keep = [
+        col
+        for col in table_reshaped.column_names
+        if col
+        in {
+            "Year",
+            "CountryCode",
+            "CountryName",
+            "USD_Disbursement",
+            "meta_category",
+            "climate_class",
+            "ClimateMitigation",
+            "ClimateAdaptation",
+            "Biodiversity",
+        }
+    ]
+    table_trimmed = table_reshaped.select(columns_to_keep)
+
+    return store_by_country(table_trimmed, key=key)
+
+
+def build_mode_data(
+    map_mode,
+    stored_data,
+    selected_type,
+    selected_year,
+    selected_donor_types,
+    selected_categories,
+    selected_subcategories,
+    selected_flow_types,
+):
+    """Compute and store the mode-specific data of the stored data.
+
+    The Rio marker modes are computed in DuckDB. If that fails, or for the
+    other modes, the data is derived from the stored base data in pandas.
+    The result is stored under a key derived from the stored data key.
+
+    Args:
+        map_mode: Selected map visualization mode
+        stored_data: Frame store key of the base data
+        selected_type: Either 'donors' or 'recipients'
+        selected_year: Selected year for data filtering
+        selected_donor_types: Types of donors to include
+        selected_categories: Selected categories
+        selected_subcategories: Selected subcategories
+        selected_flow_types: Types of flows to include
+
+    Returns:
+        Frame store key of the mode-specific data, or None for base mode
+
+    Raises:
+        PreventUpdate: If the base data has expired from the frame store
+    """
+    # Skip processing for base mode
+    if map_mode == "base":
+        return None
+
+    key = versioned_key(QUERY_DATABASE, (stored_data, map_mode))
+    if frame_store.get(key) is not None:
+        return key
+
+    df_mode = None
+    if map_mode in SQL_MAP_MODES:
+        df_mode = query_mode_data(
+            duckdb_db=QUERY_DATABASE,
+            map_mode=map_mode,
+            selected_type=selected_type,
+            selected_year=selected_year,
+            selected_categories=selected_categories,
+            selected_subcategories=selected_subcategories,
+            selected_donor_types=selected_donor_types,
+            selected_flow_types=selected_flow_types,
+            result_format="arrow",
+        )
+
+    if df_mode is None:
+        # Load the base data from the frame store and create mode-specific data
+        df = frame_store.get_frame(stored_data)
+        if df is None:
+            raise PreventUpdate
+
+        df_mode = create_mode_data(
+            df,
+            map_mode,
+            selected_categories,
+            selected_subcategories,
+        )
+
+    return store_by_country(df_mode, key=key)
+
+
+def warm_year(
+    map_mode,
+    selected_type,
+    selected_year,
+    selected_donor_types,
+    selected_categories,
+    selected_subcategories,
+    selected_flow_types,
+):
+    """Compute the stored data, mode data and style statistics of a year.
+
+    Used by the playback prefetcher, so the callbacks find the year warm.
+
+    Args:
+        map_mode: Selected map visualization mode
+        selected_type: Either 'donors' or 'recipients'
+        selected_year: Year to warm
+        selected_donor_types: Types of donors to include
+        selected_categories: Selected categories
+        selected_subcategories: Selected subcategories
+        selected_flow_types: Types of flows to include
+
+    Returns:
+        Size in bytes of the tables added to the frame store
+    """
+    filters = (
+        selected_year,
+        selected_donor_types,
+        selected_categories,
+        selected_subcategories,
+        selected_flow_types,
+    )
+    added = 0
+
+    # The tables are looked up again after building them, as the frame store
+    # may already have dropped them, e.g. when they exceed its size limit
+    stored_key = stored_data_key(selected_type, *filters)
+    if frame_store.get(stored_key) is None:
+        build_stored_data(selected_type, *filters)
+        table_stored = frame_store.get(stored_key)
+        if table_stored is None:
+            return added
+        added += table_stored.nbytes
+
+    if map_mode == "base":
+        return added
+
+    mode_key = versioned_key(QUERY_DATABASE, (stored_key, map_mode))
+    table_mode = frame_store.get(mode_key)
+    if table_mode is None:
+        build_mode_data(map_mode, stored_key, selected_type, *filters)
+        table_mode = frame_store.get(mode_key)
+        if table_mode is None:
+            return added
+        added += table_mode.nbytes
+
+    values = build_value_map(table_mode, map_mode)
+    get_style_statistics(map_values_version(mode_key, map_mode), values)
+    return added
+
+
 def register(app):
     @app.callback(
         Output(ids.STORED_DATA, "data"),
@@ -91,6 +375,11 @@ def register(app):
             Input(ids.CATEGORIES_DROPDOWN, "value"),
             Input(ids.CATEGORIES_SUB_DROPDOWN, "value"),
             Input(ids.FLOW_TYPE_DROPDOWN, "value"),
+            Input(PlaybackSliderAIO.ids.play(ids.YEAR_SLIDER), "active"),
+        ],
+        [
+            State(ids.MAP_MODE, "value"),
+            State(ids.SESSION_ID, "data"),
         ],
         prevent_initial_call=True,
     )
@@ -101,9 +390,17 @@ def register(app):
         selected_categories,
         selected_subcategories,
         selected_flow_types,
+        playing,
+        map_mode,
+        session_id,
     ):
         """Update the stored data based on user-selected filters.
 
+        When the filters of the session change again while the query runs,
+        e.g. while dragging the year slider, the query is interrupted and its
+        result dropped. While a timeline is played in the browser the data is
+        not updated; it is updated for the year playback stops at.
+
         Args:
             selected_type: Either 'donors' or 'recipients'
             selected_year: Selected year for data filtering
@@ -111,56 +408,48 @@ def register(app):
             selected_categories: Categories to include
             selected_subcategories: Subcategories to include
             selected_flow_types: Types of flows to include
+            playing: Whether playback is active
+            map_mode: Selected map visualization mode
+            session_id: Identifier of the browser session
 
         Returns:
-            List of dictionaries containing the filtered data
+            Key of the filtered data in the frame store
+
+        Raises:
+            PreventUpdate: If newer filters of the session superseded the query
+                or a timeline is being played
         """
+        if playing and timeline_enabled(map_mode):
+            raise PreventUpdate
+
         start = time.time()
         logger.info(
             f"Updating stored data for year: {selected_year}, type: {selected_type}"
         )
 
-        # Construct and execute query based on selected filters
-        query = construct_country_summary_query(
-            selected_year=selected_year,
-            selected_categories=selected_categories,
-            selected_subcategories=selected_subcategories,
-            selected_donor_types=selected_donor_types,
-            selected_flow_types=selected_flow_types,
-        )
-
-        df_queried = query_duckdb(
-            duckdb_db=DUCKDB_PATH,
-            query=query,
-        )
-
-        # Reshape data based on selected view type
-        df_reshaped = reshape_by_type(df_queried, selected_type)
-
-        columns_to_keep = [
-            col
-            for col in df_reshaped.columns
-            if col
-            in {
-                "Year",
-                "CountryCode",
-                "CountryName",
-                "USD_Disbursement",
-                "meta_category",
-                "climate_class",
-                "ClimateMitigation",
-                "ClimateAdaptation",
-                "Biodiversity",
-            }
-        ]
-        df_trimmed = df_reshaped.loc[:, columns_to_keep]
+        try:
+            stored_data = query_generations.run_latest(
+                session_id,
+                ids.STORED_DATA,
+                QUERY_DATABASE,
+                lambda: build_stored_data(
+                    selected_type,
+                    selected_year,
+                    selected_donor_types,
+                    selected_categories,
+                    selected_subcategories,
+                    selected_flow_types,
+                ),
+            )
+        except SupersededQueryError:
+            raise PreventUpdate
 
         end = time.time()
         logger.info(
             f"Execution time for updating stored data: {end - start:.2f} seconds."
         )
 
-        return df_trimmed.to_dict("records")
+        return stored_data
 
     @app.callback(
         Output(ids.MODE_DATA, "data"),
@@ -169,44 +458,223 @@ def register(app):
             Input(ids.STORED_DATA, "data"),
         ],
         [
+            State(ids.TYPE_DROPDOWN, "value"),
+            State(PlaybackSliderAIO.ids.slider(ids.YEAR_SLIDER), "value"),
+            State(ids.DONORTYPE_DROPDOWN, "value"),
             State(ids.CATEGORIES_DROPDOWN, "value"),
             State(ids.CATEGORIES_SUB_DROPDOWN, "value"),
+            State(ids.FLOW_TYPE_DROPDOWN, "value"),
+            State(PlaybackSliderAIO.ids.play(ids.YEAR_SLIDER), "active"),
+            State(ids.SESSION_ID, "data"),
         ],
         prevent_initial_call=True,
     )
     def update_mode_data(
         map_mode,
         stored_data,
+        selected_type,
+        selected_year,
+        selected_donor_types,
         selected_categories,
         selected_subcategories,
+        selected_flow_types,
+        playing,
+        session_id,
     ):
         """Update the mode-specific data based on the selected map mode.
 
+        The Rio marker modes are computed in DuckDB. If that fails, or for the
+        other modes, the data is derived from the stored base data in pandas.
+        A DuckDB query superseded by newer data of the session is interrupted
+        and its result dropped.
+
         Args:
             map_mode: Selected map visualization mode
-            stored_data: Base data from storage
+            stored_data: Frame store key of the base data
+            selected_type: Either 'donors' or 'recipients'
+            selected_year: Selected year for data filtering
+            selected_donor_types: Types of donors to include
             selected_categories: Selected categories
             selected_subcategories: Selected subcategories
+            selected_flow_types: Types of flows to include
+            playing: Whether playback is active
+            session_id: Identifier of the browser session
 
         Returns:
-            List of dictionaries with mode-specific data, or empty list for base mode
+            Frame store key of the mode-specific data, or None for base mode
+
+        Raises:
+            PreventUpdate: If the base data has expired from the frame store,
+                newer data of the session superseded the query or a timeline
+                is being played
         """
-        # Skip processing for base mode
-        if map_mode == "base":
-            return []
+        if playing and timeline_enabled(map_mode):
+            raise PreventUpdate
 
         logger.info(f"Updating mode data for map mode: {map_mode}")
 
-        # Convert stored data to DataFrame and create mode-specific data
-        df = pd.DataFrame(stored_data)
-        df_mode = create_mode_data(
-            df,
-            map_mode,
+        try:
+            return query_generations.run_latest(
+                session_id,
+                ids.MODE_DATA,
+                QUERY_DATABASE,
+                lambda: build_mode_data(
+                    map_mode,
+                    stored_data,
+                    selected_type,
+                    selected_year,
+                    selected_donor_types,
+                    selected_categories,
+                    selected_subcategories,
+                    selected_flow_types,
+                ),
+            )
+        except SupersededQueryError:
+            raise PreventUpdate
+
+    @app.callback(
+        Input(PlaybackSliderAIO.ids.play(ids.YEAR_SLIDER), "active"),
+        Input(PlaybackSliderAIO.ids.slider(ids.YEAR_SLIDER), "value"),
+        [
+            State(ids.MAP_MODE, "value"),
+            State(ids.TYPE_DROPDOWN, "value"),
+            State(ids.DONORTYPE_DROPDOWN, "value"),
+            State(ids.CATEGORIES_DROPDOWN, "value"),
+            State(ids.CATEGORIES_SUB_DROPDOWN, "value"),
+            State(ids.FLOW_TYPE_DROPDOWN, "value"),
+            State(ids.SESSION_ID, "data"),
+        ],
+        prevent_initial_call=True,
+    )
+    def prefetch_playback(
+        playing,
+        selected_year,
+        map_mode,
+        selected_type,
+        selected_donor_types,
+        selected_categories,
+        selected_subcategories,
+        selected_flow_types,
+        session_id,
+    ):
+        """Warm the upcoming years in the background while the map is played.
+
+        Stopping playback cancels the prefetching of the session. Map modes
+        played from a timeline need no prefetching.
+
+        Args:
+            playing: Whether playback is active
+            selected_year: Year currently shown
+            map_mode: Selected map visualization mode
+            selected_type: Either 'donors' or 'recipients'
+            selected_donor_types: Types of donors to include
+            selected_categories: Selected categories
+            selected_subcategories: Selected subcategories
+            selected_flow_types: Types of flows to include
+            session_id: Identifier of the browser session
+        """
+        if not playing or not session_id or timeline_enabled(map_mode):
+            playback_prefetcher.cancel(session_id)
+            return
+
+        filters = (
+            selected_donor_types,
             selected_categories,
             selected_subcategories,
+            selected_flow_types,
+        )
+        playback_prefetcher.schedule(
+            session_id,
+            repr((map_mode, selected_type, filters)),
+            upcoming_years(
+                selected_year,
+                YEAR_RANGE["min"],
+                YEAR_RANGE["max"],
+                PrefetchSettings.YEARS_AHEAD,
+            ),
+            lambda year: warm_year(map_mode, selected_type, year, *filters),
         )
 
-        return df_mode.to_dict("records")
+    @app.callback(
+        Output(ids.TIMELINE, "data"),
+        [
+            Input(PlaybackSliderAIO.ids.play(ids.YEAR_SLIDER), "active"),
+            Input(ids.MAP_MODE, "value"),
+            Input(ids.TYPE_DROPDOWN, "value"),
+            Input(ids.DONORTYPE_DROPDOWN, "value"),
+            Input(ids.CATEGORIES_DROPDOWN, "value"),
+            Input(ids.CATEGORIES_SUB_DROPDOWN, "value"),
+            Input(ids.FLOW_TYPE_DROPDOWN, "value"),
+        ],
+        State(ids.SESSION_ID, "data"),
+        prevent_initial_call=True,
+    )
+    def update_timeline(
+        playing,
+        map_mode,
+        selected_type,
+        selected_donor_types,
+        selected_categories,
+        selected_subcategories,
+        selected_flow_types,
+        session_id,
+    ):
+        """Compute the timeline of all years when playback starts.
+
+        The map values of every year are computed in one grouped query and
+        sent to the browser once, where a clientside callback shows the year
+        of the slider. Playback then needs no server round-trip per year.
+
+        Args:
+            playing: Whether playback is active
+            map_mode: Selected map visualization mode
+            selected_type: Either 'donors' or 'recipients'
+            selected_donor_types: Types of donors to include
+            selected_categories: Selected categories
+            selected_subcategories: Selected subcategories
+            selected_flow_types: Types of flows to include
+            session_id: Identifier of the browser session
+
+        Returns:
+            The timeline (see build_timeline), None if the map mode is not
+            played from a timeline
+
+        Raises:
+            PreventUpdate: If playback is not active or newer filters of the
+                session superseded the query
+        """
+        if not timeline_enabled(map_mode):
+            return None
+        if not playing:
+            raise PreventUpdate
+
+        start = time.time()
+        selected_years = (YEAR_RANGE["min"], YEAR_RANGE["max"])
+        try:
+            table = query_generations.run_latest(
+                session_id,
+                ids.TIMELINE,
+                QUERY_DATABASE,
+                lambda: query_timeline(
+                    QUERY_DATABASE,
+                    map_mode,
+                    selected_type,
+                    selected_years,
+                    selected_categories,
+                    selected_subcategories,
+                    selected_donor_types,
+                    selected_flow_types,
+                ),
+            )
+        except SupersededQueryError:
+            raise PreventUpdate
+
+        timeline = build_timeline(table, map_mode, selected_years)
+        logger.info(
+            f"Execution time for computing the timeline: {time.time() - start:.2f} "
+            "seconds."
+        )
+        return timeline
 
     @app.callback(
         Output(ids.CATEGORIES_SUB_DROPDOWN, "options"),
@@ -223,11 +691,11 @@ def register(app):
             List of available subcategory options
         """
         # Filter available meta categories based on selected climate classes
-        filtered_df = CATEGORIES_DF[
-            CATEGORIES_DF["climate_class"].isin(selected_climate_class)
-        ]
+        subcategories = ClimateCategories.get_subcategories(
+            selected_climate_class or []
+        )
 
-        return [{"label": i, "value": i} for i in filtered_df["meta_category"].unique()]
+        return [{"label": i, "value": i} for i in subcategories]
 
     @app.callback(
         Output(ids.DATATABLE, "children"),
@@ -246,7 +714,7 @@ def register(app):
 
         Args:
             click_data: Data from the clicked country on the map
-            mode_data: Current mode-specific data
+            mode_data: Frame store key of the current mode-specific data
 
         Returns:
             Data table component or message if no data available
@@ -264,18 +732,20 @@ def register(app):
             header = build_country_data_header(country_name)
 
             # Filter data for selected country
-            df_mode = pd.DataFrame(mode_data)
-            df_filtered = filter_country_data(df_mode, country_code)
+            table_mode = frame_store.get(mode_data)
+            if table_mode is None:
+                table_mode = pa.table({"CountryCode": pa.array([], pa.string())})
+            table_filtered = filter_country_data(table_mode, country_code)
 
             # Return appropriate content based on data availability
-            if df_filtered.empty:
+            if table_filtered.num_rows == 0:
                 return header + [
                     html.H4(
                         "No data available for this country for the selected filters."
                     )
                 ]
             else:
-                return header + [create_table_from_dataframe(df_filtered)]
+                return header + [create_table_from_dataframe(table_filtered)]
 
         except KeyError:
             # Handle case where country has no data
@@ -348,19 +818,20 @@ def register(app):
                 selected_flow_types=selected_flow_types,
             )
 
-            df_queried = query_duckdb(
-                duckdb_db=DUCKDB_PATH,
+            table_queried = query_duckdb(
+                duckdb_db=QUERY_DATABASE,
                 query=query,
+                result_format="arrow",
             )
 
             # Filter for selected country based on view type
-            if selected_type == "donors":
-                df_filtered = df_queried[df_queried["DEDonorcode"] == country_code]
-            else:
-                df_filtered = df_queried[df_queried["DERecipientcode"] == country_code]
+            code_column = (
+                "DEDonorcode" if selected_type == "donors" else "DERecipientcode"
+            )
+            table_filtered = filter_equal(table_queried, code_column, country_code)
 
             # Handle case with no available data
-            if df_filtered.empty:
+            if table_filtered.num_rows == 0:
                 return [
                     dbc.ModalHeader(dbc.ModalTitle(header)),
                     dbc.ModalBody(
@@ -377,7 +848,7 @@ def register(app):
             # Return complete modal content with data table
             return [
                 dbc.ModalHeader(dbc.ModalTitle(header)),
-                dbc.ModalBody(create_table_from_dataframe(df_filtered)),
+                dbc.ModalBody(create_table_from_dataframe(table_filtered)),
                 dbc.ModalFooter(),
             ]
 
@@ -389,17 +860,9 @@ def register(app):
                 dbc.ModalFooter(),
             ]
 
-    @app.callback(
+    # Hides the data table in base mode, see src/assets/clientside.js
+    app.clientside_callback(
+        ClientsideFunction(namespace="visibility", function_name="mapTable"),
         Output(ids.DATATABLE_CARD, "style"),
         Input(ids.MAP_MODE, "value"),
     )
-    def toggle_table_visibility(map_mode):
-        """Toggle visibility of the data table based on map mode.
-
-        Args:
-            map_mode: Current map visualization mode
-
-        Returns:
-            Style dictionary controlling visibility
-        """
-        return {"display": "none" if map_mode == "base" else "block"}
@@ -1,13 +1,16 @@
 import logging
-from typing import Any, Optional
+from collections.abc import Callable
 
-import pandas as pd
-from dash import Input, Output, State, callback_context, dash_table, dcc, html
-from dash.exceptions import PreventUpdate
+from dash import ClientsideFunction, Input, Output, State, html
 
 from components import ids
-from components.constants import DUCKDB_PATH
-from utils.query_duckdb import construct_query, query_duckdb
+from components.constants import QUERY_DATABASE, ExportSettings
+from components.paged_table import PagedTableAIO
+from utils.background_jobs import run_query_job
+from utils.export import build_export_url
+from utils.frame_store import frame_store
+from utils.query_duckdb import ParameterizedQuery, construct_query
+from utils.result_cache import make_filter_key
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +25,29 @@ def register(app):
 
     @app.callback(
         Output(ids.DOWNLOAD_QUERIED_DATA, "data"),
+        Input(ids.QUERY_BTN, "n_clicks"),
         [
-            Input(ids.QUERY_BTN, "n_clicks"),
+            State(ids.YEAR_SLIDER_DOWNLOAD, "value"),
+            State(ids.CATEGORIES_DROPDOWN_DOWNLOAD, "value"),
+            State(ids.CATEGORIES_SUB_DROPDOWN_DOWNLOAD, "value"),
+            State(ids.DONORTYPE_DROPDOWN_DOWNLOAD, "value"),
+            State(ids.FLOW_TYPE_DROPDOWN_DOWNLOAD, "value"),
+        ],
+        background=True,
+        progress=[
+            Output(ids.DOWNLOAD_PROGRESS, "value"),
+            Output(ids.DOWNLOAD_PROGRESS, "label"),
+        ],
+        progress_default=[0, ""],
+        running=[
+            (Output(ids.QUERY_BTN, "disabled"), True, False),
+            (
+                Output(ids.DOWNLOAD_PROGRESS_CONTAINER, "style"),
+                {"display": "flex"},
+                {"display": "none"},
+            ),
+        ],
+        cancel=[
             Input(ids.YEAR_SLIDER_DOWNLOAD, "value"),
             Input(ids.CATEGORIES_DROPDOWN_DOWNLOAD, "value"),
             Input(ids.CATEGORIES_SUB_DROPDOWN_DOWNLOAD, "value"),
@@ -33,17 +57,26 @@ def register(app):
         prevent_initial_call=True,
     )
     def pull_data(
+        set_progress: Callable[[tuple[float, str]], None],
         n_clicks: int,
         selected_years: list[int],
         selected_categories: list[str],
         selected_subcategories: list[str],
         selected_donor_types: list[str],
         selected_flow_types: list[str],
-    ) -> list[dict[str, Any]]:
+    ) -> str:
         """
-        Pull data from the database based on user-selected filters.
+        Pull a preview of the data from the database based on user-selected filters.
+
+        The query runs as background job in a separate process, which reports
+        its progress and is cancelled when the filters change. Only the first
+        ExportSettings.PREVIEW_ROWS rows are stored, the full result is
+        streamed by the export endpoint. The preview stays in the server-side
+        frame store and is paged by the preview table; a repeated query with
+        the same filters reuses the stored preview.
 
         Args:
+            set_progress: Reports the progress of the job to the progress bar
             n_clicks: Number of times the query button was clicked
             selected_years: Range of years selected by the user
             selected_categories: list of climate categories selected by the user
@@ -52,17 +85,11 @@ def register(app):
             selected_flow_types: list of flow types selected by the user
 
         Returns:
-            list of dictionaries representing table records
-
-        Raises:
-            PreventUpdate: If the callback wasn't triggered by clicking the query button
+            Key of the preview in the frame store
         """
-        if not _is_query_button_clicked():
-            raise PreventUpdate
-
         logger.info("Query Button clicked: Pulling data")
 
-        # Construct and execute query
+        # Construct the query and run it with progress reports
         query = _build_query(
             selected_years,
             selected_categories,
@@ -70,10 +97,22 @@ def register(app):
             selected_donor_types,
             selected_flow_types,
         )
+        filter_key = make_filter_key(
+            f"download_preview_{ExportSettings.PREVIEW_ROWS}",
+            selected_years,
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
+        )
 
-        queried_df = _execute_query(query)
-
-        return queried_df.to_dict("records")
+        return run_query_job(
+            QUERY_DATABASE,
+            query.limit(ExportSettings.PREVIEW_ROWS),
+            filter_key,
+            lambda progress: set_progress((progress, f"{progress:.0f} %")),
+            drop_columns=["labelled_bilateral"],
+        )
 
     @app.callback(
         Output(ids.DOWNLOAD_DATATABLE, "children"),
@@ -81,93 +120,86 @@ def register(app):
         prevent_initial_call=True,
     )
     def build_download_datatable(
-        queried_data: Optional[list[dict[str, Any]]] = None,
-    ) -> html.H3 | list[dash_table.DataTable]:
+        queried_data: str | None = None,
+    ) -> html.H3 | list[html.P | PagedTableAIO]:
         """
         Build a data table display from the queried data.
 
         Args:
-            queried_data: The data to display in the table, as a list of dict records
+            queried_data: Frame store key of the data to display in the table
 
         Returns:
-            Either an error message if no data is available, or a DataTable component
+            Either an error message if no data is available, or a paginated
+            DataTable component with a note if the preview is truncated
         """
-        df_table = pd.DataFrame(queried_data).drop(
-            columns=["labelled_bilateral"],
-            errors="ignore",
-        )
+        table = frame_store.get(queried_data)
 
-        if len(df_table) == 0:
+        if table is None or table.num_rows == 0:
             return html.H3("No data available for the selected filters.")
 
-        return [_create_data_table(df_table)]
+        children = [PagedTableAIO(queried_data, table.schema.names)]
+        if table.num_rows >= ExportSettings.PREVIEW_ROWS:
+            children.insert(
+                0,
+                html.P(
+                    f"Showing the first {ExportSettings.PREVIEW_ROWS:,} rows. "
+                    "The download contains all rows.",
+                    className="text-muted m-2",
+                ),
+            )
+        return children
 
     @app.callback(
-        Output(ids.DOWNLOAD_TRIGGER, "data"),
-        [Input(ids.DOWNLOAD_BTN, "n_clicks")],
+        Output(ids.DOWNLOAD_BTN, "href"),
         [
-            State(ids.DOWNLOAD_QUERIED_DATA, "data"),
-            State(ids.YEAR_SLIDER_DOWNLOAD, "value"),
+            Input(ids.EXPORT_FORMAT, "value"),
+            Input(ids.YEAR_SLIDER_DOWNLOAD, "value"),
+            Input(ids.CATEGORIES_DROPDOWN_DOWNLOAD, "value"),
+            Input(ids.CATEGORIES_SUB_DROPDOWN_DOWNLOAD, "value"),
+            Input(ids.DONORTYPE_DROPDOWN_DOWNLOAD, "value"),
+            Input(ids.FLOW_TYPE_DROPDOWN_DOWNLOAD, "value"),
         ],
-        prevent_initial_call=True,
     )
-    def download_csv(
-        n_clicks: int,
-        queried_data: Optional[list[dict[str, Any]]],
+    def update_export_link(
+        export_format: str,
         selected_years: list[int],
-    ) -> dcc.send_data_frame:
+        selected_categories: list[str],
+        selected_subcategories: list[str],
+        selected_donor_types: list[str],
+        selected_flow_types: list[str],
+    ) -> str:
         """
-        Create a CSV download of the queried data.
+        Point the download button to the streaming export of the selected data.
+
+        The export endpoint runs the query and streams the result to the
+        browser, so the full dataset never passes through a callback.
 
         Args:
-            n_clicks: Number of times the download button was clicked
-            queried_data: The data to be downloaded as CSV
-            selected_years: The year range for the filename
+            export_format: Selected export format
+            selected_years: Range of years selected by the user
+            selected_categories: list of climate categories selected by the user
+            selected_subcategories: list of subcategories selected by the user
+            selected_donor_types: list of donor types selected by the user
+            selected_flow_types: list of flow types selected by the user
 
         Returns:
-            A send_data_frame object that triggers a file download
-
-        Raises:
-            PreventUpdate: If the download button wasn't clicked or no data is available
+            URL of the export endpoint
         """
-        if not n_clicks or not queried_data:
-            raise PreventUpdate
-
-        logger.info("downloading queried data as CSV")
-        filename = _generate_filename(selected_years)
-
-        return dcc.send_data_frame(
-            pd.DataFrame(queried_data).to_csv,
-            filename,
-            index=False,
+        return build_export_url(
+            export_format,
+            selected_years,
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
         )
 
-    @app.callback(
+    # Shows the data table once a query was run, see src/assets/clientside.js
+    app.clientside_callback(
+        ClientsideFunction(namespace="visibility", function_name="downloadTable"),
         Output(ids.DATATABLE_CARD_DOWNLOAD, "style"),
         Input(ids.QUERY_BTN, "n_clicks"),
     )
-    def toggle_download_table_visibility(queried: int) -> dict[str, str]:
-        """
-        Toggle the visibility of the data table based on whether a query has been executed.
-
-        Args:
-            queried: Number of times the query button was clicked
-
-        Returns:
-            CSS style dictionary controlling the display property
-        """
-        return {"display": "none"} if not queried else {"display": "block"}
-
-
-def _is_query_button_clicked() -> bool:
-    """
-    Check if the callback was triggered by clicking the query button.
-
-    Returns:
-        True if the query button was clicked, False otherwise
-    """
-    ctx = callback_context
-    return ctx.triggered and ctx.triggered[0]["prop_id"].split(".")[0] == ids.QUERY_BTN
 
 
 def _build_query(
@@ -176,7 +208,7 @@ def _build_query(
     selected_subcategories: list[str],
     selected_donor_types: list[str],
     selected_flow_types: list[str],
-) -> str:
+) -> ParameterizedQuery:
     """
     Build a database query based on the selected filters.
 
@@ -188,7 +220,7 @@ def _build_query(
         selected_flow_types: list of flow types selected by the user
 
     Returns:
-        SQL query string for the DuckDB database
+        Parameterized SQL query for the DuckDB database
     """
     return construct_query(
         year_type="timespan",
@@ -198,55 +230,3 @@ def _build_query(
         selected_donor_types=selected_donor_types,
         selected_flow_types=selected_flow_types,
     )
-
-
-def _execute_query(query: str) -> pd.DataFrame:
-    """
-    Execute a query against the DuckDB database.
-
-    Args:
-        query: SQL query string
-
-    Returns:
-        DataFrame containing the query results
-    """
-    return query_duckdb(
-        duckdb_db=DUCKDB_PATH,
-        query=query,
-    )
-
-
-def _create_data_table(df: pd.DataFrame) -> dash_table.DataTable:
-    """
-    Create a Dash DataTable component from a DataFrame.
-
-    Args:
-        df: DataFrame with the data to display
-
-    Returns:
-        A configured DataTable component
-    """
-    return dash_table.DataTable(
-        data=df.to_dict("records"),
-        columns=[{"name": i, "id": i} for i in df.columns],
-        page_size=15,
-        sort_action="native",
-        style_cell={
-            "overflow": "hidden",
-            "textOverflow": "ellipsis",
-            "maxWidth": 0,
-        },
-    )
-
-
-def _generate_filename(selected_years: list[int]) -> str:
-    """
-    Generate a filename for the CSV download based on the selected years.
-
-    Args:
-        selected_years: The year range to include in the filename
-
-    Returns:
-        A formatted filename string
-    """
-    return f"ClimFinBERT_data_{selected_years[0]}-{selected_years[1]}.csv"
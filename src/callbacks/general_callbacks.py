@@ -1,9 +1,23 @@
+import uuid
+
 from dash import Input, Output, State
+from dash.exceptions import PreventUpdate
 
 from components import ids
 
 
 def register(app):
+    @app.callback(
+        Output(ids.SESSION_ID, "data"),
+        Input(ids.URL, "pathname"),
+        State(ids.SESSION_ID, "data"),
+    )
+    def assign_session_id(pathname, session_id):
+        """Give each browser tab an identifier to track its running queries."""
+        if session_id:
+            raise PreventUpdate
+        return uuid.uuid4().hex
+
     @app.callback(
         Output("offcanvas", "is_open"),
         Input(ids.OPEN_FILTERS, "n_clicks"),
@@ -1,36 +1,27 @@
 import logging
 import time
-from typing import Any, Optional, Tuple
+from typing import Optional, Tuple
 
 import dash_bootstrap_components as dbc
-import pandas as pd
-import pycountry
 from dash import Input, Output, State, html
-from flag import flag
 
 from components import ids
 from components.widgets.year import PlaybackSliderAIO
-from utils.data_operations import aggregate
+from utils.country_metadata import get_country_metadata
+from utils.country_summary import get_country_summaries
+from utils.timeline import timeline_enabled, timeline_value
 
 logger = logging.getLogger(__name__)
 
 
 def iso_to_alpha2(iso_alpha3: str) -> str:
-    """Convert ISO Alpha-3 code to Alpha-2 code."""
-    try:
-        country = pycountry.countries.get(alpha_3=iso_alpha3)
-        return country.alpha_2 if country else iso_alpha3
-    except KeyError:
-        return iso_alpha3
+    """Convert ISO Alpha-3 code to Alpha-2 code, keeping codes without one."""
+    return get_country_metadata(iso_alpha3).alpha_2 or iso_alpha3
 
 
 def get_country_flag(iso_code: str) -> str:
-    """Return the flag emoji for the given ISO code."""
-    iso_alpha2 = iso_to_alpha2(iso_code)
-    try:
-        return flag(iso_alpha2)
-    except KeyError:
-        return "🏳️"
+    """Return the flag emoji for the given ISO code from the country metadata."""
+    return get_country_metadata(iso_code).flag
 
 
 def register(app):
@@ -52,6 +43,8 @@ def register(app):
         [
             State(ids.STORED_DATA, "data"),
             State(ids.MODE_DATA, "data"),
+            State(PlaybackSliderAIO.ids.play(ids.YEAR_SLIDER), "active"),
+            State(ids.TIMELINE, "data"),
         ],
         prevent_initial_call=True,
     )
@@ -60,19 +53,28 @@ def register(app):
         hover_data: Optional[dict],
         click_data: Optional[dict],
         selected_year: int,
-        stored_data: list[dict[str, Any]],
-        mode_data: list[dict[str, Any]],
+        stored_data: str | None,
+        mode_data: str | None,
+        playing: bool | None,
+        timeline: dict | None,
     ) -> list[html.H5 | html.Div | html.P | html.Hr | html.Br]:
         """
         Build the infobox for the selected country with climate finance data.
 
+        The values of the country are looked up in a per-country index that
+        is built once per version of the stored and mode data. While a
+        timeline is played the stored data is not updated, so the map value
+        of the played year is taken from the timeline instead.
+
         Args:
             map_mode: The current map visualization mode
             hover_data: Data from hovering over a country
             click_data: Data from clicking on a country
             selected_year: The selected year for data filtering
-            stored_data: Stored climate finance data
-            mode_data: Mode-specific data for the current map mode
+            stored_data: Frame store key of the climate finance data
+            mode_data: Frame store key of the data for the current map mode
+            playing: Whether the years are being played
+            timeline: Timeline played in the browser (see build_timeline)
 
         Returns:
             A list of HTML components forming the infobox
@@ -88,27 +90,32 @@ def register(app):
         country_flag = get_country_flag(country_id)
         header = _create_country_header(country_flag, country_name)
 
-        try:
-            # Process data for the selected country
-            total_value, category_values = _process_country_data(
-                country_id, mode_data, stored_data
+        if playing and timeline and timeline_enabled(map_mode):
+            _log_execution_time(start)
+            return _build_playing_infobox(
+                header,
+                country_id,
+                timeline_value(timeline, selected_year, country_id),
+                selected_year,
             )
 
-            # Build the complete infobox with all components
-            infobox_components = _build_country_infobox(
-                header, country_id, category_values, total_value, selected_year
-            )
+        # Look up the country in the index of the current data
+        summary = get_country_summaries(stored_data, mode_data).get(country_id)
+        if summary is None:
+            _log_execution_time(start)
+            return _create_no_data_infobox(header, country_id)
 
-            # Add inspection button for non-base map modes if country was clicked
-            if map_mode != "base" and click_data:
-                infobox_components.extend([_create_inspect_button()])
+        # Build the complete infobox with all components
+        infobox_components = _build_country_infobox(
+            header, country_id, summary, summary["total"], selected_year
+        )
 
-            _log_execution_time(start)
-            return infobox_components
+        # Add inspection button for non-base map modes if country was clicked
+        if map_mode != "base" and click_data:
+            infobox_components.extend([_create_inspect_button()])
 
-        except (IndexError, KeyError):
-            _log_execution_time(start)
-            return _create_no_data_infobox(header, country_id)
+        _log_execution_time(start)
+        return infobox_components
 
     @app.callback(
         Output(ids.CURRENT_FILTERS, "children"),
@@ -210,62 +217,6 @@ def _create_country_header(country_flag: str, country_name: str) -> list[html.H5
     return [html.H5(f"{country_flag} {country_name}", className="infobox-header")]
 
 
-def _process_country_data(
-    country_id: str, mode_data: list[dict[str, Any]], stored_data: list[dict[str, Any]]
-) -> Tuple[float, dict[str, float]]:
-    """
-    Process data for the selected country and calculate values.
-
-    Args:
-        country_id: The ISO code of the country
-        mode_data: Mode-specific data
-        stored_data: Climate finance data
-
-    Returns:
-        A tuple containing the total value and category values
-    """
-    # Calculate total value
-    df_mode = pd.DataFrame(mode_data)
-    df_subset = df_mode[df_mode["CountryCode"] == country_id]
-    df_aggregated = aggregate(df_subset)
-    total_value = round(df_aggregated["USD_Disbursement"].iloc[0], 2)
-
-    # Extract category values
-    df_data = pd.DataFrame(stored_data)
-
-    adaptation_value = round(
-        df_data[
-            (df_data["meta_category"] == "Adaptation")
-            & (df_data["CountryCode"] == country_id)
-        ]["USD_Disbursement"].sum(),
-        2,
-    )
-
-    environment_value = round(
-        df_data[
-            (df_data["meta_category"] == "Environment")
-            & (df_data["CountryCode"] == country_id)
-        ]["USD_Disbursement"].sum(),
-        2,
-    )
-
-    mitigation_value = round(
-        df_data[
-            (df_data["meta_category"] == "Mitigation")
-            & (df_data["CountryCode"] == country_id)
-        ]["USD_Disbursement"].sum(),
-        2,
-    )
-
-    category_values = {
-        "adaptation": adaptation_value,
-        "environment": environment_value,
-        "mitigation": mitigation_value,
-    }
-
-    return total_value, category_values
-
-
 def _build_country_infobox(
     header: list[html.H5],
     country_id: str,
@@ -304,6 +255,36 @@ def _build_country_infobox(
     ]
 
 
+def _build_playing_infobox(
+    header: list[html.H5],
+    country_id: str,
+    value: float | None,
+    selected_year: int,
+) -> list[html.H5 | html.P | html.Hr | html.Br]:
+    """
+    Build the infobox for a country while the years are being played.
+
+    Args:
+        header: The country header component
+        country_id: The ISO code of the country
+        value: The map value of the country in the played year, None if the
+            country has no data in that year
+        selected_year: The played year
+
+    Returns:
+        A list of HTML components forming the infobox
+    """
+    value_text = "No data" if value is None else f"${round(value, 2)} Mio USD"
+    return header + [
+        html.Br(),
+        html.P(f"🆔 IsoCode: {country_id}"),
+        html.Hr(),
+        html.P(["🗺️ Map value: ", html.B(value_text)], className="infobox-total"),
+        html.P(f"📅 Year: {selected_year}"),
+        html.P("▶️ Playing, pause for the values per category."),
+    ]
+
+
 def _create_inspect_button() -> html.Div:
     """
     Create the button for inspecting individual flows.
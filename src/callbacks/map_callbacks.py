@@ -1,70 +1,19 @@
 import logging
 
-import dash_leaflet as dl
-import pandas as pd
-from dash import Input, Output, State, dash
-from dash_extensions.javascript import arrow_function
+from dash import ClientsideFunction, Input, Output, State, dash
+from dash.exceptions import PreventUpdate
 
-from components import color_legend, constants, ids
-from utils.data_operations import merge_data
-from utils.map_styler import style_map
+from components import constants, ids
+from components.map import get_countries_url
+from components.widgets.year import PlaybackSliderAIO
+from utils.data_operations import build_value_map
+from utils.frame_store import frame_store
+from utils.map_styler import build_map_styling
+from utils.style_statistics import get_style_statistics, map_values_version
 
 logger = logging.getLogger(__name__)
 
 
-def create_base_map_layers(style_info: dict) -> list:
-    url = "https://cartodb-basemaps-a.global.ssl.fastly.net/light_all/{z}/{x}/{y}.png"
-    attribution = '&copy; <a href="https://carto.com/">CartoDB</a> contributors'
-
-    return [
-        dl.TileLayer(url=url, attribution=attribution),
-        dl.GeoJSON(
-            url=constants.GEOJSON_URL,
-            id=ids.COUNTRIES_LAYER,
-            style=style_info["style"],
-            hoverStyle=arrow_function(dict(weight=4, color="#666", dashArray="")),
-        ),
-    ]
-
-
-def create_data_map_layers(
-    stored_geojson: dict, style_info: dict, color_mode: str
-) -> list:
-    url = "https://cartodb-basemaps-a.global.ssl.fastly.net/light_all/{z}/{x}/{y}.png"
-    attribution = '&copy; <a href="https://carto.com/">CartoDB</a> contributors'
-
-    # Create the base hideout dictionary
-    hideout_dict = dict(
-        polyColoring="value",
-        style=style_info["style"],
-        colorscale=style_info["colorscale"],
-        min=style_info["min"],
-        max=style_info["max"],
-    )
-
-    # Add quartile data if needed
-    if color_mode == "quartile":
-        hideout_dict.update(
-            {
-                "quartile_breaks": style_info["quartile_breaks"],
-                "quartile_colors": style_info["quartile_colors"],
-            }
-        )
-
-    return [
-        dl.TileLayer(url=url, attribution=attribution),
-        dl.GeoJSON(
-            id=ids.COUNTRIES_LAYER,
-            data=stored_geojson,
-            style=style_info["style_handle"],
-            hoverStyle=arrow_function(dict(weight=4, color="#666", dashArray="")),
-            hideout=hideout_dict,
-            zoomToBoundsOnClick=True,
-            interactive=True,
-        ),
-    ]
-
-
 def register(app):
     @app.callback(
         [
@@ -91,83 +40,97 @@ def register(app):
             return dash.no_update, dash.no_update
 
     @app.callback(
-        Output(ids.STORED_GEOJSON, "data"),
         [
-            Input(ids.MODE_DATA, "data"),
-            Input(ids.MAP_MODE, "value"),
+            Output(ids.GEOJSON_LEVEL, "data"),
+            Output(ids.COUNTRIES_LAYER, "url"),
         ],
+        Input(ids.MAP, "zoom"),
+        State(ids.GEOJSON_LEVEL, "data"),
         prevent_initial_call=True,
     )
-    def update_stored_geojson(mode_data, map_mode):
-        """Update the stored GeoJSON data based on the current mode data.
+    def update_geojson_level(zoom, current_level):
+        """Switch to the smallest country geometry adequate for the zoom level.
 
         Args:
-            mode_data: Data for the current map mode
-            map_mode: Current map visualization mode
+            zoom: Current zoom level of the map
+            current_level: Simplification level currently in use
 
         Returns:
-            Updated GeoJSON data
+            Tuple of (simplification level, URL of its country geometry)
+
+        Raises:
+            PreventUpdate: If the level does not change
         """
+        level = constants.GeoJSONSettings.get_level(zoom)
+        if level == current_level:
+            raise PreventUpdate
 
-        logger.info(f"Updating stored GeoJSON data for map mode: {map_mode}")
-        df_mode = pd.DataFrame(mode_data)
-        geojson_base = constants.get_geojson_base()
-        return merge_data(df_mode, geojson_base, map_mode)
+        logger.info(f"Switching country geometry to level {level} at zoom {zoom}")
+        return level, get_countries_url(level)
 
     @app.callback(
-        Output(ids.MAP, "children"),
+        Output(ids.MAP_VALUES, "data"),
         [
-            Input(ids.STORED_GEOJSON, "data"),
+            Input(ids.MODE_DATA, "data"),
             Input(ids.MAP_MODE, "value"),
-            Input(ids.COLOR_MODE, "value"),
         ],
         prevent_initial_call=True,
     )
-    def update_map(stored_geojson, map_mode_value, color_mode):
-        """Update the map visualization based on current data and settings.
+    def update_map_values(mode_data, map_mode):
+        """Update the values shown on the map based on the current mode data.
+
+        Only a compact {iso3: value} mapping is sent to the browser, the
+        country geometry stays loaded in the countries layer. The values come
+        with their styling for every color mode, computed from statistics
+        memoised per version of the mode data; the browser then applies the
+        selected color mode and renders the legend without a server round-trip.
 
         Args:
-            stored_geojson: GeoJSON data with values to visualize
-            map_mode_value: Current map visualization mode
-            color_mode: Color mode (continuous or quartile)
+            mode_data: Frame store key of the data for the current map mode
+            map_mode: Current map visualization mode
 
         Returns:
-            List of map layers
+            Dictionary with the mapping of country codes to map values, None
+            for base mode, and their styling (see build_map_styling)
+
+        Raises:
+            PreventUpdate: If the mode data is not available in the frame store
         """
-        logger.info(
-            f"Updating map with mode: {map_mode_value}, color mode: {color_mode}"
-        )
-        style_info = style_map(map_mode_value, color_mode, stored_geojson)
+        if map_mode == "base":
+            return {"values": None, "styling": build_map_styling(map_mode)}
 
-        if map_mode_value == "base":
-            return create_base_map_layers(style_info)
-        else:
-            return create_data_map_layers(stored_geojson, style_info, color_mode)
+        logger.info(f"Updating map values for map mode: {map_mode}")
+        table_mode = frame_store.get(mode_data)
+        if table_mode is None:
+            raise PreventUpdate
 
-    @app.callback(
-        Output(ids.COLOR_LEGEND_CONTAINER, "children"),
+        values = build_value_map(table_mode, map_mode)
+        statistics = get_style_statistics(
+            map_values_version(mode_data, map_mode), values
+        )
+        return {"values": values, "styling": build_map_styling(map_mode, statistics)}
+
+    # The presentation callbacks below run in the browser, see
+    # src/assets/clientside.js
+    app.clientside_callback(
+        ClientsideFunction(namespace="map", function_name="hideout"),
         [
-            Input(ids.STORED_GEOJSON, "data"),
-            Input(ids.MAP_MODE, "value"),
+            Output(ids.COUNTRIES_LAYER, "hideout"),
+            Output(ids.COUNTRIES_LAYER, "zoomToBoundsOnClick"),
+        ],
+        [
+            Input(ids.MAP_VALUES, "data"),
             Input(ids.COLOR_MODE, "value"),
+            Input(PlaybackSliderAIO.ids.slider(ids.YEAR_SLIDER), "value"),
+            Input(ids.TIMELINE, "data"),
         ],
+        State(PlaybackSliderAIO.ids.play(ids.YEAR_SLIDER), "active"),
         prevent_initial_call=True,
     )
-    def update_color_legend(stored_geojson, map_mode_value, color_mode):
-        """Update the color legend based on current map data and settings.
-
-        Args:
-            stored_geojson: GeoJSON data with values to visualize
-            map_mode_value: Current map visualization mode
-            color_mode: Color mode (continuous or quartile)
-
-        Returns:
-            Color legend component or empty list
-        """
-        if map_mode_value == "base":
-            return []
 
-        style_info = style_map(map_mode_value, color_mode, stored_geojson)
-        legend = color_legend.render(map_mode_value, color_mode, style_info)
-
-        return [legend] if legend else []
+    app.clientside_callback(
+        ClientsideFunction(namespace="map", function_name="colorLegend"),
+        Output(ids.COLOR_LEGEND_CONTAINER, "children"),
+        Input(ids.COUNTRIES_LAYER, "hideout"),
+        prevent_initial_call=True,
+    )
@@ -8,10 +8,10 @@ This module contains various configuration constants organized by category:
 - Category definitions for climate finance
 """
 
-from typing import Any, Dict, Optional
-
-import pandas as pd
-import requests
+import json
+import os
+import tempfile
+from typing import Any, ClassVar
 
 # ====================================
 # Data Sources Configuration
@@ -26,6 +26,7 @@ class DataSources:
 
         RAW_SOURCE = "./data/all_crs_labelled.csv"
         PARQUET_SOURCE = "./data/ClimFinBERT_DB.parquet"
+        PARQUET_DATASET = "./data/ClimFinBERT_DB"
         DUCKDB_PATH = "./data/ClimFinBERT_DB.duckdb"
 
     class Development:
@@ -33,6 +34,7 @@ class DataSources:
 
         RAW_SOURCE = "./data/sampled_df.csv"
         PARQUET_SOURCE = "./data/sampled_df.parquet"
+        PARQUET_DATASET = "./data/sampled_df"
         DUCKDB_PATH = "./data/db_small.duckdb"
 
 
@@ -42,30 +44,254 @@ class DataSources:
 # RAW_SOURCE = DataSources.Development.RAW_SOURCE
 RAW_SOURCE = DataSources.Production.RAW_SOURCE
 PARQUET_SOURCE = DataSources.Production.PARQUET_SOURCE
+PARQUET_DATASET = DataSources.Production.PARQUET_DATASET
 DUCKDB_PATH = DataSources.Production.DUCKDB_PATH
 
+# Backend the app queries: "duckdb" for the database file, "parquet" for the
+# partitioned Parquet dataset, which needs no .duckdb file
+DATA_BACKEND = os.getenv("DATA_BACKEND", "duckdb")
+QUERY_DATABASE = PARQUET_DATASET if DATA_BACKEND == "parquet" else DUCKDB_PATH
+
+
+class ParquetDatasetSettings:
+    """Layout of the Hive-partitioned Parquet dataset"""
+
+    # Columns the dataset is partitioned by, one directory level each
+    PARTITION_BY = tuple(os.getenv("PARQUET_PARTITION_BY", "Year").split(","))
+
+    # Columns the rows of each partition are sorted by, so that the min/max
+    # statistics of the row groups allow skipping them for country filters
+    SORT_BY = ("DEDonorcode", "DERecipientcode")
+
+    # Rows per Parquet row group
+    ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "122880"))
+
+
+# ====================================
+# DuckDB Connection Settings
+# ====================================
+
+
+class DuckDBSettings:
+    """Settings for the shared read-only DuckDB connection of each worker"""
+
+    # Number of threads DuckDB may use for a single query
+    THREADS = int(os.getenv("DUCKDB_THREADS", "4"))
+
+    # Upper bound for the DuckDB buffer pool of a worker process
+    MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "2GB")
+
+    # Seconds between liveness checks of the shared connection
+    HEALTH_CHECK_INTERVAL = int(os.getenv("DUCKDB_HEALTH_CHECK_INTERVAL", "60"))
+
+
+class CacheSettings:
+    """Settings for the in-process query result cache and frame store"""
+
+    # Memory budget of the result cache per worker process
+    RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "256")) * 1024**2
+
+    # Seconds a server-side frame stays available to the callbacks
+    FRAME_STORE_TTL = int(os.getenv("FRAME_STORE_TTL", "3600"))
+
+    # Memory budget of the server-side frame store per worker process
+    FRAME_STORE_MAX_BYTES = int(os.getenv("FRAME_STORE_MAX_MB", "512")) * 1024**2
+
+    # Directory receiving frames that do not fit into memory, and all frames
+    # if they are shared
+    FRAME_STORE_SPILL_DIR = os.getenv(
+        "FRAME_STORE_SPILL_DIR",
+        os.path.join(tempfile.gettempdir(), "climatefinancebert_frames"),
+    )
+
+    # Whether every frame is also written to the spill directory, so that the
+    # other worker processes of the server can read it by its key
+    FRAME_STORE_SHARED = os.getenv("FRAME_STORE_SHARED", "true").lower() == "true"
+
+
+class JobSettings:
+    """Settings for the background jobs running long download queries"""
+
+    # Directory of the on-disk job store shared by all worker processes
+    DIRECTORY = os.getenv(
+        "JOB_STORE_DIR",
+        os.path.join(tempfile.gettempdir(), "climatefinancebert_jobs"),
+    )
+
+    # Seconds between two progress reports of a running query
+    PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "0.5"))
+
+
+class PrefetchSettings:
+    """Settings for warming the upcoming years during map playback"""
+
+    # Number of years ahead of the current playback year that are prefetched
+    YEARS_AHEAD = int(os.getenv("PREFETCH_YEARS", "3"))
+
+    # Size of the results a single prefetch run may add to the frame store
+    MAX_BYTES = int(os.getenv("PREFETCH_MAX_MB", "64")) * 1024**2
+
+    # Prefetch runs executed at the same time per worker process
+    MAX_RUNS = int(os.getenv("PREFETCH_MAX_RUNS", "4"))
+
+
+class TimelineSettings:
+    """Settings for playing the map from a timeline computed once"""
+
+    # Whether playback is driven in the browser from a year x country matrix
+    ENABLED = os.getenv("TIMELINE_MODE", "true").lower() == "true"
+
+
+class TableSettings:
+    """Settings for the server-side paginated data tables"""
+
+    # Rows per table page
+    PAGE_SIZE = 15
+
+    # Row offset from which pages are fetched by keyset pagination
+    KEYSET_MIN_OFFSET = int(os.getenv("TABLE_KEYSET_MIN_OFFSET", "1000"))
+
+    # Number of table/filter/sort combinations whose page anchors are kept
+    MAX_ANCHOR_ENTRIES = 256
+
+
+class ExportSettings:
+    """Settings for the streaming data export of the download page"""
+
+    # Rows of the query result shown in the server-side paged preview table
+    PREVIEW_ROWS = int(os.getenv("EXPORT_PREVIEW_ROWS", "100000"))
+
+    # Rows per Arrow record batch streamed to the client
+    BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "100000"))
+
+    # Export formats: (mimetype, file extension)
+    FORMATS: ClassVar[dict[str, tuple[str, str]]] = {
+        "csv": ("text/csv", "csv"),
+        "csv.gz": ("application/gzip", "csv.gz"),
+        "parquet": ("application/vnd.apache.parquet", "parquet"),
+    }
+
+
+class ServerSettings:
+    """Settings for the production WSGI server (see gunicorn.conf.py)"""
+
+    # Address the server listens on
+    BIND = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8050')}"
+
+    # Worker processes forked from the preloaded application
+    WORKERS = int(os.getenv("WEB_WORKERS", str(min((os.cpu_count() or 1) + 1, 4))))
+
+    # Request threads per worker, so a slow query only occupies one of them
+    THREADS = int(os.getenv("WEB_THREADS", "4"))
+
+    # Seconds a request may take before its worker is restarted
+    TIMEOUT = int(os.getenv("WEB_TIMEOUT", "120"))
+
+    # Seconds workers get to finish their requests on reload or shutdown
+    GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+
+    # Seconds an idle keep-alive connection is held open
+    KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+    # Requests after which a worker is replaced, 0 to keep workers forever
+    MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "1000"))
+    MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "100"))
+
+
+class StartupSettings:
+    """Settings for the startup time budget of the server"""
+
+    # Whether the warm-up runs in a background thread of every worker instead
+    # of blocking startup; workers report not ready until it has finished
+    BACKGROUND_WARMUP = os.getenv("BACKGROUND_WARMUP", "false").lower() == "true"
+
+
 # ====================================
 # GeoJSON Configuration
 # ====================================
 
-# URL to the GeoJSON file
+# URL of the full-resolution GeoJSON the simplified levels are built from,
+# also loaded in place of levels that have not been built
 GEOJSON_URL = (
     "https://raw.githubusercontent.com/johan/world.geo.json/master/countries.geo.json"
 )
 
-# For backward compatibility, but consider migrating to get_geojson_base()
-GEOJSON_BASE = requests.get(GEOJSON_URL).json()
 
-# For future use - lazy loading approach
-_geojson_cache: Optional[Dict[str, Any]] = None
+class GeoJSONSettings:
+    """Settings for the locally built, pre-simplified country geometry"""
+
+    # Directory holding the simplified levels, served as Dash assets
+    DIRECTORY = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "assets", "geojson"
+    )
+
+    # Simplification levels and the highest map zoom each of them serves
+    LEVELS: ClassVar[dict[str, int]] = {
+        "low": 2,
+        "medium": 3,
+        "high": 5,
+    }
+
+    @classmethod
+    def get_level(cls, zoom: float | None) -> str:
+        """Get the smallest simplification level adequate for a zoom level"""
+        if zoom is not None:
+            for level, max_zoom in cls.LEVELS.items():
+                if zoom <= max_zoom:
+                    return level
+        return list(cls.LEVELS)[-1]
+
+    @classmethod
+    def get_filename(cls, level: str) -> str:
+        """Get the asset path of a simplification level, relative to the assets"""
+        return f"geojson/countries_{level}.geojson"
+
+    @classmethod
+    def get_path(cls, level: str) -> str:
+        """Get the file path of a simplification level"""
+        return os.path.join(cls.DIRECTORY, f"countries_{level}.geojson")
+
+
+_geojson_cache: dict[str, dict[str, Any]] = {}
+
+
+def get_geojson_base(level: str | None = None) -> dict[str, Any]:
+    """Lazily load the GeoJSON data of a simplification level when needed.
+
+    Falls back to downloading the full-resolution GeoJSON, once for all
+    levels, if the level has not been built with 'make geojson' (see
+    utils/geojson_builder.py and the warm-up in utils/warmup.py).
+
+    Raises:
+        requests.RequestException: If the level has not been built and the
+            full-resolution GeoJSON cannot be downloaded
+    """
+    level = level or GeoJSONSettings.get_level(MapSettings.INITIAL_ZOOM)
+    if level not in _geojson_cache:
+        path = GeoJSONSettings.get_path(level)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                _geojson_cache[level] = json.load(f)
+        else:
+            if GEOJSON_URL not in _geojson_cache:
+                # only needed without built levels, so not imported with the module
+                import requests
+
+                response = requests.get(GEOJSON_URL, timeout=30)
+                response.raise_for_status()
+                _geojson_cache[GEOJSON_URL] = response.json()
+            _geojson_cache[level] = _geojson_cache[GEOJSON_URL]
+    return _geojson_cache[level]
+
+
+def has_local_geojson(level: str) -> bool:
+    """Check whether a simplification level has been built locally"""
+    return os.path.exists(GeoJSONSettings.get_path(level))
 
 
-def get_geojson_base() -> Dict[str, Any]:
-    """Lazily load the GeoJSON data when needed"""
-    global _geojson_cache
-    if _geojson_cache is None:
-        _geojson_cache = GEOJSON_BASE
-    return _geojson_cache
+def missing_geojson_levels() -> list[str]:
+    """Get the simplification levels that have not been built locally"""
+    return [level for level in GeoJSONSettings.LEVELS if not has_local_geojson(level)]
 
 
 # ====================================
@@ -118,6 +344,76 @@ class SchemaDefinition:
         "DonorType": ColumnType.VARCHAR,
     }
 
+    # Low-cardinality dimensions stored as dictionary-encoded ENUM columns,
+    # fetched as pandas category columns. Their values are collected by the
+    # DuckDB pipeline from the known categories and the data.
+    ENUM_COLUMNS: ClassVar[list[str]] = [
+        "DonorName",
+        "RecipientName",
+        "FlowName",
+        "climate_class",
+        "meta_category",
+        "DonorType",
+    ]
+
+    # Sort order of the fact table, so that the min/max zone maps of its row
+    # groups let year and recipient filters skip most of the table
+    CLUSTER_KEYS: ClassVar[list[str]] = [
+        "Year",
+        "DonorType",
+        "meta_category",
+        "DERecipientcode",
+    ]
+
+    # Dimensions of the precomputed country-year rollup table
+    ROLLUP_DIMENSIONS: ClassVar[list[str]] = [
+        "Year",
+        "DEDonorcode",
+        "DonorName",
+        "DERecipientcode",
+        "RecipientName",
+        "meta_category",
+        "climate_class",
+        "FlowName",
+        "DonorType",
+    ]
+
+    # Measures summed up in the rollup table
+    ROLLUP_MEASURES: ClassVar[list[str]] = [
+        "USD_Disbursement",
+        "ClimateMitigation",
+        "ClimateAdaptation",
+        "Biodiversity",
+    ]
+
+    # OECD Rio marker column of each climate finance category
+    RIO_MARKER_COLUMNS: ClassVar[dict[str, str]] = {
+        "Mitigation": "ClimateMitigation",
+        "Adaptation": "ClimateAdaptation",
+        "Environment": "Biodiversity",
+    }
+
+
+class DatabaseTables:
+    """Table names inside the DuckDB database"""
+
+    # Fact table with one row per CRS flow
+    FACT = "my_table"
+
+    # Country-year rollup used to answer map queries
+    ROLLUP = "country_year_rollup"
+
+    # Alpha-2 code, flag, name and region of every country code
+    COUNTRIES = "country_metadata"
+
+    # Fingerprints of the ingested year partitions and source files
+    INGEST_PARTITIONS = "ingest_partitions"
+    INGEST_SOURCES = "ingest_sources"
+
+
+# Version of the database layout produced by the DuckDB pipeline.
+# Bump it whenever the pipeline output changes so that cached results are dropped.
+PIPELINE_VERSION = 3
 
 # For backward compatibility
 COLUMN_TYPES = SchemaDefinition.COLUMN_TYPES
@@ -143,14 +439,32 @@ class MapSettings:
     @classmethod
     def get_country_ids(cls):
         """Get list of country IDs from GeoJSON data"""
-        return [feature["id"] for feature in GEOJSON_BASE["features"]]
+        return [feature["id"] for feature in get_geojson_base()["features"]]
 
 
 # For backward compatibility
 YEAR_RANGE = MapSettings.YEAR_RANGE
 INITIAL_CENTER = MapSettings.INITIAL_CENTER
 INITIAL_ZOOM = MapSettings.INITIAL_ZOOM
-COUNTRY_IDS = MapSettings.get_country_ids()
+
+
+def __getattr__(name: str) -> Any:
+    """Load the GeoJSON and pandas constants on first access instead of on import"""
+    if name == "GEOJSON_BASE":
+        return get_geojson_base()
+    if name == "COUNTRY_IDS":
+        return MapSettings.get_country_ids()
+    if name == "CATEGORIES_DF":
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "climate_class": list(ClimateCategories.MAPPING.values()),
+                "meta_category": list(ClimateCategories.MAPPING),
+            }
+        )
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # ====================================
 # Climate Categories & Flow Types
@@ -188,43 +502,32 @@ class ClimateCategories:
         "Sustainable-land-use",
     ]
 
-    # DataFrame mapping sub-categories to main categories
-    MAPPING = pd.DataFrame(
-        {
-            "climate_class": [
-                "Adaptation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Mitigation",
-                "Environment",
-                "Environment",
-                "Environment",
-                "Environment",
-            ],
-            "meta_category": [
-                "Adaptation",
-                "Solar-energy",
-                "Other-mitigation-projects",
-                "Renewables-multiple",
-                "Hydro-energy",
-                "Wind-energy",
-                "Bioenergy",
-                "Geothermal-energy",
-                "Energy-efficiency",
-                "Marine-energy",
-                "Biodiversity",
-                "Nature_conservation",
-                "Other-environment-projects",
-                "Sustainable-land-use",
-            ],
-        }
-    )
+    # Main category of every sub-category
+    MAPPING: ClassVar[dict[str, str]] = {
+        "Adaptation": "Adaptation",
+        "Solar-energy": "Mitigation",
+        "Other-mitigation-projects": "Mitigation",
+        "Renewables-multiple": "Mitigation",
+        "Hydro-energy": "Mitigation",
+        "Wind-energy": "Mitigation",
+        "Bioenergy": "Mitigation",
+        "Geothermal-energy": "Mitigation",
+        "Energy-efficiency": "Mitigation",
+        "Marine-energy": "Mitigation",
+        "Biodiversity": "Environment",
+        "Nature_conservation": "Environment",
+        "Other-environment-projects": "Environment",
+        "Sustainable-land-use": "Environment",
+    }
+
+    @classmethod
+    def get_subcategories(cls, categories: list | None = None) -> list:
+        """Get the sub-categories of the given main categories, all if None"""
+        return [
+            sub
+            for sub, main in cls.MAPPING.items()
+            if categories is None or main in categories
+        ]
 
 
 class FlowTypes:
@@ -240,7 +543,6 @@ class FlowTypes:
 
 
 # For backward compatibility
-CATEGORIES_DF = ClimateCategories.MAPPING
 CATEGORIES = ClimateCategories.MAIN
 SUBCATEGORIES = ClimateCategories.SUB
 FLOW_TYPES = FlowTypes.TYPES
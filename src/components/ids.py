@@ -6,6 +6,7 @@ COLOR_LEGEND_CONTAINER = "color-legend-container"
 DATATABLE = "datatable"
 DATATABLE_CARD = "datatable-card"
 URL = "url"
+SESSION_ID = "session-id"
 PAGE_CONTENT = "page-content"
 OPEN_FILTERS = "open-offcanvas"
 ## storage
@@ -13,7 +14,9 @@ STORED_DATA = "stored-data"
 MODE_DATA = "mode-data"
 RESET_MAP = "reset-map"
 INITIAL_STATE = "initial-state"
-STORED_GEOJSON = "stored-geojson"
+MAP_VALUES = "map-values"
+TIMELINE = "timeline"
+GEOJSON_LEVEL = "geojson-level"
 ## inputs
 YEAR_SLIDER = "year_slider"
 TYPE_DROPDOWN = "type_dropdown"
@@ -36,8 +39,9 @@ WELCOME_MODAL_CLOSE = "welcome-modal-close"
 QUERY_BTN = "query-btn"
 DOWNLOAD_BTN = "download-btn"
 DOWNLOAD_DATATABLE = "download-datatable"
-DOWNLOAD_TRIGGER = "download-trigger"
 DATATABLE_CARD_DOWNLOAD = "datatable-card-download"
+DOWNLOAD_PROGRESS = "download-progress"
+DOWNLOAD_PROGRESS_CONTAINER = "download-progress-container"
 ## storage
 DOWNLOAD_QUERIED_DATA = "download-queried-data"
 ## inputs
@@ -47,3 +51,4 @@ CATEGORIES_DROPDOWN_DOWNLOAD = "categories-dropdown-download"
 CATEGORIES_SUB_DROPDOWN_DOWNLOAD = "categories-sub-dropdown-download"
 DONORTYPE_DROPDOWN_DOWNLOAD = "donortype-dropdown-download"
 FLOW_TYPE_DROPDOWN_DOWNLOAD = "flow-type-dropdown-download"
+EXPORT_FORMAT = "export-format"
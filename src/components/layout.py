@@ -16,14 +16,19 @@ def create_layout(app: Dash) -> html.Div:
         children=[
             html.Link(rel="stylesheet", href=app.get_asset_url("map.css")),
             dcc.Location(id=ids.URL, refresh=False),
+            dcc.Store(id=ids.SESSION_ID, storage_type="session"),  # tab identifier
             navbar.render(),
-            dcc.Store(id=ids.STORED_DATA),  # storage for queried dataset
-            dcc.Store(id=ids.MODE_DATA),  # storage for mode data
-            dcc.Store(id=ids.STORED_GEOJSON),  # storage for geojson
+            dcc.Store(id=ids.STORED_DATA),  # frame store key of queried dataset
+            dcc.Store(id=ids.MODE_DATA),  # frame store key of mode data
+            dcc.Store(id=ids.MAP_VALUES),  # map values keyed by country code
+            dcc.Store(id=ids.TIMELINE),  # map values of every year during playback
+            dcc.Store(  # simplification level of the country geometry
+                id=ids.GEOJSON_LEVEL,
+                data=constants.GeoJSONSettings.get_level(constants.INITIAL_ZOOM),
+            ),
             dcc.Store(
                 id=ids.DOWNLOAD_QUERIED_DATA
-            ),  # storage for data to be downloaded
-            dcc.Download(id=ids.DOWNLOAD_TRIGGER),
+            ),  # preview of the data to be downloaded
             dcc.Store(  # storage for the initial map state
                 id=ids.INITIAL_STATE,
                 data={
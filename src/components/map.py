@@ -1,8 +1,21 @@
 import dash_leaflet as dl
-from dash import html
+from dash import get_asset_url, html
+from dash_extensions.javascript import arrow_function
 
 from components import constants, current_filters, ids, infobox
 from components.widgets import action_button, color_mode, map_mode, type, year
+from utils.map_styler import create_values_style_handler
+
+
+def get_countries_url(level: str) -> str:
+    """Get the URL of the country geometry for a simplification level.
+
+    Falls back to the remote full-resolution GeoJSON if the level has not been
+    built locally, which the warm-up reports (see utils/warmup.py).
+    """
+    if constants.has_local_geojson(level):
+        return get_asset_url(constants.GeoJSONSettings.get_filename(level))
+    return constants.GEOJSON_URL
 
 
 def create_map_layer() -> dl.Map:
@@ -15,14 +28,24 @@ def create_map_layer() -> dl.Map:
         children=[
             dl.TileLayer(url=url, attribution=attribution),
             dl.GeoJSON(
-                url=constants.GEOJSON_URL,
+                url=get_countries_url(
+                    constants.GeoJSONSettings.get_level(constants.INITIAL_ZOOM)
+                ),
                 id=ids.COUNTRIES_LAYER,
-                style={
-                    "color": "dodgerblue",
-                    "opacity": 0,
-                    "fillColor": "dodgerblue",
-                    "fillOpacity": 0,
+                style=create_values_style_handler(),
+                hoverStyle=arrow_function(
+                    {"weight": 4, "color": "#666", "dashArray": ""}
+                ),
+                hideout={
+                    "values": None,
+                    "style": {
+                        "color": "dodgerblue",
+                        "opacity": 0,
+                        "fillColor": "dodgerblue",
+                        "fillOpacity": 0,
+                    },
                 },
+                interactive=True,
             ),
         ],
         center=constants.INITIAL_CENTER,
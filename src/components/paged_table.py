@@ -0,0 +1,110 @@
+import uuid
+from typing import Any
+
+from dash import MATCH, Input, Output, State, callback, dash_table, dcc, html
+from dash.exceptions import PreventUpdate
+
+from components.constants import TableSettings
+from utils.frame_store import frame_store
+from utils.table_backend import fetch_page
+
+
+class PagedTableAIO(html.Div):
+    """All-in-one component for a DataTable paged, sorted and filtered on the server.
+
+    The rows stay in the frame store. The browser only receives the current
+    page, which is fetched whenever the page, sort or filter state changes.
+
+    Args:
+        key: Frame store key of the rows
+        columns: Columns to display
+    """
+
+    class ids:
+        """Component IDs for the PagedTableAIO elements."""
+
+        @staticmethod
+        def table(aio_id):
+            """ID for the DataTable."""
+            return {
+                "component": "PagedTableAIO",
+                "subcomponent": "table",
+                "aio_id": aio_id,
+            }
+
+        @staticmethod
+        def source(aio_id):
+            """ID for the store holding the frame store key of the rows."""
+            return {
+                "component": "PagedTableAIO",
+                "subcomponent": "source",
+                "aio_id": aio_id,
+            }
+
+    # Make ids accessible as a class attribute
+    ids = ids
+
+    def __init__(
+        self,
+        key: str,
+        columns: list[str],
+        aio_id: str | None = None,
+        page_size: int = TableSettings.PAGE_SIZE,
+        table_props: dict[str, Any] | None = None,
+    ):
+        if aio_id is None:
+            aio_id = str(uuid.uuid4())
+
+        table_props = table_props.copy() if table_props else {}
+        table_props.setdefault(
+            "style_cell",
+            {
+                "overflow": "hidden",
+                "textOverflow": "ellipsis",
+                "maxWidth": 0,
+            },
+        )
+
+        super().__init__(
+            [
+                dcc.Store(id=self.ids.source(aio_id), data=key),
+                dash_table.DataTable(
+                    id=self.ids.table(aio_id),
+                    columns=[{"name": i, "id": i} for i in columns],
+                    page_current=0,
+                    page_size=page_size,
+                    page_action="custom",
+                    sort_action="custom",
+                    sort_mode="multi",
+                    sort_by=[],
+                    filter_action="custom",
+                    filter_query="",
+                    **table_props,
+                ),
+            ]
+        )
+
+    @callback(
+        Output(ids.table(MATCH), "data"),
+        Output(ids.table(MATCH), "page_count"),
+        Input(ids.table(MATCH), "page_current"),
+        Input(ids.table(MATCH), "page_size"),
+        Input(ids.table(MATCH), "sort_by"),
+        Input(ids.table(MATCH), "filter_query"),
+        State(ids.source(MATCH), "data"),
+    )
+    def update_page(page_current, page_size, sort_by, filter_query, key):
+        """Fetch the rows of the current page from the frame store."""
+        table = frame_store.get(key)
+        if table is None:
+            raise PreventUpdate
+
+        page = fetch_page(
+            table,
+            page_current or 0,
+            page_size,
+            sort_by=sort_by,
+            filter_query=filter_query,
+            table_key=key,
+        )
+        return page.records, page.page_count
@@ -2,7 +2,7 @@ from typing import Optional
 
 from dash import dcc, html
 
-from components.constants import CATEGORIES_DF
+from components.constants import ClimateCategories
 
 
 def render(id: str, style: Optional[dict] = None) -> html.Div:
@@ -38,7 +38,7 @@ def _create_dropdown(id: str, style: Optional[dict] = None) -> dcc.Dropdown:
     return dcc.Dropdown(
         id=id,
         options=_get_category_options(),
-        value=["Mitigation"],  # CATEGORIES_DF["climate_class"].unique(),
+        value=["Mitigation"],  # ClimateCategories.MAIN,
         multi=True,
         style=style,
     )
@@ -51,4 +51,4 @@ def _get_category_options() -> list[str]:
     Returns:
         List[str]: A list of unique category values
     """
-    return CATEGORIES_DF["climate_class"].unique()
+    return ClimateCategories.MAIN
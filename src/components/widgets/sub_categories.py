@@ -2,7 +2,7 @@ from typing import Optional
 
 from dash import dcc, html
 
-from components.constants import CATEGORIES_DF
+from components.constants import ClimateCategories
 
 
 def render(id: str, style: Optional[dict] = None) -> html.Div:
@@ -38,7 +38,7 @@ def _create_dropdown(id: str, style: Optional[dict] = None) -> dcc.Dropdown:
     return dcc.Dropdown(
         id=id,
         options=_get_subcategory_options(),
-        value=["Solar-energy"],  # CATEGORIES_DF["meta_category"].unique(),
+        value=["Solar-energy"],  # ClimateCategories.SUB,
         multi=True,
         style=style,
     )
@@ -51,4 +51,4 @@ def _get_subcategory_options() -> list[str]:
     Returns:
         list[str]: A list of unique subcategory values
     """
-    return CATEGORIES_DF["meta_category"].unique()
+    return ClimateCategories.get_subcategories()
@@ -0,0 +1,54 @@
+# ruff: noqa: N999 - gunicorn looks up its configuration by this file name
+"""Gunicorn configuration of the production server.
+
+The application is preloaded by the master process and forked into
+ServerSettings.WORKERS workers with ServerSettings.THREADS request threads
+each, so a slow download query occupies a single thread instead of blocking
+every map user. Send SIGHUP to the master to replace the workers gracefully,
+e.g. after the DuckDB pipeline has rebuilt the database.
+"""
+
+import os
+import sys
+
+# gunicorn reads this file before the application directory is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from components.constants import (
+    QUERY_DATABASE,
+    ServerSettings,
+    StartupSettings,
+)
+from utils.duckdb_connection import close_all_connections
+from utils.warmup import start_warm_up
+
+bind = ServerSettings.BIND
+preload_app = True
+workers = ServerSettings.WORKERS
+worker_class = "gthread"
+threads = ServerSettings.THREADS
+timeout = ServerSettings.TIMEOUT
+graceful_timeout = ServerSettings.GRACEFUL_TIMEOUT
+keepalive = ServerSettings.KEEPALIVE
+max_requests = ServerSettings.MAX_REQUESTS
+max_requests_jitter = ServerSettings.MAX_REQUESTS_JITTER
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    """Drop the DuckDB handles inherited from the master process.
+
+    In startup budget mode the master has not warmed up, since a background
+    thread does not survive the fork, so every worker warms up on its own.
+    """
+    close_all_connections()
+    if StartupSettings.BACKGROUND_WARMUP:
+        start_warm_up(QUERY_DATABASE)
+
+
+def when_ready(server):
+    """Log the serving profile once the workers are started."""
+    server.log.info(
+        f"Serving on {bind} with {workers} workers and {threads} threads each "
+        f"(timeout={timeout}s, graceful_timeout={graceful_timeout}s)"
+    )
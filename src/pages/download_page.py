@@ -25,6 +25,7 @@ def render() -> html.Div:
                         html.Br(),
                         _create_filters_section(),
                         _create_buttons_section(),
+                        _create_progress_section(),
                         _create_datatable_section(),
                     ],
                     width={"size": 12},
@@ -53,9 +54,10 @@ def _create_description_section() -> html.P:
         html.H4: The description component
     """
     return html.P(
-        "Download the data in CSV format. You can filter the data "
+        "Download the data as CSV, compressed CSV or Parquet. You can filter the data "
         "by selecting the type of flow, the donor type, the categories, "
-        "and the subcategories. Once you're ready, click 'Query' to pull the data and 'Download' to get it in CSV format.",
+        "and the subcategories. Once you're ready, click 'Query' to preview the data "
+        "and 'Download' to get the full dataset in the selected format.",
         className="mb-4 text-center",
     )
 
@@ -152,6 +154,7 @@ def _create_buttons_section() -> dbc.Row:
                 [
                     _create_query_button_column(),
                     _create_download_button_column(),
+                    _create_export_format_column(),
                 ],
                 className="g-3",
             ),
@@ -182,20 +185,74 @@ def _create_download_button_column() -> dbc.Col:
     """
     Create the column with the download button.
 
+    The button links to the streaming export endpoint, its URL is updated
+    with the selected filters and export format.
+
     Returns:
         dbc.Col: A Bootstrap column with the download button
     """
     return dbc.Col(
-        action_button.render(
+        dbc.Button(
             "Download",
             id=ids.DOWNLOAD_BTN,
             color="success",
-            class_name="w-100",
+            className="w-100",
+            external_link=True,
+            download="",
         ),
         width=2,
     )
 
 
+def _create_export_format_column() -> dbc.Col:
+    """
+    Create the column with the export format selector.
+
+    Returns:
+        dbc.Col: A Bootstrap column with the export format radio buttons
+    """
+    return dbc.Col(
+        dbc.RadioItems(
+            id=ids.EXPORT_FORMAT,
+            options=[
+                {"label": "CSV", "value": "csv"},
+                {"label": "CSV (gzip)", "value": "csv.gz"},
+                {"label": "Parquet", "value": "parquet"},
+            ],
+            value="csv",
+            inline=True,
+            style={"font-size": "14px"},
+        ),
+        width=4,
+        className="d-flex align-items-center",
+    )
+
+
+def _create_progress_section() -> dbc.Row:
+    """
+    Create the section with the progress bar of a running query.
+
+    The bar is only shown while the query runs as background job.
+
+    Returns:
+        dbc.Row: A Bootstrap row containing the progress bar
+    """
+    return dbc.Row(
+        dbc.Col(
+            dbc.Progress(
+                id=ids.DOWNLOAD_PROGRESS,
+                value=0,
+                label="",
+                striped=True,
+                animated=True,
+            ),
+            width={"size": 8, "offset": 2},
+        ),
+        id=ids.DOWNLOAD_PROGRESS_CONTAINER,
+        style={"display": "none"},
+    )
+
+
 def _create_datatable_section() -> dbc.Row:
     """
     Create the section with the data table.
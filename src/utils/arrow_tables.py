@@ -0,0 +1,75 @@
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def to_arrow(data: pd.DataFrame | pa.Table) -> pa.Table:
+    """Convert a DataFrame to an Arrow table, passing Arrow tables through.
+
+    Args:
+        data: DataFrame or Arrow table
+
+    Returns:
+        The data as Arrow table
+    """
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return data
+
+
+def slice_sorted(table: pa.Table, column: str, value: Any) -> pa.Table:
+    """Select the rows holding a value from a table sorted by a column.
+
+    The rows of a value are contiguous in a sorted table, so they are
+    returned as a zero-copy slice instead of a filtered copy.
+
+    Args:
+        table: Arrow table sorted by the column
+        column: Column to match
+        value: Value to select
+
+    Returns:
+        Slice of the table holding the matching rows
+    """
+    matches = pc.equal(table[column], value)
+    first = pc.index(matches, True).as_py()
+    if first < 0:
+        return table.slice(0, 0)
+    return table.slice(first, pc.sum(matches).as_py())
+
+
+def filter_equal(table: pa.Table, column: str, value: Any) -> pa.Table:
+    """Select the rows holding a value from an unsorted table.
+
+    Args:
+        table: Arrow table
+        column: Column to match
+        value: Value to select
+
+    Returns:
+        Table holding the matching rows
+    """
+    return table.filter(pc.equal(table[column], value))
+
+
+def sum_by(table: pa.Table, key: str, target: str) -> dict[Any, float]:
+    """Sum a column per value of a key column.
+
+    Like a pandas groupby sum, rows without a key are skipped and a group
+    without any values sums to 0.
+
+    Args:
+        table: Arrow table
+        key: Column to group by
+        target: Column to sum
+
+    Returns:
+        Mapping of key values to sums
+    """
+    table = table.filter(pc.is_valid(table[key]))
+    sums = table.group_by(key).aggregate(
+        [(target, "sum", pc.ScalarAggregateOptions(min_count=0))]
+    )
+    return dict(zip(sums[key].to_pylist(), sums[f"{target}_sum"].to_pylist()))
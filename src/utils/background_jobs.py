@@ -0,0 +1,72 @@
+import logging
+import os
+import time
+from collections.abc import Callable, Collection
+
+import diskcache
+from dash import DiskcacheManager
+
+from components.constants import JobSettings
+from utils.frame_store import FrameStore, frame_store
+from utils.query_duckdb import ParameterizedQuery, query_with_progress
+from utils.result_cache import versioned_key
+
+logger = logging.getLogger(__name__)
+
+
+def create_job_manager(directory: str = JobSettings.DIRECTORY) -> DiskcacheManager:
+    """Create the manager running background callbacks in separate processes.
+
+    Jobs and their progress are kept in an on-disk store, so every worker
+    process of the server can poll and cancel the jobs started by the others.
+
+    Args:
+        directory: Directory of the job store
+
+    Returns:
+        The background callback manager of the application
+    """
+    os.makedirs(directory, exist_ok=True)
+    return DiskcacheManager(diskcache.Cache(directory))
+
+
+def run_query_job(
+    duckdb_db: str,
+    query: ParameterizedQuery,
+    filter_key: tuple,
+    on_progress: Callable[[float], None],
+    drop_columns: Collection[str] = (),
+    store: FrameStore = frame_store,
+) -> str:
+    """Run a query as background job and store its result.
+
+    The result is stored under the hash of the filter selection and written
+    to the spill directory of the frame store, where the worker processes of
+    the server pick it up. A request for a selection whose result is still
+    stored reuses it instead of running the query again.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file
+        query: Parameterized query to run
+        filter_key: Canonical key of the filter selection (see make_filter_key)
+        on_progress: Called with the completed percentage of the query
+        drop_columns: Columns of the result not to store
+        store: Frame store receiving the result
+
+    Returns:
+        Key of the result in the frame store
+    """
+    key = versioned_key(duckdb_db, filter_key)
+    if store.get(key) is not None:
+        logger.info(f"Reusing the stored result {key} of an identical job")
+        on_progress(100.0)
+        return key
+
+    start = time.time()
+    table = query_with_progress(duckdb_db, query, on_progress)
+    table = table.drop_columns([c for c in table.column_names if c in drop_columns])
+    store.put(table, persist=True, key=key)
+    logger.info(
+        f"Job stored {table.num_rows} rows in {time.time() - start:.2f} seconds"
+    )
+    return key
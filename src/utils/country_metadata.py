@@ -0,0 +1,269 @@
+import logging
+import math
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
+from typing import NamedTuple
+
+import duckdb
+import requests
+
+from components.constants import QUERY_DATABASE, DatabaseTables, MapSettings
+from utils.duckdb_connection import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the metadata of a database is loaded again after a failure
+METADATA_RETRY_INTERVAL = 60
+
+# Flag shown for codes that are no ISO country, e.g. CRS regional recipients
+UNKNOWN_FLAG = "🏳️"
+
+# UN M49 region of every ISO 3166 country
+REGIONS = {
+    region: codes.split()
+    for region, codes in {
+        "Africa": """DZA AGO BEN BWA BFA BDI CPV CMR CAF TCD COM COG COD CIV DJI
+            EGY GNQ ERI SWZ ETH GAB GMB GHA GIN GNB KEN LSO LBR LBY MDG MWI MLI
+            MRT MUS MYT MAR MOZ NAM NER NGA REU RWA SHN STP SEN SYC SLE SOM ZAF
+            SSD SDN TZA TGO TUN UGA ESH ZMB ZWE IOT ATF""",
+        "Americas": """AIA ATG ARG ABW BHS BRB BLZ BMU BOL BES BVT BRA CAN CYM CHL
+            COL CRI CUB CUW DMA DOM ECU SLV FLK GUF GRL GRD GLP GTM GUY HTI HND
+            JAM MTQ MEX MSR NIC PAN PRY PER PRI BLM KNA LCA MAF SPM VCT SXM SGS
+            SUR TTO TCA USA URY VEN VGB VIR""",
+        "Asia": """AFG ARM AZE BHR BGD BTN BRN KHM CHN CYP GEO HKG IND IDN IRN IRQ
+            ISR JPN JOR KAZ KWT KGZ LAO LBN MAC MYS MDV MNG MMR NPL PRK OMN PAK
+            PSE PHL QAT SAU SGP KOR LKA SYR TWN TJK THA TLS TUR TKM ARE UZB VNM
+            YEM""",
+        "Europe": """ALA ALB AND AUT BLR BEL BIH BGR HRV CZE DNK EST FRO FIN FRA DEU
+            GIB GRC GGY HUN ISL IRL IMN ITA JEY LVA LIE LTU LUX MLT MDA MCO MNE
+            NLD MKD NOR POL PRT ROU RUS SMR SRB SVK SVN ESP SJM SWE CHE UKR GBR
+            VAT""",
+        "Oceania": """ASM AUS CXR CCK COK FJI PYF GUM HMD KIR MHL FSM NRU NCL NZL NIU
+            NFK MNP PLW PNG PCN WSM SLB TKL TON TUV UMI VUT WLF""",
+        "Antarctica": "ATA",
+    }.items()
+}
+
+# Codes in use that are not part of ISO 3166: code -> (alpha-2, name, region)
+EXTRA_COUNTRIES = {
+    "XKX": ("XK", "Kosovo", "Europe"),
+}
+
+
+class CountryMetadata(NamedTuple):
+    """Display data of a country code shown by the map and the infobox."""
+
+    alpha_2: str | None
+    flag: str
+    name: str
+    region: str | None
+
+
+def build_country_metadata(
+    codes: Mapping[str, str | None],
+) -> dict[str, CountryMetadata]:
+    """Resolve country codes to their alpha-2 code, flag, name and region.
+
+    Codes that are neither ISO 3166 alpha-3 codes nor in EXTRA_COUNTRIES, e.g.
+    the CRS pseudo-codes of regional recipients, all resolve the same way: no
+    alpha-2 code or region, the unknown flag and their name from the data.
+
+    Args:
+        codes: Mapping of country codes to their name in the data, None if
+            the name is unknown
+
+    Returns:
+        Mapping of every code to its metadata
+    """
+    # only needed to build the table, not to serve requests
+    import pycountry
+    from flag import flag
+
+    region_of_code = {
+        code: region for region, members in REGIONS.items() for code in members
+    }
+
+    metadata = {}
+    for code, data_name in codes.items():
+        if code in EXTRA_COUNTRIES:
+            alpha_2, name, region = EXTRA_COUNTRIES[code]
+        else:
+            country = pycountry.countries.get(alpha_3=code)
+            if country is None:
+                metadata[code] = CountryMetadata(
+                    None, UNKNOWN_FLAG, data_name or code, None
+                )
+                continue
+            alpha_2 = country.alpha_2
+            name = getattr(country, "common_name", country.name)
+            region = region_of_code.get(code)
+        metadata[code] = CountryMetadata(alpha_2, flag(alpha_2), name, region)
+
+    return metadata
+
+
+def collect_country_codes(
+    con: duckdb.DuckDBPyConnection,
+    source_table: str = DatabaseTables.FACT,
+    country_ids: Iterable[str] | None = None,
+) -> dict[str, str | None]:
+    """Collect the donor and recipient codes of the data and the map countries.
+
+    Args:
+        con: Connection or cursor on the database
+        source_table: Table holding the donor and recipient codes
+        country_ids: Country ids of the map geometry, loaded if None
+
+    Returns:
+        Mapping of every code to its name in the data, None for map countries
+        without data
+    """
+    if country_ids is None:
+        try:
+            country_ids = MapSettings.get_country_ids()
+        except requests.RequestException as e:
+            logger.error(f"Could not load the map countries: {e}")
+            country_ids = []
+
+    codes: dict[str, str | None] = dict.fromkeys(country_ids)
+    rows = con.execute(
+        f"""SELECT DEDonorcode, ANY_VALUE(DonorName) FROM {source_table}
+        GROUP BY DEDonorcode
+        UNION ALL
+        SELECT DERecipientcode, ANY_VALUE(RecipientName) FROM {source_table}
+        GROUP BY DERecipientcode"""
+    ).fetchall()
+    for code, name in rows:
+        if code is not None and codes.get(code) is None:
+            codes[code] = str(name) if name is not None else None
+    return codes
+
+
+def create_country_table(
+    db_path: str,
+    source_table: str = DatabaseTables.FACT,
+    country_table: str = DatabaseTables.COUNTRIES,
+    country_ids: Iterable[str] | None = None,
+) -> None:
+    """Materialise the country metadata of the data and the map countries.
+
+    Args:
+        db_path: Path to the DuckDB database file
+        source_table: Fact table holding the donor and recipient codes
+        country_table: Name of the country table to (re)create
+        country_ids: Country ids of the map geometry, loaded if None
+    """
+    con = duckdb.connect(db_path)
+    try:
+        codes = collect_country_codes(con, source_table, country_ids)
+        metadata = build_country_metadata(codes)
+        con.execute(
+            f"""CREATE OR REPLACE TABLE {country_table} (
+            CountryCode VARCHAR PRIMARY KEY,
+            alpha_2 VARCHAR,
+            flag VARCHAR,
+            name VARCHAR,
+            region VARCHAR
+        )"""
+        )
+        con.executemany(
+            f"INSERT INTO {country_table} VALUES (?, ?, ?, ?, ?)",
+            [(code, *entry) for code, entry in metadata.items()],
+        )
+    finally:
+        con.close()
+
+    logger.info(f"Country table {country_table} holds {len(metadata)} codes.")
+
+
+def load_country_metadata(
+    database: str = QUERY_DATABASE,
+) -> Mapping[str, CountryMetadata]:
+    """Return the frozen country metadata of a database, loading it once.
+
+    The metadata is read from the country table built by the DuckDB pipeline.
+    Databases without that table, e.g. the partitioned Parquet dataset, get it
+    built from their codes once instead. If loading fails, the database gets
+    no metadata for METADATA_RETRY_INTERVAL seconds before it is retried, so
+    hovering the map does not query and log the failure again every time.
+
+    Args:
+        database: Path to the DuckDB database or partitioned Parquet dataset
+
+    Returns:
+        Read-only mapping of country codes to their metadata, empty if it
+        could not be loaded
+    """
+    with _metadata_lock:
+        metadata = _metadata.get(database)
+        if metadata is not None:
+            return metadata
+
+        start = time.time()
+        if start - _failed_at.get(database, -math.inf) < METADATA_RETRY_INTERVAL:
+            return _NO_METADATA
+
+        try:
+            entries = _read_country_metadata(database)
+        except duckdb.Error as e:
+            logger.error(
+                f"Could not load the country metadata, retrying in "
+                f"{METADATA_RETRY_INTERVAL} seconds: {e}"
+            )
+            _failed_at[database] = start
+            return _NO_METADATA
+
+        _failed_at.pop(database, None)
+
+        metadata = MappingProxyType(entries)
+        _metadata[database] = metadata
+        logger.info(
+            f"Loaded metadata of {len(metadata)} countries "
+            f"in {time.time() - start:.2f} seconds"
+        )
+        return metadata
+
+
+def _read_country_metadata(database: str) -> dict[str, CountryMetadata]:
+    """Read the country table of a database, or build it from the data."""
+    manager = get_connection_manager(database)
+    cursor = manager.cursor()
+    if DatabaseTables.COUNTRIES not in manager.tables():
+        logger.warning(
+            f"{database} has no table {DatabaseTables.COUNTRIES}, "
+            "building the country metadata from the data"
+        )
+        return build_country_metadata(collect_country_codes(cursor))
+
+    rows = cursor.execute(
+        "SELECT CountryCode, alpha_2, flag, name, region "
+        f"FROM {DatabaseTables.COUNTRIES}"
+    ).fetchall()
+    return {code: CountryMetadata(*entry) for code, *entry in rows}
+
+
+def get_country_metadata(code: str, database: str = QUERY_DATABASE) -> CountryMetadata:
+    """Look up the metadata of a country code.
+
+    Args:
+        code: ISO alpha-3 or CRS country code
+        database: Path to the DuckDB database or partitioned Parquet dataset
+
+    Returns:
+        The metadata of the code; codes missing from the table resolve like
+        other codes without an ISO country
+    """
+    metadata = load_country_metadata(database).get(code)
+    if metadata is None:
+        return CountryMetadata(None, UNKNOWN_FLAG, code, None)
+    return metadata
+
+
+_metadata: dict[str, Mapping[str, CountryMetadata]] = {}
+_metadata_lock = threading.Lock()
+
+# Time the metadata of a database last failed to load
+_failed_at: dict[str, float] = {}
+_NO_METADATA: Mapping[str, CountryMetadata] = MappingProxyType({})
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.arrow_tables import sum_by
+from utils.frame_store import frame_store
+
+logger = logging.getLogger(__name__)
+
+# Number of stored/mode data versions whose index is kept
+MAX_CACHED_VERSIONS = 32
+
+# Categories summed up per country, keyed by the name used in the index
+SUMMARY_CATEGORIES = {
+    "adaptation": "Adaptation",
+    "environment": "Environment",
+    "mitigation": "Mitigation",
+}
+
+
+def build_country_summaries(
+    table_data: pa.Table, table_mode: pa.Table
+) -> dict[str, dict[str, float]]:
+    """Sum up the values shown in the infobox for every country at once.
+
+    Args:
+        table_data: Stored data with the columns CountryCode, meta_category
+            and USD_Disbursement
+        table_mode: Mode data with the columns CountryCode and USD_Disbursement
+
+    Returns:
+        Mapping of ISO3 country codes to their total disbursement in the mode
+        data and their disbursements per category in the stored data, rounded
+        to two decimals. Countries without mode data are left out.
+    """
+    if "USD_Disbursement" not in table_mode.column_names:
+        return {}
+
+    totals = sum_by(table_mode, "CountryCode", "USD_Disbursement")
+
+    category = table_data["meta_category"]
+    if pa.types.is_dictionary(category.type):
+        category = category.cast(pa.string())
+    category_sums = {}
+    for name, meta_category in SUMMARY_CATEGORIES.items():
+        rows = table_data.filter(pc.equal(category, meta_category))
+        category_sums[name] = sum_by(rows, "CountryCode", "USD_Disbursement")
+
+    summaries = {}
+    for code, total in totals.items():
+        summary = {"total": round(total or 0.0, 2)}
+        for name, sums in category_sums.items():
+            summary[name] = round(sums.get(code) or 0.0, 2)
+        summaries[str(code)] = summary
+    return summaries
+
+
+def get_country_summaries(
+    stored_data: str | None, mode_data: str | None
+) -> dict[str, dict[str, float]]:
+    """Return the infobox index of a stored and mode data version, building it once.
+
+    The frame store keys identify the version of the data, so the index is
+    built on the first hover after the data changed and every further hover
+    is a dictionary lookup, however many rows the data has.
+
+    Args:
+        stored_data: Frame store key of the stored data
+        mode_data: Frame store key of the mode data
+
+    Returns:
+        Mapping of ISO3 country codes to their summary (see
+        build_country_summaries), empty if either table is not available
+    """
+    version = (stored_data, mode_data)
+    with _summaries_lock:
+        summaries = _summaries.get(version)
+        if summaries is not None:
+            _summaries.move_to_end(version)
+            return summaries
+
+    table_data = frame_store.get(stored_data)
+    table_mode = frame_store.get(mode_data)
+    if table_data is None or table_mode is None:
+        return {}
+
+    start = time.time()
+    summaries = build_country_summaries(table_data, table_mode)
+    logger.info(
+        f"Built infobox index of {len(summaries)} countries "
+        f"in {time.time() - start:.3f} seconds"
+    )
+
+    with _summaries_lock:
+        _summaries[version] = summaries
+        while len(_summaries) > MAX_CACHED_VERSIONS:
+            _summaries.popitem(last=False)
+
+    return summaries
+
+
+_summaries: OrderedDict[tuple, dict[str, dict[str, float]]] = OrderedDict()
+_summaries_lock = threading.Lock()
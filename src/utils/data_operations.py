@@ -2,24 +2,35 @@ import logging
 import time
 from typing import Any, Literal, Optional
 
+import duckdb
 import pandas as pd
-import requests
+import pyarrow as pa
+
+from components.constants import SchemaDefinition
+from utils.arrow_tables import sum_by
+from utils.query_duckdb import ResultFormat, construct_mode_query, query_duckdb
+from utils.result_cache import make_filter_key
 
 logger = logging.getLogger(__name__)
 
+# Map modes that can be computed inside DuckDB (see query_mode_data)
+SQL_MAP_MODES = ("rio_oecd", "rio_climfinbert", "rio_diff")
+
 
 def reshape_by_type(
-    df: pd.DataFrame,
+    df: pd.DataFrame | pa.Table,
     selected_type: Literal["donors", "recipients"],
-) -> pd.DataFrame:
+) -> pd.DataFrame | pa.Table:
     """Reshape the dataframe based on whether we're viewing donors or recipients.
 
+    Arrow tables are reshaped without copying their columns.
+
     Args:
-        df: Input DataFrame with climate finance data
+        df: Input DataFrame or Arrow table with climate finance data
         selected_type: Either 'donors' or 'recipients'
 
     Returns:
-        Reshaped DataFrame with standardized column names
+        Reshaped DataFrame or Arrow table with standardized column names
 
     Raises:
         ValueError: If selected_type is not 'donors' or 'recipients'
@@ -47,6 +58,11 @@ def reshape_by_type(
         )
 
     config = reshape_config[selected_type]
+    if isinstance(df, pa.Table):
+        table = df.drop_columns(config["drop"])
+        return table.rename_columns(
+            [config["rename"].get(name, name) for name in table.column_names]
+        )
     return df.drop(config["drop"], axis=1).rename(config["rename"], axis=1)
 
 
@@ -112,6 +128,73 @@ def create_mode_data(
     return result
 
 
+def query_mode_data(
+    duckdb_db: str,
+    map_mode: Literal["rio_oecd", "rio_climfinbert", "rio_diff"],
+    selected_type: Literal["donors", "recipients"],
+    selected_year: int,
+    selected_categories: list[str] | None = None,
+    selected_subcategories: list[str] | None = None,
+    selected_donor_types: list[str] | None = None,
+    selected_flow_types: list[str] | None = None,
+    result_format: ResultFormat = "pandas",
+) -> pd.DataFrame | pa.Table | None:
+    """Compute the mode-specific data inside DuckDB.
+
+    This is the SQL counterpart of create_mode_data for the Rio marker modes. It
+    returns one row per country instead of transferring every grouped row into
+    pandas.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file
+        map_mode: Selected map visualization mode
+        selected_type: Either 'donors' or 'recipients'
+        selected_year: Selected year
+        selected_categories: Selected climate finance categories
+        selected_subcategories: Selected climate finance subcategories
+        selected_donor_types: Selected donor types
+        selected_flow_types: Selected flow types
+        result_format: 'pandas' for a DataFrame, 'arrow' for an Arrow table
+
+    Returns:
+        DataFrame or Arrow table for the selected mode, or None if the query
+        failed and the pandas implementation has to be used instead
+
+    Raises:
+        duckdb.InterruptException: If the query was interrupted
+    """
+    query = construct_mode_query(
+        map_mode=map_mode,
+        selected_type=selected_type,
+        selected_year=selected_year,
+        selected_categories=selected_categories,
+        selected_subcategories=selected_subcategories,
+        selected_donor_types=selected_donor_types,
+        selected_flow_types=selected_flow_types,
+    )
+
+    try:
+        return query_duckdb(
+            duckdb_db=duckdb_db,
+            query=query,
+            cache_key=make_filter_key(
+                f"{map_mode}_{selected_type}",
+                selected_year,
+                selected_categories,
+                selected_subcategories,
+                selected_donor_types,
+                selected_flow_types,
+            ),
+            result_format=result_format,
+        )
+    except duckdb.InterruptException:
+        # superseded by a newer query (see query_generations), not a failure
+        raise
+    except duckdb.Error as e:
+        logger.warning(f"Computing map mode {map_mode} in DuckDB failed: {e}")
+        return None
+
+
 def aggregate(
     df: pd.DataFrame,
     group_by: str | list[str] = "CountryCode",
@@ -127,7 +210,42 @@ def aggregate(
     Returns:
         Aggregated DataFrame
     """
-    return df.groupby(group_by).agg({target: "sum"}).reset_index()
+    # observed: categorical dimensions only yield the combinations present
+    return df.groupby(group_by, observed=True).agg({target: "sum"}).reset_index()
+
+
+def build_value_map(df: pd.DataFrame | pa.Table, map_mode: str) -> dict[str, float]:
+    """Build the compact mapping of country codes to map values.
+
+    Arrow tables are aggregated in Arrow; only the per-country values are
+    converted.
+
+    Args:
+        df: DataFrame or Arrow table with the mode-specific climate finance data
+        map_mode: Selected map visualization mode
+
+    Returns:
+        Dictionary mapping ISO3 country codes to the value shown on the map,
+        empty for base mode or unrecognized modes
+    """
+    is_arrow = isinstance(df, pa.Table)
+    if map_mode in ["rio_oecd", "rio_climfinbert"]:
+        # Aggregate by CountryCode to ensure unique values when multiple subcategories are selected
+        if is_arrow:
+            values = pd.Series(sum_by(df, "CountryCode", "USD_Disbursement"))
+        else:
+            values = df.groupby("CountryCode", observed=True)["USD_Disbursement"].sum()
+    elif map_mode == "rio_diff":
+        values = pd.Series(
+            df["USD_Disbursement_diff"].to_numpy(), index=df["CountryCode"].to_numpy()
+        )
+        values = values[~values.index.duplicated(keep="last")]
+    else:
+        if map_mode != "base":
+            logger.warning(f"Unrecognized map_mode '{map_mode}' in build_value_map")
+        return {}
+
+    return {str(code): float(value) for code, value in values.dropna().items()}
 
 
 def merge_data(
@@ -135,6 +253,9 @@ def merge_data(
 ) -> dict[str, Any]:
     """Merge the GeoJSON data with the DataFrame data for map visualization.
 
+    The map itself only needs the values from build_value_map; this merge is
+    kept for consumers that require a self-contained GeoJSON.
+
     Args:
         df: DataFrame with climate finance data
         geojson_base: Cached GeoJSON base object with country polygons
@@ -149,21 +270,13 @@ def merge_data(
     if map_mode == "base":
         return geojson_base
 
-    # Create mapping dictionary based on the mode
-    if map_mode in ["rio_oecd", "rio_climfinbert"]:
-        # Aggregate by CountryCode to ensure unique values when multiple subcategories are selected
-        agg_df = df.groupby("CountryCode")["USD_Disbursement"].sum().reset_index()
-        merge_dict = pd.Series(
-            agg_df.USD_Disbursement.values, index=agg_df["CountryCode"]
-        ).to_dict()
-    elif map_mode == "rio_diff":
-        merge_dict = pd.Series(
-            df.USD_Disbursement_diff.values, index=df["CountryCode"]
-        ).to_dict()
-    else:
+    if map_mode not in ["rio_oecd", "rio_climfinbert", "rio_diff"]:
         logger.warning(f"Unrecognized map_mode '{map_mode}' in merge_data")
         return geojson_base
 
+    # Create mapping dictionary based on the mode
+    merge_dict = build_value_map(df, map_mode)
+
     # Filter features to include only countries with data
     filtered_features = []
     for feature in geojson_base["features"]:
@@ -207,11 +320,7 @@ def build_oecd_table(
         return df
 
     # Map UI category names to database column names
-    categories_mapping = {
-        "Mitigation": "ClimateMitigation",
-        "Adaptation": "ClimateAdaptation",
-        "Environment": "Biodiversity",
-    }
+    categories_mapping = SchemaDefinition.RIO_MARKER_COLUMNS
 
     # Initialize filter condition
     filter_condition = pd.Series(False, index=df.index)
@@ -299,19 +408,22 @@ def calculate_difference(
         climfinbert_df: DataFrame with ClimFinBERT data
 
     Returns:
-        DataFrame with difference values
+        DataFrame with the OECD and ClimFinBERT totals and their difference
+        per country, as computed in DuckDB (see query_mode_data)
     """
-    # Merge the dataframes on CountryCode
+    # Sum up per country first, merging rows per category would pair every
+    # OECD row of a country with every ClimFinBERT row of it
     diff_df = pd.merge(
-        oecd_df,
-        climfinbert_df,
+        aggregate(oecd_df),
+        aggregate(climfinbert_df),
         on=["CountryCode"],
         how="outer",
         suffixes=("_OECD", "_ClimFinBERT"),
     )
 
-    # Replace NaN values with 0
-    diff_df.fillna(0, inplace=True)
+    # Replace missing amounts with 0; categorical columns cannot hold 0
+    numeric_columns = diff_df.select_dtypes("number").columns
+    diff_df[numeric_columns] = diff_df[numeric_columns].fillna(0)
 
     # Calculate the difference between ClimFinBERT and OECD values
     diff_df["USD_Disbursement_diff"] = (
@@ -323,8 +435,10 @@ def calculate_difference(
 
 if __name__ == "__main__":
     """Test code for the data operations module."""
+    import requests
+
     from components.constants import DUCKDB_PATH
-    from utils.query_duckdb import construct_country_summary_query, query_duckdb
+    from utils.query_duckdb import construct_country_summary_query
 
     # Fetch GeoJSON data for testing
     geojson_url = "https://raw.githubusercontent.com/johan/world.geo.json/master/countries.geo.json"
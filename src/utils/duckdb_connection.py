@@ -0,0 +1,301 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+import duckdb
+
+from components.constants import COLUMN_TYPES, DatabaseTables, DuckDBSettings
+
+logger = logging.getLogger(__name__)
+
+IN_MEMORY = ":memory:"
+
+
+def is_parquet_dataset(database: str) -> bool:
+    """Check whether a database path points to a partitioned Parquet dataset."""
+    return database != IN_MEMORY and os.path.isdir(database)
+
+
+def create_dataset_views(
+    connection: duckdb.DuckDBPyConnection,
+    dataset_dir: str,
+    table_name: str = DatabaseTables.FACT,
+) -> None:
+    """Expose a Hive-partitioned Parquet dataset as the fact table.
+
+    The view reads the partition columns from the directory names, so
+    filters on them (e.g. 'Year = ?') prune whole partitions before any file
+    is opened. Filters on the other columns skip row groups by their min/max
+    statistics.
+
+    Args:
+        connection: Open DuckDB connection
+        dataset_dir: Directory of the partitioned dataset
+        table_name: Name of the view
+    """
+    files = os.path.join(dataset_dir, "**", "*.parquet").replace("'", "''")
+    columns = ", ".join(COLUMN_TYPES)
+    connection.execute(f"""
+        CREATE OR REPLACE VIEW {table_name} AS
+        SELECT {columns}
+        FROM read_parquet(
+            '{files}', hive_partitioning = true, hive_types = {{'Year': INTEGER}}
+        )
+    """)
+
+
+class DuckDBConnectionManager:
+    """Shared DuckDB database handle with one cursor per thread.
+
+    The database is opened once per worker process and reused by every callback.
+    Each thread receives its own cursor on that handle, so concurrent callbacks
+    share the catalog and buffer pool without contending for file locks. A
+    handle that is reset while threads still hold cursors on it is retired
+    and only closed once all of them have moved on to the new handle, so
+    queries running on other threads are not cut off.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        read_only: bool = True,
+        threads: int = DuckDBSettings.THREADS,
+        memory_limit: str = DuckDBSettings.MEMORY_LIMIT,
+        health_check_interval: int = DuckDBSettings.HEALTH_CHECK_INTERVAL,
+    ):
+        """Initialize the manager without opening the database yet.
+
+        Args:
+            database: Path to the DuckDB database file, a partitioned Parquet
+                dataset directory or ':memory:'
+            read_only: Whether to open the database in read-only mode
+            threads: Number of threads DuckDB may use per query
+            memory_limit: Maximum memory of the DuckDB buffer pool, e.g. '2GB'
+            health_check_interval: Seconds between liveness checks
+        """
+        self.database = database
+        # in-memory databases cannot be opened read-only
+        self.read_only = read_only and database != IN_MEMORY
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._connection: duckdb.DuckDBPyConnection | None = None
+        self._pid: int | None = None
+        self._generation = 0
+        self._last_health_check = 0.0
+        self._tables: frozenset[str] | None = None
+        self._tables_generation = 0
+        # generation -> number of threads holding a cursor on its connection
+        self._cursor_counts: dict[int, int] = {}
+        # generation -> reset connection still used by some thread's cursor
+        self._retired: dict[int, duckdb.DuckDBPyConnection] = {}
+        # process the cursor bookkeeping and retired connections belong to
+        self._owner_pid = os.getpid()
+
+    @property
+    def config(self) -> dict[str, int | str]:
+        """DuckDB configuration applied when opening the database."""
+        return {"threads": self.threads, "memory_limit": self.memory_limit}
+
+    def connect(self) -> duckdb.DuckDBPyConnection:
+        """Return the shared database handle, opening it if necessary.
+
+        The handle is reopened after a fork, since DuckDB connections must not
+        be shared between processes.
+
+        Returns:
+            The shared DuckDB connection of this process
+        """
+        with self._lock:
+            if self._owner_pid != os.getpid():
+                # handles and cursors inherited through a fork belong to the parent
+                self._retired.clear()
+                self._cursor_counts.clear()
+                self._owner_pid = os.getpid()
+            if self._connection is None or self._pid != os.getpid():
+                self._open()
+            return self._connection
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Return the cursor of the calling thread.
+
+        Returns:
+            A DuckDB cursor bound to the shared database handle
+        """
+        if self._health_check_due():
+            self.ensure_healthy()
+
+        with self._lock:
+            connection = self.connect()
+            cursor = getattr(self._local, "cursor", None)
+            if cursor is None or self._local.generation != self._generation:
+                if cursor is not None:
+                    self._release_cursor(self._local.generation)
+                cursor = connection.cursor()
+                self._local.cursor = cursor
+                self._local.generation = self._generation
+                self._cursor_counts[self._generation] = (
+                    self._cursor_counts.get(self._generation, 0) + 1
+                )
+            return cursor
+
+    def tables(self) -> frozenset[str]:
+        """Return the names of all tables and views in the database.
+
+        The names are looked up once per opened connection.
+
+        Returns:
+            Set of table and view names
+        """
+        with self._lock:
+            connection = self.connect()
+            if self._tables is None or self._tables_generation != self._generation:
+                cursor = connection.cursor()
+                rows = cursor.execute(
+                    "SELECT table_name FROM information_schema.tables"
+                ).fetchall()
+                cursor.close()
+                self._tables = frozenset(row[0] for row in rows)
+                self._tables_generation = self._generation
+            return self._tables
+
+    def is_healthy(self) -> bool:
+        """Check whether the shared connection can still execute queries.
+
+        Returns:
+            True if a trivial query succeeds, False otherwise
+        """
+        try:
+            cursor = self.connect().cursor()
+            cursor.execute("SELECT 1").fetchone()
+            cursor.close()
+            return True
+        except duckdb.Error as e:
+            logger.warning(f"Health check failed for {self.database}: {e}")
+            return False
+
+    def ensure_healthy(self) -> None:
+        """Reopen the shared connection if the health check fails."""
+        with self._lock:
+            self._last_health_check = time.monotonic()
+            if not self.is_healthy():
+                logger.info(f"Reconnecting to {self.database}...")
+                self.reset()
+
+    def reset(self) -> None:
+        """Drop the shared connection so that the next access reopens it.
+
+        The connection is closed right away unless threads still hold cursors
+        on it; it is then retired and closed once the last of them requests a
+        cursor of the new connection (see cursor).
+        """
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                if self._cursor_counts.get(self._generation):
+                    self._retired[self._generation] = self._connection
+                else:
+                    self._close_connection(self._connection)
+            self._connection = None
+            self._pid = None
+
+    def close(self) -> None:
+        """Close the shared connection and every retired one."""
+        with self._lock:
+            self.reset()
+            if self._owner_pid == os.getpid():
+                for connection in self._retired.values():
+                    self._close_connection(connection)
+            self._retired.clear()
+            self._cursor_counts.clear()
+
+    def _health_check_due(self) -> bool:
+        """Claim the next health check, so that only one thread runs it."""
+        with self._lock:
+            # a freshly opened handle counts as checked
+            self.connect()
+            now = time.monotonic()
+            if now - self._last_health_check <= self.health_check_interval:
+                return False
+            self._last_health_check = now
+            return True
+
+    def _release_cursor(self, generation: int) -> None:
+        """Forget a thread's cursor, closing its retired connection if unused."""
+        count = self._cursor_counts.pop(generation, 0) - 1
+        if count > 0:
+            self._cursor_counts[generation] = count
+            return
+        retired = self._retired.pop(generation, None)
+        if retired is not None:
+            self._close_connection(retired)
+
+    def _close_connection(self, connection: duckdb.DuckDBPyConnection) -> None:
+        """Close a connection of this process, logging failures."""
+        try:
+            connection.close()
+        except duckdb.Error as e:
+            logger.warning(f"Error while closing {self.database}: {e}")
+
+    def _open(self) -> None:
+        """Open the database handle for the current process."""
+        logger.info(
+            f"Opening DuckDB connection to {self.database} "
+            f"(read_only={self.read_only}, threads={self.threads}, "
+            f"memory_limit={self.memory_limit})..."
+        )
+        if is_parquet_dataset(self.database):
+            # Parquet datasets are queried through views of an in-memory database
+            self._connection = duckdb.connect(database=IN_MEMORY, config=self.config)
+            create_dataset_views(self._connection, self.database)
+        else:
+            self._connection = duckdb.connect(
+                database=self.database,
+                read_only=self.read_only,
+                config=self.config,
+            )
+        self._pid = os.getpid()
+        self._generation += 1
+        self._last_health_check = time.monotonic()
+
+
+_managers: dict[str, DuckDBConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(
+    database: str, read_only: bool = True
+) -> DuckDBConnectionManager:
+    """Return the process-wide connection manager for a database.
+
+    Args:
+        database: Path to the DuckDB database file, a partitioned Parquet
+            dataset directory or ':memory:'
+        read_only: Whether to open the database in read-only mode
+
+    Returns:
+        The connection manager shared by all callers of this database
+    """
+    key = database if database == IN_MEMORY else os.path.abspath(database)
+
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = DuckDBConnectionManager(database, read_only=read_only)
+            _managers[key] = manager
+        return manager
+
+
+def close_all_connections() -> None:
+    """Close every managed connection and forget the managers."""
+    with _managers_lock:
+        for manager in _managers.values():
+            manager.close()
+        _managers.clear()
+
+
+atexit.register(close_all_connections)
@@ -1,3 +1,4 @@
+import argparse
 import logging
 import os
 import sys
@@ -6,8 +7,14 @@ import time
 # add the src directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from components.constants import DUCKDB_PATH, PARQUET_SOURCE, RAW_SOURCE, DataSources
-from utils import duckdb_setup, parquet_converter
+from components.constants import (
+    DUCKDB_PATH,
+    PARQUET_DATASET,
+    PARQUET_SOURCE,
+    RAW_SOURCE,
+    DataSources,
+)
+from utils import country_metadata, duckdb_setup, parquet_converter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,19 +27,50 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
-    """Run the DuckDB pipeline to set up a DuckDB database.
+def main(full_rebuild: bool = False, parquet_dataset: bool = False):
+    """Run the DuckDB pipeline to set up or update a DuckDB database.
 
-    The pipeline consists of two steps:
+    The pipeline consists of four steps:
     1. Convert the CSV file to Parquet format.
-    2. Set up a DuckDB database with the Parquet file as the data source.
+    2. Set up a DuckDB database with the Parquet file as the data source,
+       with the rows clustered by year, donor type, category and recipient.
+    3. Build the country-year rollup table that answers map queries.
+    4. Build the country table with the alpha-2 code, flag, name and region
+       of every donor, recipient and map country code.
+
+    Afterwards, the share of row groups that equality filters on the
+    clustering keys have to scan is logged.
 
     Parquet is used as an intermediary step to avoid memory overload when reading large CSV files and typing issues.
+
+    If the database already exists, the pipeline runs incrementally: an
+    unchanged source file is skipped entirely, otherwise only the year
+    partitions whose content changed are replaced in the fact table and the
+    rollup.
+
+    Optionally, the Parquet file is also written as a Year-partitioned dataset,
+    from which the app can serve queries without the database
+    (DATA_BACKEND=parquet).
+
+    Args:
+        full_rebuild: Rebuild the whole database even if it already exists
+        parquet_dataset: Also write the partitioned Parquet dataset
     """
     check_for_source_file()
     logger.info("Starting DuckDB pipeline...")
     start = time.time()
 
+    fingerprint = duckdb_setup.source_fingerprint(RAW_SOURCE)
+    incremental = not full_rebuild and os.path.exists(DUCKDB_PATH)
+    dataset_missing = parquet_dataset and not os.path.isdir(PARQUET_DATASET)
+    if (
+        incremental
+        and not dataset_missing
+        and duckdb_setup.is_source_ingested(DUCKDB_PATH, RAW_SOURCE, fingerprint)
+    ):
+        logger.info(f"{RAW_SOURCE} is unchanged since the last run, nothing to do.")
+        return
+
     logger.info("Converting CSV to Parquet...")
     parquet_converter.convert_csv_to_parquet(
         csv_file=RAW_SOURCE,
@@ -42,16 +80,55 @@ def main():
     end = time.time()
     logger.info(f"CSV to Parquet conversion finished in {end - start:.2f} seconds.")
 
+    if parquet_dataset:
+        logger.info("Writing partitioned Parquet dataset...")
+        parquet_converter.convert_to_partitioned_parquet(
+            parquet_file=PARQUET_SOURCE,
+            dataset_dir=PARQUET_DATASET,
+        )
+
+    if incremental:
+        logger.info("Updating changed year partitions...")
+        start = time.time()
+
+        years = duckdb_setup.ingest_incremental(
+            parquet_path=PARQUET_SOURCE,
+            db_path=DUCKDB_PATH,
+            source=(RAW_SOURCE, fingerprint),
+        )
+
+        end = time.time()
+        logger.info(f"Updated {len(years)} years in {end - start:.2f} seconds.")
+        country_metadata.create_country_table(db_path=DUCKDB_PATH)
+        duckdb_setup.row_group_selectivity(db_path=DUCKDB_PATH)
+        logger.info("DuckDB pipeline completed!")
+        return
+
     logger.info("Setting up DuckDB database...")
     start = time.time()
 
     duckdb_setup.parquet_to_duckdb(
         parquet_path=PARQUET_SOURCE,
         db_path=DUCKDB_PATH,
+        source=(RAW_SOURCE, fingerprint),
     )
 
     end = time.time()
     logger.info(f"DuckDB setup finished in {end - start:.2f} seconds.")
+
+    logger.info("Building rollup table...")
+    start = time.time()
+
+    duckdb_setup.create_rollup_table(db_path=DUCKDB_PATH)
+
+    end = time.time()
+    logger.info(f"Rollup table built in {end - start:.2f} seconds.")
+
+    logger.info("Building country table...")
+    country_metadata.create_country_table(db_path=DUCKDB_PATH)
+
+    logger.info("Checking row group selectivity of the clustered fact table...")
+    duckdb_setup.row_group_selectivity(db_path=DUCKDB_PATH)
     logger.info("DuckDB pipeline completed!")
 
 
@@ -72,4 +149,19 @@ def check_for_source_file():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Build or incrementally update the DuckDB database."
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild the whole database instead of updating changed years",
+    )
+    parser.add_argument(
+        "--parquet-dataset",
+        action="store_true",
+        help="Also write the Year-partitioned Parquet dataset",
+    )
+    args = parser.parse_args()
+
+    main(full_rebuild=args.full, parquet_dataset=args.parquet_dataset)
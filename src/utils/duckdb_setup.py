@@ -1,34 +1,582 @@
+import hashlib
 import logging
+import re
+from typing import Any
 
 import duckdb
 
-from components.constants import COLUMN_TYPES
+from components.constants import (
+    COLUMN_TYPES,
+    ClimateCategories,
+    DatabaseTables,
+    FlowTypes,
+    SchemaDefinition,
+)
+from components.widgets.donor_type import DONOR_TYPE_MAP
 
 logger = logging.getLogger(__name__)
 
+# Values the ENUM columns always hold, also if missing from the current data
+KNOWN_ENUM_VALUES = {
+    "FlowName": FlowTypes.TYPES,
+    "climate_class": ClimateCategories.SUB,
+    "meta_category": ClimateCategories.MAIN,
+    "DonorType": list(DONOR_TYPE_MAP.values()),
+}
 
-def parquet_to_duckdb(parquet_path: str, db_path: str, table_name: str = "my_table"):
+# Min/max statistics of a column segment in pragma_storage_info
+_SEGMENT_STATS = re.compile(
+    r"^\[Min: (?P<min>.*?), Max: (?P<max>.*?)"
+    r"(?:, Has Unicode: \w+, Max String Length: \d+)?\]\[Has Null"
+)
+
+
+def source_fingerprint(path: str, chunk_size: int = 8 * 1024**2) -> str:
+    """Compute the SHA-256 fingerprint of a source file.
+
+    Args:
+        path: Path to the source file
+        chunk_size: Bytes read at a time
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def typed_source(parquet_path: str) -> str:
+    """SQL selecting the schema columns from a Parquet file with their types.
+
+    Args:
+        parquet_path: Path to the Parquet file
+
+    Returns:
+        SELECT statement casting every column to its schema type
+    """
+    columns = ", ".join(
+        f"CAST({col} AS {dtype}) AS {col}" for col, dtype in COLUMN_TYPES.items()
+    )
+    path = parquet_path.replace("'", "''")
+    return f"SELECT {columns} FROM read_parquet('{path}')"
+
+
+def _cluster_order() -> str:
+    """ORDER BY clause writing rows in the clustering order of the fact table."""
+    return f"ORDER BY {', '.join(SchemaDefinition.CLUSTER_KEYS)}"
+
+
+def enum_type(values: list[str]) -> str:
+    """SQL type of an ENUM column holding the given values."""
+    quoted = ", ".join("'" + value.replace("'", "''") + "'" for value in values)
+    return f"ENUM({quoted})"
+
+
+def current_enum_values(
+    con: duckdb.DuckDBPyConnection, table_name: str
+) -> dict[str, list[str]]:
+    """Read the values of the ENUM columns of a table.
+
+    Args:
+        con: Open DuckDB connection
+        table_name: Name of the table
+
+    Returns:
+        Mapping of ENUM columns to their values, empty if the table is missing
+    """
+    columns = con.execute(
+        "SELECT column_name FROM duckdb_columns() "
+        "WHERE table_name = ? AND data_type LIKE 'ENUM(%'",
+        [table_name],
+    ).fetchall()
+    return {
+        column: con.execute(
+            f"SELECT enum_range(ANY_VALUE({column})) FROM {table_name}"
+        ).fetchone()[0]
+        for (column,) in columns
+    }
+
+
+def enum_values(
+    con: duckdb.DuckDBPyConnection,
+    parquet_path: str,
+    current: dict[str, list[str]] | None = None,
+) -> dict[str, list[str]]:
+    """Collect the values of the ENUM columns.
+
+    The values are the union of the known categories, flow types and donor
+    types, the values found in the Parquet file and the current values of an
+    existing table, sorted so that ENUM columns order like text.
+
+    Args:
+        con: Open DuckDB connection
+        parquet_path: Path to the Parquet file
+        current: Current ENUM values of an existing table
+
+    Returns:
+        Mapping of ENUM columns to their values
+    """
+    aggregates = ", ".join(
+        f"list(DISTINCT {column}) FILTER (WHERE {column} IS NOT NULL)"
+        for column in SchemaDefinition.ENUM_COLUMNS
+    )
+    observed = con.execute(
+        f"SELECT {aggregates} FROM ({typed_source(parquet_path)})"
+    ).fetchone()
+    current = current or {}
+    return {
+        column: sorted(
+            set(values or [])
+            | set(KNOWN_ENUM_VALUES.get(column, []))
+            | set(current.get(column, []))
+        )
+        for column, values in zip(SchemaDefinition.ENUM_COLUMNS, observed)
+    }
+
+
+def column_types(enums: dict[str, list[str]]) -> dict[str, str]:
+    """Column types of the fact table with the given ENUM values.
+
+    ENUM columns without any values are kept as VARCHAR.
+
+    Args:
+        enums: Mapping of ENUM columns to their values
+
+    Returns:
+        Mapping of column names to SQL types
+    """
+    return {
+        column: enum_type(enums[column]) if enums.get(column) else dtype
+        for column, dtype in COLUMN_TYPES.items()
+    }
+
+
+def _widen_enum_columns(
+    con: duckdb.DuckDBPyConnection,
+    table_names: list[str],
+    enums: dict[str, list[str]],
+) -> None:
+    """Change the ENUM columns of tables whose values differ from the given ones.
+
+    Columns still stored as VARCHAR, e.g. in databases built before ENUM
+    columns were introduced, are converted as well.
+    """
+    existing = {
+        row[0]
+        for row in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()
+    }
+    for table_name in table_names:
+        if table_name not in existing:
+            continue
+        current = current_enum_values(con, table_name)
+        columns = {
+            row[0]
+            for row in con.execute(
+                "SELECT column_name FROM duckdb_columns() WHERE table_name = ?",
+                [table_name],
+            ).fetchall()
+        }
+        for column, values in enums.items():
+            if values and column in columns and current.get(column) != values:
+                logger.info(f"Updating the values of {table_name}.{column}...")
+                con.execute(
+                    f"ALTER TABLE {table_name} ALTER {column} "
+                    f"SET DATA TYPE {enum_type(values)}"
+                )
+
+
+def _create_ingest_tables(
+    con: duckdb.DuckDBPyConnection,
+    table_name: str,
+    types: dict[str, str] = COLUMN_TYPES,
+) -> None:
+    """Create the fact table and the ingest bookkeeping tables if missing."""
+    columns_sql = ", ".join([f"{col} {dtype}" for col, dtype in types.items()])
+    con.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns_sql})")
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DatabaseTables.INGEST_PARTITIONS} (
+            Year INTEGER PRIMARY KEY,
+            row_count BIGINT,
+            fingerprint HUGEINT,
+            loaded_at TIMESTAMP
+        )
+    """)
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DatabaseTables.INGEST_SOURCES} (
+            path VARCHAR PRIMARY KEY,
+            fingerprint VARCHAR,
+            loaded_at TIMESTAMP
+        )
+    """)
+
+
+def partition_fingerprints(
+    con: duckdb.DuckDBPyConnection, parquet_path: str
+) -> dict[int, tuple[int, int]]:
+    """Fingerprint the rows of each year in a Parquet file.
+
+    The fingerprint of a year is its row count and the sum of the hashes of its
+    rows, which does not depend on the row order. Hashes may change between
+    DuckDB versions; all years are then reloaded once. Rows without a year
+    are not part of any partition.
+
+    Args:
+        con: Open DuckDB connection
+        parquet_path: Path to the Parquet file
+
+    Returns:
+        Mapping of years to (row count, fingerprint)
+    """
+    row_hash = f"hash({', '.join(COLUMN_TYPES)})"
+    rows = con.execute(f"""
+        SELECT Year, COUNT(*), SUM({row_hash}::HUGEINT)
+        FROM ({typed_source(parquet_path)})
+        WHERE Year IS NOT NULL
+        GROUP BY Year
+    """).fetchall()
+    return {year: (count, fingerprint) for year, count, fingerprint in rows}
+
+
+def _record_ingest(
+    con: duckdb.DuckDBPyConnection,
+    fingerprints: dict[int, tuple[int, int]],
+    source: tuple[str, str] | None,
+) -> None:
+    """Store the fingerprints of the loaded partitions and source file."""
+    if fingerprints:
+        con.executemany(
+            f"INSERT OR REPLACE INTO {DatabaseTables.INGEST_PARTITIONS} "
+            "VALUES (?, ?, ?, now())",
+            [
+                [year, count, fingerprint]
+                for year, (count, fingerprint) in fingerprints.items()
+            ],
+        )
+    if source is not None:
+        con.execute(
+            f"INSERT OR REPLACE INTO {DatabaseTables.INGEST_SOURCES} "
+            "VALUES (?, ?, now())",
+            list(source),
+        )
+
+
+def is_source_ingested(db_path: str, path: str, fingerprint: str) -> bool:
+    """Check whether a source file was already ingested in its current state.
+
+    Args:
+        db_path: Path to the DuckDB database file
+        path: Path to the source file
+        fingerprint: Current fingerprint of the source file
+
+    Returns:
+        True if the database holds the source with the same fingerprint
+    """
+    con = duckdb.connect(db_path)
+    try:
+        row = con.execute(
+            f"SELECT fingerprint FROM {DatabaseTables.INGEST_SOURCES} WHERE path = ?",
+            [path],
+        ).fetchone()
+    except duckdb.CatalogException:
+        row = None
+    finally:
+        con.close()
+    return row is not None and row[0] == fingerprint
+
+
+def parquet_to_duckdb(
+    parquet_path: str,
+    db_path: str,
+    table_name: str = DatabaseTables.FACT,
+    source: tuple[str, str] | None = None,
+):
+    """Load a Parquet file into the fact table, replacing its previous content.
+
+    Args:
+        parquet_path: Path to the Parquet file
+        db_path: Path to the DuckDB database file
+        table_name: Name of the fact table
+        source: (path, fingerprint) of the source file to record
+    """
     logger.info(f"Converting {parquet_path} to {db_path}...")
 
     con = duckdb.connect(db_path)
 
-    # create the table with the specified schema
-    columns_sql = ", ".join([f"{col} {dtype}" for col, dtype in COLUMN_TYPES.items()])
-    con.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns_sql})")
+    # recreate the table with the specified schema
+    con.execute(f"DROP TABLE IF EXISTS {table_name}")
+    con.execute(f"DROP TABLE IF EXISTS {DatabaseTables.INGEST_PARTITIONS}")
+    _create_ingest_tables(con, table_name, column_types(enum_values(con, parquet_path)))
 
     # load only the specified columns from Parquet
     columns_str = ", ".join(COLUMN_TYPES.keys())
 
+    # rows are written in clustering order, so that the zone maps of the row
+    # groups cover narrow value ranges
     con.execute(f"""
         INSERT INTO {table_name} ({columns_str})
-        SELECT {columns_str} 
-        FROM read_parquet('{parquet_path}')
+        {typed_source(parquet_path)}
+        {_cluster_order()}
     """)
+    _record_ingest(con, partition_fingerprints(con, parquet_path), source)
 
     con.close()
     logger.info(f"Parquet successfully converted and stored in {db_path}.")
 
 
+def ingest_incremental(
+    parquet_path: str,
+    db_path: str,
+    table_name: str = DatabaseTables.FACT,
+    rollup_table: str = DatabaseTables.ROLLUP,
+    source: tuple[str, str] | None = None,
+) -> list[int]:
+    """Load only the new or changed year partitions of a Parquet file.
+
+    Each year of the file is fingerprinted and compared with the fingerprint
+    recorded when it was last loaded. The rows of new or changed years are
+    replaced in the fact table and in the rollup within one transaction, so
+    readers never see a partially loaded year. Years missing from the file are
+    kept, which allows ingesting files holding only the latest years.
+
+    Args:
+        parquet_path: Path to the Parquet file
+        db_path: Path to the DuckDB database file
+        table_name: Name of the fact table
+        rollup_table: Name of the rollup table to refresh
+        source: (path, fingerprint) of the source file to record
+
+    Returns:
+        The reloaded years
+    """
+    logger.info(f"Ingesting changed partitions of {parquet_path} into {db_path}...")
+
+    con = duckdb.connect(db_path)
+    try:
+        enums = enum_values(
+            con, parquet_path, current=current_enum_values(con, table_name)
+        )
+        _create_ingest_tables(con, table_name, column_types(enums))
+
+        fingerprints = partition_fingerprints(con, parquet_path)
+        loaded = {
+            year: (count, fingerprint)
+            for year, count, fingerprint in con.execute(
+                "SELECT Year, row_count, fingerprint "
+                f"FROM {DatabaseTables.INGEST_PARTITIONS}"
+            ).fetchall()
+        }
+        changed = {
+            year: fingerprint
+            for year, fingerprint in fingerprints.items()
+            if loaded.get(year) != fingerprint
+        }
+        years = sorted(changed)
+        logger.info(
+            f"{len(changed)} of {len(fingerprints)} year partitions changed: {years}"
+        )
+
+        columns_str = ", ".join(COLUMN_TYPES.keys())
+        year_filter = "list_contains(?, Year)"
+        con.execute("BEGIN TRANSACTION")
+        try:
+            if changed:
+                _widen_enum_columns(con, [table_name, rollup_table], enums)
+                con.execute(f"DELETE FROM {table_name} WHERE {year_filter}", [years])
+                con.execute(
+                    f"""
+                    INSERT INTO {table_name} ({columns_str})
+                    SELECT * FROM ({typed_source(parquet_path)})
+                    WHERE {year_filter}
+                    {_cluster_order()}
+                    """,
+                    [years],
+                )
+                _refresh_rollup(con, table_name, rollup_table, year_filter, years)
+            _record_ingest(con, changed, source)
+            con.execute("COMMIT")
+        except duckdb.Error:
+            con.execute("ROLLBACK")
+            raise
+    finally:
+        con.close()
+
+    logger.info(f"Ingested {len(changed)} year partitions into {db_path}.")
+    return years
+
+
+def _zone_maps(
+    con: duckdb.DuckDBPyConnection, table_name: str, column: str
+) -> dict[int, list[tuple[str, str] | None]]:
+    """Read the min/max statistics of the segments of a column per row group.
+
+    Args:
+        con: Open DuckDB connection
+        table_name: Name of the table
+        column: Name of the column
+
+    Returns:
+        Mapping of row group ids to the (min, max) text of their segments,
+        None for segments without usable statistics
+    """
+    segments = con.execute(
+        "SELECT row_group_id, stats FROM pragma_storage_info(?) "
+        "WHERE column_name = ? AND segment_type != 'VALIDITY'",
+        [table_name, column],
+    ).fetchall()
+
+    zone_maps: dict[int, list[tuple[str, str] | None]] = {}
+    for row_group, stats in segments:
+        match = _SEGMENT_STATS.match(stats or "")
+        zone_maps.setdefault(row_group, []).append(
+            (match["min"], match["max"]) if match else None
+        )
+    return zone_maps
+
+
+def _may_contain(zone_map: tuple[str, str] | None, value: Any) -> bool:
+    """Check whether a segment with the given min/max statistics may hold a value."""
+    if zone_map is None:
+        return True
+    low, high = zone_map
+    if isinstance(value, str):
+        # string statistics only keep a prefix of the min and max values
+        return low <= value and value[: len(high)] <= high
+    try:
+        return type(value)(low) <= value <= type(value)(high)
+    except ValueError:
+        return True
+
+
+def row_group_selectivity(
+    db_path: str,
+    table_name: str = DatabaseTables.FACT,
+    columns: list[str] | None = None,
+) -> dict[str, float]:
+    """Measure how well the zone maps of a table prune equality filters.
+
+    For every distinct value of a column, the row groups whose min/max
+    statistics could hold the value are counted. The selectivity of the
+    column is the average share of row groups an equality filter has to
+    scan: close to 1 / (row groups) for a well clustered column and 1 for a
+    column whose values are spread over the whole table.
+
+    Args:
+        db_path: Path to the DuckDB database file
+        table_name: Name of the table
+        columns: Columns to measure, defaults to the clustering keys
+
+    Returns:
+        Mapping of column names to the share of row groups scanned
+    """
+    columns = columns or SchemaDefinition.CLUSTER_KEYS
+
+    con = duckdb.connect(db_path)
+    try:
+        # statistics are only complete for checkpointed row groups
+        con.execute("CHECKPOINT")
+        selectivity = {}
+        for column in columns:
+            zone_maps = _zone_maps(con, table_name, column)
+            values = [
+                value
+                for (value,) in con.execute(
+                    f"SELECT DISTINCT {column} FROM {table_name} "
+                    f"WHERE {column} IS NOT NULL"
+                ).fetchall()
+            ]
+            if not zone_maps or not values:
+                continue
+            scanned = sum(
+                any(_may_contain(segment, value) for segment in segments)
+                for value in values
+                for segments in zone_maps.values()
+            )
+            selectivity[column] = scanned / (len(values) * len(zone_maps))
+            logger.info(
+                f"{table_name}.{column}: equality filters scan "
+                f"{selectivity[column]:.1%} of {len(zone_maps)} row groups "
+                f"({len(values)} distinct values)"
+            )
+    finally:
+        con.close()
+    return selectivity
+
+
+def _rollup_select(source_table: str, where: str = "") -> str:
+    """SQL aggregating the fact table to the rollup granularity."""
+    dimensions = ", ".join(SchemaDefinition.ROLLUP_DIMENSIONS)
+    measures = ", ".join(
+        f"SUM(COALESCE({col}, 0)) AS {col}" for col in SchemaDefinition.ROLLUP_MEASURES
+    )
+    where = f"\n        WHERE {where}" if where else ""
+    return f"""
+        SELECT {dimensions}, {measures}
+        FROM {source_table}{where}
+        GROUP BY {dimensions}
+        ORDER BY Year
+    """
+
+
+def _refresh_rollup(
+    con: duckdb.DuckDBPyConnection,
+    source_table: str,
+    rollup_table: str,
+    year_filter: str,
+    years: list[int],
+) -> None:
+    """Rebuild the rollup rows of the given years, or the whole rollup if missing."""
+    exists = con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+        [rollup_table],
+    ).fetchone()[0]
+    if not exists:
+        con.execute(f"CREATE TABLE {rollup_table} AS {_rollup_select(source_table)}")
+        return
+
+    con.execute(f"DELETE FROM {rollup_table} WHERE {year_filter}", [years])
+    con.execute(
+        f"INSERT INTO {rollup_table} {_rollup_select(source_table, year_filter)}",
+        [years],
+    )
+
+
+def create_rollup_table(
+    db_path: str,
+    source_table: str = DatabaseTables.FACT,
+    rollup_table: str = DatabaseTables.ROLLUP,
+):
+    """Materialise the country-year rollup used to answer map queries.
+
+    The rollup sums the disbursement and Rio marker columns per combination of
+    year, donor, recipient, category, subcategory, flow type and donor type.
+    Every map filter is one of these dimensions, so map queries can be
+    answered from the rollup instead of scanning the full fact table.
+
+    Args:
+        db_path: Path to the DuckDB database file
+        source_table: Fact table to aggregate
+        rollup_table: Name of the rollup table to (re)create
+    """
+    logger.info(f"Building rollup table {rollup_table} from {source_table}...")
+
+    con = duckdb.connect(db_path)
+    con.execute(
+        f"CREATE OR REPLACE TABLE {rollup_table} AS {_rollup_select(source_table)}"
+    )
+
+    source_rows = con.execute(f"SELECT COUNT(*) FROM {source_table}").fetchone()[0]
+    rollup_rows = con.execute(f"SELECT COUNT(*) FROM {rollup_table}").fetchone()[0]
+    con.close()
+
+    logger.info(
+        f"Rollup table {rollup_table} holds {rollup_rows} rows "
+        f"(fact table: {source_rows} rows)."
+    )
+
+
 if __name__ == "__main__":
     from components.constants import DUCKDB_PATH, PARQUET_SOURCE
 
@@ -36,3 +584,4 @@ if __name__ == "__main__":
         parquet_path=PARQUET_SOURCE,
         db_path=DUCKDB_PATH,
     )
+    create_rollup_table(db_path=DUCKDB_PATH)
@@ -0,0 +1,237 @@
+import io
+import logging
+import time
+import zlib
+from collections.abc import Iterator
+from urllib.parse import urlencode
+
+import duckdb
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from werkzeug.datastructures import MultiDict
+
+from components.constants import ExportSettings
+from utils.duckdb_connection import get_connection_manager
+from utils.query_duckdb import (
+    ParameterizedQuery,
+    construct_query,
+    execute_query,
+    route_query,
+)
+
+logger = logging.getLogger(__name__)
+
+# Path of the export endpoint, followed by the export format
+EXPORT_ROUTE = "/export"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting the bytes written since the last drain."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Return and forget the bytes written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _encode_csv(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """Encode record batches as CSV, one chunk per batch."""
+    sink = _ChunkSink()
+    with pa_csv.CSVWriter(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _encode_parquet(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """Encode record batches as Parquet, one row group per batch."""
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield sink.drain()
+    # the footer is written on close
+    yield sink.drain()
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Compress a stream of chunks into a single gzip member."""
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
+
+
+def encode_batches(reader: pa.RecordBatchReader, export_format: str) -> Iterator[bytes]:
+    """Encode a stream of Arrow record batches in an export format.
+
+    Args:
+        reader: Record batches to encode
+        export_format: One of the formats in ExportSettings.FORMATS
+
+    Returns:
+        Iterator over the encoded chunks
+
+    Raises:
+        ValueError: If the export format is unknown
+    """
+    if export_format == "csv":
+        return _encode_csv(reader)
+    if export_format == "csv.gz":
+        return _gzip(_encode_csv(reader))
+    if export_format == "parquet":
+        return _encode_parquet(reader)
+    raise ValueError(f"Invalid export format: {export_format}")
+
+
+def stream_export(
+    duckdb_db: str,
+    query: ParameterizedQuery,
+    export_format: str,
+    batch_rows: int = ExportSettings.BATCH_ROWS,
+) -> Iterator[bytes]:
+    """Stream the result of a query as an encoded file.
+
+    The query is executed right away, so that errors surface before the
+    response starts. Its result is then fetched as Arrow record batches and
+    encoded batch by batch; only one batch is held in memory at a time.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file
+        query: Parameterized query to export
+        export_format: One of the formats in ExportSettings.FORMATS
+        batch_rows: Rows per record batch
+
+    Returns:
+        Iterator over the chunks of the encoded file
+
+    Raises:
+        ValueError: If the export format is unknown
+    """
+    if export_format not in ExportSettings.FORMATS:
+        raise ValueError(f"Invalid export format: {export_format}")
+
+    logger.info(f"Exporting query result from {duckdb_db} as {export_format}...")
+    query = route_query(duckdb_db, query)
+
+    # a dedicated cursor, since the stream outlives the request handler
+    cursor = get_connection_manager(duckdb_db).connect().cursor()
+    try:
+        result = execute_query(cursor, query)
+        # DuckDB 1.5 renamed fetch_record_batch to to_arrow_reader
+        to_reader = (
+            getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        )
+        reader = to_reader(batch_rows)
+    except duckdb.Error:
+        cursor.close()
+        raise
+
+    def chunks() -> Iterator[bytes]:
+        start = time.time()
+        size = 0
+        try:
+            for chunk in encode_batches(reader, export_format):
+                if chunk:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            cursor.close()
+            logger.info(
+                f"Streamed {size / 1024**2:.1f} MiB of {export_format} "
+                f"in {time.time() - start:.2f} seconds"
+            )
+
+    return chunks()
+
+
+def export_filename(selected_years: list[int], export_format: str) -> str:
+    """Generate the filename of an export.
+
+    Args:
+        selected_years: The year range to include in the filename
+        export_format: One of the formats in ExportSettings.FORMATS
+
+    Returns:
+        A formatted filename string
+    """
+    _, extension = ExportSettings.FORMATS[export_format]
+    return f"ClimFinBERT_data_{selected_years[0]}-{selected_years[1]}.{extension}"
+
+
+def build_export_url(
+    export_format: str,
+    selected_years: list[int],
+    selected_categories: list[str] | None = None,
+    selected_subcategories: list[str] | None = None,
+    selected_donor_types: list[str] | None = None,
+    selected_flow_types: list[str] | None = None,
+) -> str:
+    """Build the URL of the export endpoint for a filter selection.
+
+    Args:
+        export_format: One of the formats in ExportSettings.FORMATS
+        selected_years: Range of years selected by the user
+        selected_categories: list of climate categories selected by the user
+        selected_subcategories: list of subcategories selected by the user
+        selected_donor_types: list of donor types selected by the user
+        selected_flow_types: list of flow types selected by the user
+
+    Returns:
+        Relative URL of the export
+    """
+    params = {
+        "start": selected_years[0],
+        "end": selected_years[1],
+        "category": selected_categories or [],
+        "subcategory": selected_subcategories or [],
+        "donor_type": selected_donor_types or [],
+        "flow_type": selected_flow_types or [],
+    }
+    return f"{EXPORT_ROUTE}/{export_format}?{urlencode(params, doseq=True)}"
+
+
+def parse_export_args(args: MultiDict) -> tuple[list[int], ParameterizedQuery]:
+    """Rebuild the filter selection and its query from the export URL.
+
+    Args:
+        args: Query string arguments of the request
+
+    Returns:
+        Tuple of (year range, parameterized query)
+
+    Raises:
+        ValueError: If the year range is missing or a filter value is invalid
+    """
+    try:
+        selected_years = [int(args["start"]), int(args["end"])]
+    except (KeyError, ValueError) as e:
+        raise ValueError("A valid year range is required") from e
+
+    query = construct_query(
+        year_type="timespan",
+        selected_year=selected_years,
+        selected_categories=args.getlist("category"),
+        selected_subcategories=args.getlist("subcategory"),
+        selected_donor_types=args.getlist("donor_type"),
+        selected_flow_types=args.getlist("flow_type"),
+    )
+    return selected_years, query
@@ -0,0 +1,210 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+
+from components.constants import CacheSettings
+from utils.arrow_tables import to_arrow
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two sweeps of the spill directory for expired tables
+SPILL_SWEEP_INTERVAL = 60
+
+
+class FrameStore:
+    """Server-side store for result tables referenced by opaque keys.
+
+    Callbacks keep only the key in a dcc.Store while the table itself stays on
+    the server as an Arrow table. Tables expire after a TTL. When the memory
+    budget is exceeded, the least recently used tables are spilled to Arrow IPC
+    files in the spill directory, from where they are memory-mapped on access.
+
+    The server forks several worker processes and a callback may run on another
+    worker than the one that stored its input. A shared store therefore writes
+    every table to the spill directory as well, where the other workers find it
+    when the key is not in their memory.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = CacheSettings.FRAME_STORE_TTL,
+        max_memory_bytes: int = CacheSettings.FRAME_STORE_MAX_BYTES,
+        spill_dir: str | None = CacheSettings.FRAME_STORE_SPILL_DIR,
+        shared: bool = CacheSettings.FRAME_STORE_SHARED,
+    ):
+        """Initialize an empty frame store.
+
+        Args:
+            ttl_seconds: Seconds a table stays available after it was stored
+            max_memory_bytes: Memory budget for tables held in memory
+            spill_dir: Directory for spilled tables, None to drop them instead
+            shared: Write every table to the spill directory, making it
+                available to other processes
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self.shared = shared
+        self.current_bytes = 0
+
+        # key -> (table, time it was stored)
+        self._entries: OrderedDict[str, tuple[pa.Table, float]] = OrderedDict()
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        data: pd.DataFrame | pa.Table,
+        persist: bool = False,
+        key: str | None = None,
+    ) -> str:
+        """Store a table and return the key referencing it.
+
+        Args:
+            data: DataFrame or Arrow table to store
+            persist: Write the table to the spill directory right away, making
+                it available to other processes even if the store is not shared
+            key: Alphanumeric key to store the table under, replacing a table
+                stored under the same key; a random key if None
+
+        Returns:
+            Opaque key of the stored table
+        """
+        table = to_arrow(data)
+        key = key or uuid.uuid4().hex
+        stored_at = time.time()
+
+        if (persist or self.shared) and self.spill_dir:
+            self._spill(key, table, stored_at)
+
+        with self._lock:
+            self._evict_expired()
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (table, stored_at)
+            self.current_bytes += table.nbytes
+            self._enforce_budget()
+
+        return key
+
+    def get(self, key: str | None) -> pa.Table | None:
+        """Return the table stored under a key.
+
+        Args:
+            key: Key returned by put
+
+        Returns:
+            The Arrow table or None if the key is unknown or expired
+        """
+        if not isinstance(key, str):
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                table, stored_at = entry
+                if stored_at + self.ttl_seconds >= time.time():
+                    self._entries.move_to_end(key)
+                    return table
+                self._remove(key)
+
+        return self._load_spilled(key)
+
+    def get_frame(self, key: str | None) -> pd.DataFrame | None:
+        """Return the table stored under a key as a DataFrame.
+
+        Meant for rendering; callbacks passing data on should use get instead.
+
+        Args:
+            key: Key returned by put
+
+        Returns:
+            The DataFrame or None if the key is unknown or expired
+        """
+        table = self.get(key)
+        return table.to_pandas() if table is not None else None
+
+    def _enforce_budget(self) -> None:
+        """Move the least recently used tables out of memory until within budget."""
+        while self.current_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            key, (table, stored_at) = next(iter(self._entries.items()))
+            if self.spill_dir and not os.path.exists(self._spill_path(key)):
+                self._spill(key, table, stored_at)
+            self._remove(key)
+
+    def _evict_expired(self) -> None:
+        """Drop expired tables from memory and sweep the spill directory.
+
+        The spill directory is only listed once every SPILL_SWEEP_INTERVAL
+        seconds; expired files are ignored by get in the meantime.
+        """
+        now = time.time()
+        stored_before = now - self.ttl_seconds
+        for key in [k for k, (_, at) in self._entries.items() if at < stored_before]:
+            self._remove(key)
+
+        if now - self._last_sweep < SPILL_SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".arrow") and self._is_expired(entry.path, now):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _remove(self, key: str) -> None:
+        """Drop a table from memory."""
+        table, _ = self._entries.pop(key)
+        self.current_bytes -= table.nbytes
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.arrow")
+
+    def _spill(self, key: str, table: pa.Table, stored_at: float) -> None:
+        """Write a table to the spill directory as an Arrow IPC file.
+
+        The file gets the time the table was stored as modification time, from
+        which every process sharing the directory computes its expiry.
+        """
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(key)
+        tmp_path = f"{path}.tmp"
+        with (
+            pa.OSFile(tmp_path, "wb") as sink,
+            pa.ipc.new_file(sink, table.schema) as writer,
+        ):
+            writer.write_table(table)
+        os.utime(tmp_path, (stored_at, stored_at))
+        os.replace(tmp_path, path)
+        logger.debug(f"Spilled frame {key} ({table.nbytes} bytes) to {path}")
+
+    def _load_spilled(self, key: str) -> pa.Table | None:
+        """Memory-map a spilled table if it exists and has not expired."""
+        if not self.spill_dir or not key.isalnum():
+            return None
+
+        path = self._spill_path(key)
+        if not os.path.exists(path) or self._is_expired(path, time.time()):
+            return None
+
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _is_expired(self, path: str, now: float) -> bool:
+        try:
+            return os.path.getmtime(path) + self.ttl_seconds < now
+        except OSError:
+            return True
+
+
+# Frame store shared by all callbacks of this worker process
+frame_store = FrameStore()
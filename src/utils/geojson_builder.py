@@ -0,0 +1,318 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from itertools import pairwise
+from typing import Any
+
+import requests
+
+# add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from components.constants import GEOJSON_URL, GeoJSONSettings
+
+logger = logging.getLogger(__name__)
+
+Point = tuple[float, float]
+
+# Size of a map tile in pixels
+TILE_SIZE = 256
+
+# Decimal places kept per simplification level
+LEVEL_PRECISION = {
+    "low": 2,
+    "medium": 3,
+    "high": 3,
+}
+
+
+def pixel_size(zoom: int) -> float:
+    """Get the width of one screen pixel at the equator in degrees.
+
+    Args:
+        zoom: Map zoom level
+
+    Returns:
+        Width of one pixel in degrees of longitude
+    """
+    return 360 / (TILE_SIZE * 2**zoom)
+
+
+def load_source(source: str) -> dict[str, Any]:
+    """Load the full-resolution GeoJSON from a file or URL.
+
+    Args:
+        source: Path or URL of the GeoJSON
+
+    Returns:
+        The GeoJSON feature collection
+    """
+    if source.startswith(("http://", "https://")):
+        logger.info(f"Downloading GeoJSON from {source}...")
+        response = requests.get(source)
+        response.raise_for_status()
+        return response.json()
+
+    with open(source, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def simplify_line(points: list[Point], tolerance: float) -> list[Point]:
+    """Simplify a line with the Douglas-Peucker algorithm.
+
+    The first and last point are always kept.
+
+    Args:
+        points: Points of the line
+        tolerance: Maximum distance of a dropped point from the simplified line
+
+    Returns:
+        The simplified line
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        max_distance, index = 0.0, None
+        for i in range(first + 1, last):
+            distance = _segment_distance(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+
+        if index is not None and max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _segment_distance(point: Point, start: Point, end: Point) -> float:
+    """Distance of a point from the segment between start and end."""
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    length_squared = dx * dx + dy * dy
+    if length_squared == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_squared))
+    cx, cy = ax + t * dx, ay + t * dy
+    return ((px - cx) ** 2 + (py - cy) ** 2) ** 0.5
+
+
+def _quantize_ring(ring: list[list[float]], precision: int) -> list[Point]:
+    """Round the coordinates of a ring and drop consecutive duplicates."""
+    points: list[Point] = []
+    for x, y, *_ in ring:
+        point = (round(x, precision), round(y, precision))
+        if not points or points[-1] != point:
+            points.append(point)
+    if points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+def _find_junctions(rings: list[list[Point]]) -> set[Point]:
+    """Find the points at which rings start or stop sharing their boundary.
+
+    A point is a junction if the set of rings passing through it differs from
+    that of one of its neighbours on any ring. Shared borders are split at the
+    same junctions in every ring they belong to.
+    """
+    ring_ids: dict[Point, set[int]] = {}
+    for ring_id, ring in enumerate(rings):
+        for point in ring[:-1]:
+            ring_ids.setdefault(point, set()).add(ring_id)
+
+    junctions = set()
+    for ring in rings:
+        open_ring = ring[:-1]
+        for i, point in enumerate(open_ring):
+            previous_point = open_ring[i - 1]
+            next_point = open_ring[(i + 1) % len(open_ring)]
+            if (
+                ring_ids[point] != ring_ids[previous_point]
+                or ring_ids[point] != ring_ids[next_point]
+            ):
+                junctions.add(point)
+    return junctions
+
+
+def simplify_rings(
+    rings: list[list[Point]], tolerance: float
+) -> list[list[Point] | None]:
+    """Simplify rings while keeping their shared borders identical.
+
+    Every ring is split into arcs at the junctions. Each distinct arc is
+    simplified once and reused by all rings it belongs to, so neighbouring
+    countries keep a common border without gaps or overlaps.
+
+    Args:
+        rings: Closed rings whose first and last point are equal
+        tolerance: Douglas-Peucker tolerance in degrees
+
+    Returns:
+        The simplified rings, None for rings that collapsed
+    """
+    junctions = _find_junctions(rings)
+    simplified_arcs: dict[tuple[Point, ...], list[Point]] = {}
+
+    def simplify_arc(arc: list[Point]) -> list[Point]:
+        key = tuple(arc)
+        if key not in simplified_arcs:
+            reversed_key = key[::-1]
+            if reversed_key in simplified_arcs:
+                return simplified_arcs[reversed_key][::-1]
+            simplified_arcs[key] = simplify_line(arc, tolerance)
+        return simplified_arcs[key]
+
+    result = []
+    for ring in rings:
+        open_ring = ring[:-1]
+        starts = [i for i, point in enumerate(open_ring) if point in junctions]
+
+        if not starts:
+            # ring without shared borders, e.g. an island
+            simplified = simplify_arc(ring)
+        else:
+            # rotate the ring so that it starts and ends at a junction
+            open_ring = open_ring[starts[0] :] + open_ring[: starts[0]]
+            rotated = open_ring + [open_ring[0]]
+            breaks = [i for i, point in enumerate(rotated) if point in junctions]
+            simplified = [rotated[0]]
+            for start, end in pairwise(breaks):
+                simplified.extend(simplify_arc(rotated[start : end + 1])[1:])
+
+        result.append(simplified if len(set(simplified)) >= 3 else None)
+    return result
+
+
+def _polygons(geometry: dict[str, Any]) -> list[list[list[list[float]]]]:
+    """Return the polygons of a Polygon or MultiPolygon geometry."""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def simplify_features(
+    geojson: dict[str, Any], tolerance: float, precision: int
+) -> dict[str, Any]:
+    """Build a simplified copy of a country feature collection.
+
+    Polygons whose outer ring collapses are dropped. A country losing all of
+    its polygons keeps the outer ring of its largest one at full resolution, so
+    that no country disappears from the map.
+
+    Args:
+        geojson: Full-resolution feature collection
+        tolerance: Douglas-Peucker tolerance in degrees
+        precision: Decimal places kept in the coordinates
+
+    Returns:
+        The simplified feature collection
+    """
+    rings: list[list[Point]] = []
+    layout = []
+    for feature in geojson["features"]:
+        polygons = []
+        for polygon in _polygons(feature["geometry"]):
+            polygons.append(list(range(len(rings), len(rings) + len(polygon))))
+            rings.extend(_quantize_ring(ring, precision) for ring in polygon)
+        layout.append(polygons)
+
+    simplified = simplify_rings(rings, tolerance)
+
+    features = []
+    for feature, polygons in zip(geojson["features"], layout):
+        coordinates = [
+            [simplified[i] for i in polygon if simplified[i] is not None]
+            for polygon in polygons
+            if simplified[polygon[0]] is not None
+        ]
+        if not coordinates:
+            largest = max(_polygons(feature["geometry"]), key=lambda p: len(p[0]))
+            coordinates = [[largest[0]]]
+
+        features.append(
+            {key: value for key, value in feature.items() if key != "geometry"}
+            | {
+                "geometry": {
+                    "type": "MultiPolygon" if len(coordinates) > 1 else "Polygon",
+                    "coordinates": (
+                        coordinates if len(coordinates) > 1 else coordinates[0]
+                    ),
+                }
+            }
+        )
+
+    return {key: value for key, value in geojson.items() if key != "features"} | {
+        "features": features
+    }
+
+
+def build_levels(
+    source: str = GEOJSON_URL, output_dir: str = GeoJSONSettings.DIRECTORY
+) -> dict[str, str]:
+    """Build one simplified GeoJSON file per simplification level.
+
+    Each level is simplified to one pixel at the highest zoom it serves.
+
+    Args:
+        source: Path or URL of the full-resolution GeoJSON
+        output_dir: Directory to write the levels to
+
+    Returns:
+        Mapping of level names to the written files
+    """
+    geojson = load_source(source)
+    os.makedirs(output_dir, exist_ok=True)
+
+    written = {}
+    for level, max_zoom in GeoJSONSettings.LEVELS.items():
+        simplified = simplify_features(
+            geojson,
+            tolerance=pixel_size(max_zoom),
+            precision=LEVEL_PRECISION[level],
+        )
+        filename = os.path.basename(GeoJSONSettings.get_filename(level))
+        path = os.path.join(output_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(simplified, f, separators=(",", ":"))
+
+        logger.info(
+            f"Wrote level {level} (zoom <= {max_zoom}) to {path} "
+            f"({os.path.getsize(path) / 1024:.0f} KiB)"
+        )
+        written[level] = path
+
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Build pre-simplified country GeoJSON levels for the map."
+    )
+    parser.add_argument(
+        "--source",
+        default=GEOJSON_URL,
+        help="Path or URL of the full-resolution GeoJSON",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=GeoJSONSettings.DIRECTORY,
+        help="Directory to write the simplified levels to",
+    )
+    args = parser.parse_args()
+
+    build_levels(source=args.source, output_dir=args.output_dir)
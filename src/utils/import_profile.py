@@ -0,0 +1,126 @@
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import NamedTuple
+
+# Directory the profiled modules are imported from
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class ImportTime(NamedTuple):
+    """Import time of a module as reported by python -X importtime."""
+
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(lines: Iterable[str]) -> list[ImportTime]:
+    """Parse the output of python -X importtime.
+
+    Args:
+        lines: Lines written to stderr by the interpreter; lines that are not
+            import times are skipped
+
+    Returns:
+        Import time of every module in import order, the depth being the
+        nesting level of the import
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        # the name is indented by two spaces per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append(
+            ImportTime(name.strip(), depth, int(self_us), int(cumulative_us))
+        )
+    return entries
+
+
+def profile_imports(
+    module: str = "app", python: str = sys.executable
+) -> list[ImportTime]:
+    """Import a module in a fresh interpreter and measure every import.
+
+    Args:
+        module: Module to import, relative to the src directory
+        python: Interpreter to profile the import with
+
+    Returns:
+        Import time of every module (see parse_importtime)
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr.splitlines())
+
+
+def total_seconds(entries: list[ImportTime]) -> float:
+    """Sum up the time of all imports, nested imports counted once."""
+    return sum(entry.self_us for entry in entries) / 1e6
+
+
+def format_report(entries: list[ImportTime], top: int = 20) -> str:
+    """Summarise where the import time is spent.
+
+    Args:
+        entries: Import times of every module (see parse_importtime)
+        top: Number of packages and modules listed
+
+    Returns:
+        Report of the total import time, the packages whose own modules took
+        longest and the modules that took longest including their imports
+    """
+    package_us: dict[str, int] = defaultdict(int)
+    for entry in entries:
+        package_us[entry.module.split(".")[0]] += entry.self_us
+    packages = sorted(package_us.items(), key=lambda item: item[1], reverse=True)
+    modules = sorted(entries, key=lambda entry: entry.cumulative_us, reverse=True)
+
+    lines = [
+        f"Imported {len(entries)} modules in {total_seconds(entries):.3f} seconds",
+        "",
+        f"Slowest {top} packages (own modules only):",
+    ]
+    lines += [f"{us / 1000:10.1f} ms  {package}" for package, us in packages[:top]]
+    lines += ["", f"Slowest {top} modules (including their imports):"]
+    lines += [
+        f"{entry.cumulative_us / 1000:10.1f} ms  {entry.module}"
+        for entry in modules[:top]
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report where the import time of the application is spent."
+    )
+    parser.add_argument("--module", default="app", help="Module to import")
+    parser.add_argument(
+        "--top", type=int, default=20, help="Number of packages and modules listed"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Fail if importing the module takes longer than this many seconds",
+    )
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module)
+    print(format_report(entries, top=args.top))
+
+    if args.budget is not None and total_seconds(entries) > args.budget:
+        print(f"\nImport time exceeds the budget of {args.budget:.3f} seconds")
+        sys.exit(1)
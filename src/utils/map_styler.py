@@ -1,11 +1,10 @@
 import logging
-from typing import Any, Literal, Optional
+from typing import Any, Literal
 
-import matplotlib
-import matplotlib.colors as mcolors
-import numpy as np
 from dash_extensions.javascript import assign
 
+from utils.style_statistics import StyleStatistics
+
 logger = logging.getLogger("map_styler")
 
 
@@ -33,113 +32,172 @@ def get_colorscale_for_mode(map_mode: str) -> list[str]:
     )  # Default grayscale
 
 
-def calculate_quartiles(geojson_data: dict) -> dict[str, Any]:
-    """Calculate quartile breakpoints and corresponding colors from GeoJSON data.
+# Classified color modes offered by the color mode selector (see
+# components/widgets/color_mode.py): classification method and number of
+# classes. Only these are computed for every map update and timeline year.
+CLASSIFICATIONS = {
+    "quartile": ("quantile", 4),
+}
+
+
+def interpolate_colors(colorscale: list[str], n_colors: int) -> list[str]:
+    """Interpolate a color scale to a number of distinct colors.
+
+    The colors are spaced evenly along the gradient and interpolated linearly
+    in RGB between its stops, like a matplotlib LinearSegmentedColormap.
 
     Args:
-        geojson_data: GeoJSON data with values to analyze
+        colorscale: List of hex color codes of the gradient
+        n_colors: Number of colors to generate
 
     Returns:
-        Dictionary with quartile breaks and colors
+        List of n_colors hex color codes
     """
-    # Extract values from GeoJSON features
-    values = [
-        feature["properties"].get("value")
-        for feature in geojson_data["features"]
-        if feature["properties"].get("value") is not None
-    ]
+    if len(colorscale) == n_colors:
+        return list(colorscale)
+
+    stops = [_hex_to_rgb(color) for color in colorscale]
+    if n_colors == 1:
+        return [_rgb_to_hex(stops[-1])]
+
+    # positions of the stops and colors in units of color indices, computed
+    # in the same order as matplotlib to round to the same hex codes
+    last = n_colors - 1
+    stop_step = 1 / (len(stops) - 1)
+    color_step = 1 / last
+    positions = [j * stop_step * last for j in range(len(stops) - 1)] + [last]
+
+    colors = [_rgb_to_hex(stops[0])]
+    for i in range(1, last):
+        x = last * (i * color_step)
+        upper = next(j for j, position in enumerate(positions) if position >= x)
+        fraction = (x - positions[upper - 1]) / (
+            positions[upper] - positions[upper - 1]
+        )
+        colors.append(
+            _rgb_to_hex(
+                tuple(
+                    fraction * (end - start) + start
+                    for start, end in zip(stops[upper - 1], stops[upper])
+                )
+            )
+        )
+    colors.append(_rgb_to_hex(stops[-1]))
+    return colors
 
-    logger.info(
-        f"Extracted {len(values)} values from geojson_data for quartile calculation."
-    )
-    if not values:
-        logger.warning("No values found in geojson_data for quartile calculation.")
-        return {
-            "min_val": 0,
-            "max_val": 1000,
-            "quartile_breaks": [],
-            "quartile_colors": [],
-        }
 
-    # Calculate value range and quartiles
-    min_val = min(values)
-    max_val = max(values)
-    q1 = np.percentile(values, 25)
-    q2 = np.percentile(values, 50)
-    q3 = np.percentile(values, 75)
+def _hex_to_rgb(color: str) -> tuple[float, ...]:
+    """Convert a hex color code to RGB channels between 0 and 1."""
+    color = color.lstrip("#")
+    return tuple(int(color[i : i + 2], 16) / 255 for i in (0, 2, 4))
 
-    logger.info(
-        f"Quartile calculation: min={min_val}, q1={q1}, q2={q2}, q3={q3}, max={max_val}"
-    )
 
-    return {
-        "min_val": min_val,
-        "max_val": max_val,
-        "quartile_breaks": [min_val, q1, q2, q3, max_val],
-        "quartile_colors": [],  # To be filled by caller
-    }
+def _rgb_to_hex(rgb: tuple[float, ...]) -> str:
+    """Convert RGB channels between 0 and 1 to a hex color code."""
+    return "#" + "".join(f"{round(channel * 255):02x}" for channel in rgb)
 
 
-def create_continuous_style_handler() -> Any:
-    """Create a JavaScript function for continuous color styling.
+# Name of the style handler in src/assets/dashExtensions_default.js
+VALUES_STYLE_HANDLER = "valuesStyle"
 
-    Returns:
-        JavaScript function for continuous color styling
-    """
-    return assign("""function(feature, context) {
-        const { min, max, colorscale, style, polyColoring } = context.hideout;
-        const value = feature.properties[polyColoring];
-        if (value === null || value === undefined) {
-            style.fillColor = "#A9A9A9";
-            return style;
-        }
-        const normalized = Math.min(Math.max((value - min) / (max - min), 0), 1);
-        const color = chroma.scale(colorscale).domain([0, 1])(normalized).hex();
-        style.fillColor = color;
-        return style;
-    }""")
 
+def create_values_style_handler() -> Any:
+    """Create the JavaScript function styling countries by their value.
 
-def create_quartile_style_handler() -> Any:
-    """Create a JavaScript function for quartile-based color styling.
+    The country geometry is loaded once, the values arrive as a compact
+    {iso3: value} mapping in hideout.values. Without values (base mode) the
+    base style is applied; countries without a value are hidden and, as the
+    layer redraws its features whenever the hideout changes, not interactive,
+    so they neither highlight on hover nor open an infobox.
 
     Returns:
-        JavaScript function for quartile-based color styling
+        JavaScript function for continuous and classified color styling
     """
-    return assign("""function(feature, context) {
-        const { min, max, style, polyColoring, quartile_breaks, quartile_colors } = context.hideout;
-        const value = feature.properties[polyColoring];
+    return assign(
+        """function(feature, context) {
+        const { values, style, colorMode, min, max, colorscale, class_breaks, class_colors } = context.hideout;
+        if (!values) {
+            return style;
+        }
 
+        const value = values[feature.id];
         if (value === null || value === undefined) {
-            style.fillColor = "#A9A9A9";
-            return style;
+            return Object.assign({}, style, { opacity: 0, fillOpacity: 0, interactive: false });
         }
 
-        // Find which quartile the value belongs to
-        let colorIndex = 0;
-        for (let i = 1; i < quartile_breaks.length; i++) {
-            if (value <= quartile_breaks[i]) {
-                colorIndex = i - 1;
-                break;
+        if (colorMode !== "continuous") {
+            // Find which class the value belongs to
+            let colorIndex = 0;
+            for (let i = 1; i < class_breaks.length; i++) {
+                if (value <= class_breaks[i]) {
+                    colorIndex = i - 1;
+                    break;
+                }
             }
+            return Object.assign({}, style, { fillColor: class_colors[colorIndex] });
         }
 
-        style.fillColor = quartile_colors[colorIndex];
-        return style;
-    }""")
+        const normalized = max > min ? Math.min(Math.max((value - min) / (max - min), 0), 1) : 0.5;
+        const color = chroma.scale(colorscale).domain([0, 1])(normalized).hex();
+        return Object.assign({}, style, { fillColor: color });
+    }""",
+        name=VALUES_STYLE_HANDLER,
+    )
+
+
+def build_map_styling(
+    map_mode: str, statistics: StyleStatistics | None = None
+) -> dict[str, Any]:
+    """Build the styling of map values for every color mode at once.
+
+    The browser combines the styling with the selected color mode into the
+    hideout of the countries layer (see src/assets/clientside.js), so
+    switching the color mode needs no server round-trip.
+
+    Args:
+        map_mode: The mode of the map visualization
+        statistics: Memoised statistics of the map values (see
+            get_style_statistics)
+
+    Returns:
+        Dictionary with the base style, color scale and value range, and the
+        class breaks and colors of each classified color mode
+    """
+    style_info = style_map(map_mode, "continuous", statistics)
+
+    classifications = {}
+    if map_mode != "base" and statistics is not None and statistics.count:
+        for color_mode, (method, n_classes) in CLASSIFICATIONS.items():
+            class_breaks = statistics.breaks(n_classes, method)
+            classifications[color_mode] = {
+                "class_breaks": class_breaks,
+                "class_colors": interpolate_colors(
+                    style_info["colorscale"], len(class_breaks) - 1
+                ),
+            }
+
+    return {
+        "style": style_info["style"],
+        "colorscale": style_info["colorscale"],
+        "min": style_info["min"],
+        "max": style_info["max"],
+        "classifications": classifications,
+    }
 
 
 def style_map(
     map_mode: Literal["base", "total", "rio_oecd", "rio_climfinbert", "rio_diff"],
-    color_mode: Literal["continuous", "quartile"] = "continuous",
-    geojson_data: Optional[dict] = None,
+    color_mode: str = "continuous",
+    statistics: StyleStatistics | None = None,
 ) -> dict[str, Any]:
     """Generate style configuration for map rendering.
 
     Args:
         map_mode: The mode of the map visualization
-        color_mode: Whether to use continuous or quartile-based coloring
-        geojson_data: The GeoJSON data used to calculate quartiles
+        color_mode: 'continuous' or a classified mode from CLASSIFICATIONS, e.g.
+            'quartile'
+        statistics: Memoised statistics of the map values (see
+            get_style_statistics) providing the value range and class breaks
 
     Returns:
         Dictionary containing style configuration
@@ -159,62 +217,34 @@ def style_map(
 
     # Get the color scale for this visualization mode
     colorscale = get_colorscale_for_mode(map_mode)
-    logger.info(f"Using colorscale: {colorscale}")
 
     # Default values (will be overridden if data is provided)
     min_val = 0
     max_val = 1000
-    quartile_breaks = []
-    quartile_colors = []
-
-    # Calculate quartiles if we have data and are using quartile coloring
-    if geojson_data and color_mode == "quartile":
-        logger.info("Calculating quartiles for quartile color mode.")
-        quartile_data = calculate_quartiles(geojson_data)
-        min_val = quartile_data["min_val"]
-        max_val = quartile_data["max_val"]
-        quartile_breaks = quartile_data["quartile_breaks"]
-
-        # Always generate 4 distinct quartile colors, even if colorscale has < 4 colors
-        if len(colorscale) >= 4:
-            quartile_colors = colorscale[:4]
-        else:
-            # Interpolate colors to get 4 distinct quartile colors
-            cmap = mcolors.LinearSegmentedColormap.from_list(
-                "quartile", colorscale, N=4
-            )
-            quartile_colors = [matplotlib.colors.rgb2hex(cmap(i / 3)) for i in range(4)]
-        logger.info(f"Quartile breaks: {quartile_breaks}")
-        logger.info(f"Quartile colors: {quartile_colors}")
-
-    # For continuous mode, calculate min/max from data if available
-    if geojson_data and color_mode == "continuous":
-        values = [
-            feature["properties"].get("value")
-            for feature in geojson_data["features"]
-            if feature["properties"].get("value") is not None
-        ]
-        if values:
-            min_val = min(values)
-            max_val = max(values)
-            logger.info(f"Continuous mode value range: min={min_val}, max={max_val}")
-        else:
-            logger.warning("No values found in geojson_data for continuous mode.")
+    class_breaks = []
+    class_colors = []
+
+    if statistics is not None and statistics.count:
+        min_val = statistics.min
+        max_val = statistics.max
+
+        # Derive the class breaks from the sorted values of the statistics
+        if color_mode in CLASSIFICATIONS:
+            method, n_classes = CLASSIFICATIONS[color_mode]
+            class_breaks = statistics.breaks(n_classes, method)
+            class_colors = interpolate_colors(colorscale, len(class_breaks) - 1)
+    else:
+        logger.warning("No values found for styling the map.")
 
     # Base style for all features
     style = dict(weight=2, opacity=1, color="#23436b", dashArray="3", fillOpacity=0.7)
 
-    # Different style handlers for continuous vs. quartile coloring
-    style_handle = (
-        create_continuous_style_handler()
-        if color_mode == "continuous"
-        else create_quartile_style_handler()
-    )
+    # One style handler reads the values and color mode from the hideout
+    style_handle = create_values_style_handler()
 
-    # Return the complete style configuration
     logger.info(
         f"Returning style config: min={min_val}, max={max_val}, "
-        f"quartile_breaks={quartile_breaks}, quartile_colors={quartile_colors}"
+        f"class_breaks={class_breaks}, class_colors={class_colors}"
     )
     return {
         "style": style,
@@ -223,6 +253,6 @@ def style_map(
         "classes": [],
         "min": min_val,
         "max": max_val,
-        "quartile_breaks": quartile_breaks,
-        "quartile_colors": quartile_colors,
+        "class_breaks": class_breaks,
+        "class_colors": class_colors,
     }
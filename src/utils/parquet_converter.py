@@ -1,8 +1,12 @@
 import logging
+import os
+import time
 
+import duckdb
 import polars as pl
 
-from components.constants import PARQUET_SOURCE, RAW_SOURCE
+from components.constants import PARQUET_SOURCE, RAW_SOURCE, ParquetDatasetSettings
+from utils.duckdb_setup import typed_source
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,63 @@ def convert_csv_to_parquet(
     logger.info("Conversion completed successfully!")
 
 
+def convert_to_partitioned_parquet(
+    parquet_file: str,
+    dataset_dir: str,
+    partition_by: tuple[str, ...] = ParquetDatasetSettings.PARTITION_BY,
+    sort_by: tuple[str, ...] = ParquetDatasetSettings.SORT_BY,
+    row_group_size: int = ParquetDatasetSettings.ROW_GROUP_SIZE,
+) -> int:
+    """Write a Parquet file as a Hive-partitioned dataset.
+
+    Each combination of the partition columns gets its own directory, e.g.
+    'Year=2020/data_0.parquet', so queries filtering on them only open the
+    matching files. Within a partition the rows are sorted, which keeps the
+    min/max statistics of the row groups narrow. The dataset directory is
+    replaced as a whole.
+
+    Args:
+        parquet_file: Path to the source Parquet file
+        dataset_dir: Directory of the resulting dataset
+        partition_by: Columns to partition by, e.g. ('Year', 'DonorType')
+        sort_by: Columns to sort the rows of each partition by
+        row_group_size: Rows per Parquet row group
+
+    Returns:
+        Number of Parquet files written
+    """
+    logger.info(
+        f"Writing {parquet_file} to {dataset_dir}, "
+        f"partitioned by {', '.join(partition_by)}..."
+    )
+    start = time.time()
+
+    order_by = ", ".join([*partition_by, *sort_by])
+    target = dataset_dir.replace("'", "''")
+    con = duckdb.connect()
+    try:
+        con.execute(f"""
+            COPY ({typed_source(parquet_file)} ORDER BY {order_by})
+            TO '{target}' (
+                FORMAT parquet,
+                PARTITION_BY ({", ".join(partition_by)}),
+                ROW_GROUP_SIZE {int(row_group_size)},
+                COMPRESSION zstd,
+                OVERWRITE
+            )
+        """)
+    finally:
+        con.close()
+
+    files = sum(
+        name.endswith(".parquet")
+        for _, _, names in os.walk(dataset_dir)
+        for name in names
+    )
+    logger.info(f"Wrote {files} Parquet files in {time.time() - start:.2f} seconds.")
+    return files
+
+
 if __name__ == "__main__":
     convert_csv_to_parquet(
         csv_file=RAW_SOURCE,
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+
+import duckdb
+
+from components.constants import QUERY_DATABASE, PrefetchSettings
+from utils.duckdb_connection import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+
+def upcoming_years(year: int, first: int, last: int, count: int) -> list[int]:
+    """List the years playback shows after a year, looping back to the first.
+
+    Args:
+        year: Current playback year
+        first: First year of the slider
+        last: Last year of the slider
+        count: Number of upcoming years
+
+    Returns:
+        The next years in playback order, without the current year
+    """
+    span = last - first + 1
+    return [
+        first + (year - first + step) % span
+        for step in range(1, min(count, span - 1) + 1)
+    ]
+
+
+class _PrefetchRun:
+    """Years queued for one session and the state of the thread warming them."""
+
+    def __init__(self, signature: Hashable, warm: Callable[[int], int]):
+        self.signature = signature
+        self.warm = warm
+        self.pending: deque[int] = deque()
+        self.queued: set[int] = set()
+        self.cancelled = threading.Event()
+        self.cursor: duckdb.DuckDBPyConnection | None = None
+        self.bytes = 0
+
+
+class PlaybackPrefetcher:
+    """Warms the data of the upcoming years while a session plays the map.
+
+    Each session gets at most one background thread, which computes the
+    queued years one after another. Queueing years for other filters, or
+    stopping playback, cancels the run and interrupts its running query.
+    """
+
+    def __init__(
+        self,
+        duckdb_db: str,
+        max_bytes: int = PrefetchSettings.MAX_BYTES,
+        max_runs: int = PrefetchSettings.MAX_RUNS,
+    ):
+        """Initialize a prefetcher without running threads.
+
+        Args:
+            duckdb_db: Path to the DuckDB database file the years are queried from
+            max_bytes: Size of the results a single run may add before it stops
+            max_runs: Number of runs executed at the same time
+        """
+        self.duckdb_db = duckdb_db
+        self.max_bytes = max_bytes
+        self.max_runs = max_runs
+
+        self._runs: dict[str, _PrefetchRun] = {}
+        self._lock = threading.Lock()
+
+    def schedule(
+        self,
+        session_id: str,
+        signature: Hashable,
+        years: list[int],
+        warm: Callable[[int], int],
+    ) -> None:
+        """Queue years to be warmed for a session.
+
+        Args:
+            session_id: Identifier of the browser session
+            signature: Filters the years are warmed for, except the year
+            years: Years to warm, in playback order
+            warm: Computes the data of a year and returns the size of the
+                results it added in bytes
+        """
+        with self._lock:
+            run = self._runs.get(session_id)
+            if run is not None and run.signature != signature:
+                self._cancel(session_id)
+                run = None
+
+            if run is None:
+                if len(self._runs) >= self.max_runs:
+                    logger.info("Skipping prefetch, too many runs in progress")
+                    return
+                run = _PrefetchRun(signature, warm)
+                self._runs[session_id] = run
+                thread = threading.Thread(
+                    target=self._work, args=(session_id, run), daemon=True
+                )
+                start = True
+            else:
+                start = False
+
+            for year in years:
+                if year not in run.queued:
+                    run.queued.add(year)
+                    run.pending.append(year)
+
+        if start:
+            thread.start()
+
+    def cancel(self, session_id: str | None) -> None:
+        """Stop warming years for a session.
+
+        Args:
+            session_id: Identifier of the browser session
+        """
+        with self._lock:
+            self._cancel(session_id)
+
+    def active_runs(self) -> int:
+        """Return the number of runs in progress."""
+        with self._lock:
+            return len(self._runs)
+
+    def _cancel(self, session_id: str | None) -> None:
+        """Cancel the run of a session, holding the lock."""
+        run = self._runs.pop(session_id, None)
+        if run is None:
+            return
+        run.cancelled.set()
+        if run.cursor is not None:
+            run.cursor.interrupt()
+        logger.info(f"Cancelled prefetching for session {session_id}")
+
+    def _work(self, session_id: str, run: _PrefetchRun) -> None:
+        """Warm the queued years of a run until the queue is empty."""
+        cursor = get_connection_manager(self.duckdb_db).cursor()
+        with self._lock:
+            if run.cancelled.is_set():
+                return
+            # the cursor of this thread runs the queries of warm
+            run.cursor = cursor
+
+        while True:
+            with self._lock:
+                over_budget = run.bytes >= self.max_bytes
+                if run.cancelled.is_set() or not run.pending or over_budget:
+                    if over_budget:
+                        logger.info(f"Prefetched {run.bytes} bytes, stopping")
+                    if self._runs.get(session_id) is run:
+                        del self._runs[session_id]
+                    return
+                year = run.pending.popleft()
+
+            start = time.time()
+            try:
+                run.bytes += run.warm(year)
+            except duckdb.InterruptException:
+                continue
+            except Exception:
+                logger.warning(f"Prefetching year {year} failed", exc_info=True)
+                continue
+            logger.info(f"Prefetched year {year} in {time.time() - start:.2f} seconds")
+
+
+# Prefetcher of the sessions served by this worker process
+playback_prefetcher = PlaybackPrefetcher(QUERY_DATABASE)
@@ -1,14 +1,26 @@
 import logging
+import re
+import threading
 import time
-from typing import Literal, Optional, Tuple
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Literal, Optional, Tuple
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
 
+from components.constants import DatabaseTables, JobSettings, SchemaDefinition
 from components.widgets.donor_type import DONOR_TYPE_MAP
+from utils.duckdb_connection import get_connection_manager
+from utils.result_cache import database_version, result_cache
 
 logger = logging.getLogger(__name__)
 
+# Formats in which query results can be fetched
+ResultFormat = Literal["pandas", "arrow"]
+
 
 def ensure_list(value: Optional[str | list[str]]) -> list[str]:
     """Convert a single value or list to a list, handling None values.
@@ -25,7 +37,10 @@ def ensure_list(value: Optional[str | list[str]]) -> list[str]:
 
 
 def format_value_list(values: list[str]) -> str:
-    """Format a list of values for inclusion in SQL query.
+    """Format a list of values as quoted SQL string literals.
+
+    Embedded single quotes are escaped by doubling them. Queries should bind
+    values as parameters instead; this is meant for messages and logging.
 
     Args:
         values: List of string values
@@ -33,7 +48,8 @@ def format_value_list(values: list[str]) -> str:
     Returns:
         Comma-separated string of quoted values
     """
-    return ", ".join(f"'{val}'" for val in values)
+    escaped = (str(val).replace("'", "''") for val in values)
+    return ", ".join(f"'{val}'" for val in escaped)
 
 
 def validate_donor_types(selected_donor_types: list[str]) -> None:
@@ -50,111 +66,214 @@ def validate_donor_types(selected_donor_types: list[str]) -> None:
     ]
 
     if invalid_donor_types:
-        allowed_values = ", ".join(f"'{val}'" for val in DONOR_TYPE_MAP.values())
+        allowed_values = format_value_list(list(DONOR_TYPE_MAP.values()))
         raise ValueError(
             f"Invalid donor types selected: {invalid_donor_types}. Only {allowed_values} are allowed."
         )
 
 
-def add_year_filter(
-    query: str, year_type: str, selected_year: int | Tuple[int, int]
-) -> str:
-    """Add year filter clause to a query.
-
-    Args:
-        query: Base SQL query
-        year_type: Type of year filter ('single_year' or 'timespan')
-        selected_year: Year value or range tuple
-
-    Returns:
-        Query with year filter added
-    """
-    if year_type == "single_year":
-        return query + f"\nWHERE Year = {selected_year}\n"
-    elif year_type == "timespan":
-        return (
-            query
-            + f"\nWHERE Year >= {selected_year[0]} AND Year <= {selected_year[1]}\n"
-        )
-    else:
-        raise ValueError(f"Invalid year_type: {year_type}")
-
-
-def add_category_filter(query: str, categories: list[str]) -> str:
-    """Add category filter to a query.
-
-    Args:
-        query: SQL query to modify
-        categories: List of categories to filter by
+@dataclass(frozen=True)
+class ParameterizedQuery:
+    """SQL template together with the values bound to its placeholders.
 
-    Returns:
-        Query with category filter added
+    Besides the SQL, the query records the table it reads from and the columns
+    it references (None if unknown, e.g. for 'SELECT *'), which allows routing
+    it to another table holding the same columns.
     """
-    if not categories:
-        return query
-
-    category_list = format_value_list(categories)
-    return query + f" AND meta_category IN ({category_list})"
-
-
-def add_subcategory_filter(query: str, subcategories: list[str]) -> str:
-    """Add subcategory filter to a query.
 
-    Args:
-        query: SQL query to modify
-        subcategories: List of subcategories to filter by
+    sql: str
+    params: list[Any] = field(default_factory=list)
+    table: str = DatabaseTables.FACT
+    columns: frozenset[str] | None = None
+
+    def retarget(self, table: str) -> "ParameterizedQuery":
+        """Return the same query reading from another table.
+
+        Args:
+            table: Table to read from instead
+
+        Returns:
+            The query with its FROM clause replaced
+        """
+        sql = re.sub(
+            rf"^FROM {re.escape(self.table)}$",
+            f"FROM {table}",
+            self.sql,
+            count=1,
+            flags=re.MULTILINE,
+        )
+        return replace(self, sql=sql, table=table)
 
-    Returns:
-        Query with subcategory filter added
-    """
-    if not subcategories:
-        return query
+    def limit(self, rows: int) -> "ParameterizedQuery":
+        """Return the same query returning at most the given number of rows.
 
-    subcategory_list = format_value_list(subcategories)
-    return query + f" AND climate_class IN ({subcategory_list})"
+        Args:
+            rows: Maximum number of rows
 
+        Returns:
+            The query with a LIMIT clause appended
+        """
+        return replace(self, sql=f"{self.sql}\nLIMIT ?", params=[*self.params, rows])
 
-def add_flow_type_filter(query: str, flow_types: list[str]) -> str:
-    """Add flow type filter to a query.
 
-    Args:
-        query: SQL query to modify
-        flow_types: List of flow types to filter by
+class QueryBuilder:
+    """Builder for SQL queries whose filter values are bound as parameters.
 
-    Returns:
-        Query with flow type filter added
+    Filter values never become part of the SQL text. Every active filter adds a
+    placeholder instead, so all filter selections of the same shape share one
+    SQL template that only has to be parsed once.
     """
-    if not flow_types:
-        return query
-
-    flow_type_list = format_value_list(flow_types)
-    return query + f" AND FlowName IN ({flow_type_list})"
-
 
-def add_donor_type_filter(query: str, donor_types: list[str]) -> str:
-    """Add donor type filter to a query.
-
-    Args:
-        query: SQL query to modify
-        donor_types: List of donor types to filter by
-
-    Returns:
-        Query with donor type filter added
-
-    Raises:
-        ValueError: If any donor type is invalid
-    """
-    if not donor_types:
-        return query
+    def __init__(
+        self,
+        select: str,
+        table: str = DatabaseTables.FACT,
+        columns: Iterable[str] | None = None,
+    ):
+        """Start a query selecting from a table.
+
+        Args:
+            select: Column list of the SELECT clause
+            table: Table to select from
+            columns: Columns referenced by the SELECT clause, None if unknown
+        """
+        self.select = select
+        self.table = table
+        self.columns = set(columns) if columns is not None else None
+        self.conditions: list[str] = []
+        self.params: list[Any] = []
+        self.group_by_columns: list[str] = []
+        self.order_by_clause: str | None = None
+
+    def where_year(
+        self, year_type: str, selected_year: int | tuple[int, int]
+    ) -> "QueryBuilder":
+        """Add a year filter.
+
+        Args:
+            year_type: Type of year filter ('single_year' or 'timespan')
+            selected_year: Year value or range tuple
+
+        Returns:
+            The builder itself for chaining
+
+        Raises:
+            ValueError: If year_type is invalid
+        """
+        self._reference("Year")
+        if year_type == "single_year":
+            self.conditions.append("Year = ?")
+            self.params.append(int(selected_year))
+        elif year_type == "timespan":
+            self.conditions.append("Year >= ? AND Year <= ?")
+            self.params.extend([int(selected_year[0]), int(selected_year[1])])
+        else:
+            raise ValueError(f"Invalid year_type: {year_type}")
+        return self
+
+    def where_in(self, column: str, values: str | list[str] | None) -> "QueryBuilder":
+        """Restrict a column to a list of values, skipped if no values are given.
+
+        Args:
+            column: Column to filter
+            values: Allowed values
+
+        Returns:
+            The builder itself for chaining
+        """
+        values = ensure_list(values)
+        if values:
+            self._reference(column)
+            self.conditions.append(f"list_contains(?, {column})")
+            self.params.append(list(values))
+        return self
+
+    def where_donor_types(self, donor_types: str | list[str] | None) -> "QueryBuilder":
+        """Restrict the query to valid donor types.
+
+        Args:
+            donor_types: Donor types to filter by
+
+        Returns:
+            The builder itself for chaining
+
+        Raises:
+            ValueError: If any donor type is invalid
+        """
+        donor_types = ensure_list(donor_types)
+        if donor_types:
+            validate_donor_types(donor_types)
+        return self.where_in("DonorType", donor_types)
+
+    def where_filters(
+        self,
+        selected_categories: str | list[str] | None = None,
+        selected_subcategories: str | list[str] | None = None,
+        selected_donor_types: str | list[str] | None = None,
+        selected_flow_types: str | list[str] | None = None,
+    ) -> "QueryBuilder":
+        """Add the category, subcategory, flow type and donor type filters.
+
+        Args:
+            selected_categories: Categories to filter by
+            selected_subcategories: Subcategories to filter by
+            selected_donor_types: Donor types to filter by
+            selected_flow_types: Flow types to filter by
+
+        Returns:
+            The builder itself for chaining
+        """
+        return (
+            self.where_in("meta_category", selected_categories)
+            .where_in("climate_class", selected_subcategories)
+            .where_in("FlowName", selected_flow_types)
+            .where_donor_types(selected_donor_types)
+        )
 
-    # Validate donor types
-    validate_donor_types(donor_types)
+    def group_by(self, *columns: str) -> "QueryBuilder":
+        """Group the result by the given columns.
+
+        Returns:
+            The builder itself for chaining
+        """
+        for column in columns:
+            self._reference(column)
+        self.group_by_columns.extend(columns)
+        return self
+
+    def order_by(self, clause: str) -> "QueryBuilder":
+        """Order the result by the given clause.
+
+        Returns:
+            The builder itself for chaining
+        """
+        self.order_by_clause = clause
+        return self
+
+    def build(self) -> ParameterizedQuery:
+        """Assemble the SQL template and its parameters.
+
+        Returns:
+            The parameterized query
+        """
+        sql = f"SELECT {self.select}\nFROM {self.table}"
+        if self.conditions:
+            sql += "\nWHERE " + "\n  AND ".join(self.conditions)
+        if self.group_by_columns:
+            sql += "\nGROUP BY " + ", ".join(self.group_by_columns)
+        if self.order_by_clause:
+            sql += f"\nORDER BY {self.order_by_clause}"
+        return ParameterizedQuery(
+            sql=sql,
+            params=list(self.params),
+            table=self.table,
+            columns=frozenset(self.columns) if self.columns is not None else None,
+        )
 
-    # Add appropriate IN or = clause based on number of donor types
-    if len(donor_types) > 1:
-        return query + f" AND DonorType IN {tuple(donor_types)}"
-    else:
-        return query + f" AND DonorType = '{donor_types[0]}'"
+    def _reference(self, column: str) -> None:
+        """Record a column referenced by the query."""
+        if self.columns is not None:
+            self.columns.add(column)
 
 
 def construct_query(
@@ -164,7 +283,7 @@ def construct_query(
     selected_subcategories: Optional[str | list[str]] = None,
     selected_donor_types: Optional[str | list[str]] = None,
     selected_flow_types: Optional[str | list[str]] = None,
-) -> str:
+) -> ParameterizedQuery:
     """Construct an SQL query based on the selected filters.
 
     Args:
@@ -176,30 +295,22 @@ def construct_query(
         selected_flow_types: Flow types to filter by
 
     Returns:
-        Complete SQL query string
+        Parameterized SQL query
 
     Raises:
         ValueError: If year_type is invalid or donor types are invalid
     """
-    # Start with base query
-    query = "SELECT *\nFROM my_table"
-
-    # Add year filter
-    query = add_year_filter(query, year_type, selected_year)
-
-    # Normalize all filter inputs to lists
-    categories = ensure_list(selected_categories)
-    subcategories = ensure_list(selected_subcategories)
-    donor_types = ensure_list(selected_donor_types)
-    flow_types = ensure_list(selected_flow_types)
-
-    # Add remaining filters
-    query = add_category_filter(query, categories)
-    query = add_subcategory_filter(query, subcategories)
-    query = add_flow_type_filter(query, flow_types)
-    query = add_donor_type_filter(query, donor_types)
-
-    return query
+    return (
+        QueryBuilder("*")
+        .where_year(year_type, selected_year)
+        .where_filters(
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
+        )
+        .build()
+    )
 
 
 def construct_aggregated_query(
@@ -208,7 +319,7 @@ def construct_aggregated_query(
     selected_subcategories: Optional[str | list[str]] = None,
     selected_donor_types: Optional[str | list[str]] = None,
     selected_flow_types: Optional[str | list[str]] = None,
-) -> str:
+) -> ParameterizedQuery:
     """Construct an aggregated SQL query based on the selected filters.
 
     Args:
@@ -219,54 +330,114 @@ def construct_aggregated_query(
         selected_flow_types: Flow types to filter by
 
     Returns:
-        Complete SQL query string with aggregation
+        Parameterized SQL query with aggregation
 
     Raises:
         ValueError: If donor types are invalid
     """
-    # Start with base aggregation query
-    query = """
-        SELECT Year, DonorName, DEDonorcode, RecipientName, DERecipientcode, 
-               FlowName, meta_category, climate_class, 
-               SUM(USD_Disbursement) AS total_disbursement
-        FROM my_table
-    """
-
-    # Add year filter
-    query += f"WHERE Year = {selected_year}"
-
-    # Normalize all filter inputs to lists
-    categories = ensure_list(selected_categories)
-    subcategories = ensure_list(selected_subcategories)
-    donor_types = ensure_list(selected_donor_types)
-    flow_types = ensure_list(selected_flow_types)
-
-    # Add remaining filters
-    query = add_category_filter(query, categories)
-    query = add_subcategory_filter(query, subcategories)
-    query = add_flow_type_filter(query, flow_types)
-    query = add_donor_type_filter(query, donor_types)
-
-    # Add grouping and ordering
-    query += """
-        GROUP BY DonorName, DEDonorcode, RecipientName, DERecipientcode, Year, 
-                 FlowName, meta_category, climate_class
-        ORDER BY total_disbursement DESC
-    """
-
-    return query
+    return (
+        QueryBuilder(
+            """Year, DonorName, DEDonorcode, RecipientName, DERecipientcode,
+       FlowName, meta_category, climate_class,
+       SUM(USD_Disbursement) AS total_disbursement""",
+            columns=["USD_Disbursement"],
+        )
+        .where_year("single_year", selected_year)
+        .where_filters(
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
+        )
+        .group_by(
+            "DonorName",
+            "DEDonorcode",
+            "RecipientName",
+            "DERecipientcode",
+            "Year",
+            "FlowName",
+            "meta_category",
+            "climate_class",
+        )
+        .order_by("total_disbursement DESC")
+        .build()
+    )
 
 
 def construct_country_summary_query(
-    selected_year: int,
+    selected_year: int | tuple[int, int],
     selected_categories: Optional[str | list[str]] = None,
     selected_subcategories: Optional[str | list[str]] = None,
     selected_donor_types: Optional[str | list[str]] = None,
     selected_flow_types: Optional[str | list[str]] = None,
-) -> str:
+    year_type: Literal["single_year", "timespan"] = "single_year",
+) -> ParameterizedQuery:
     """Construct a country-level aggregation query for map visualizations.
 
     Args:
+        selected_year: Year to filter by, or range of years for 'timespan'
+        selected_categories: Categories to filter by
+        selected_subcategories: Subcategories to filter by
+        selected_donor_types: Donor types to filter by
+        selected_flow_types: Flow types to filter by
+        year_type: Type of year filter ('single_year' or 'timespan')
+
+    Returns:
+        Parameterized SQL query aggregated at the country level
+    """
+    return (
+        QueryBuilder(
+            """Year,
+       DonorName,
+       DEDonorcode,
+       RecipientName,
+       DERecipientcode,
+       meta_category,
+       climate_class,
+       SUM(COALESCE(USD_Disbursement, 0)) AS USD_Disbursement,
+       SUM(COALESCE(ClimateMitigation, 0)) AS ClimateMitigation,
+       SUM(COALESCE(ClimateAdaptation, 0)) AS ClimateAdaptation,
+       SUM(COALESCE(Biodiversity, 0)) AS Biodiversity""",
+            columns=SchemaDefinition.ROLLUP_MEASURES,
+        )
+        .where_year(year_type, selected_year)
+        .where_filters(
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
+        )
+        .group_by(
+            "Year",
+            "DonorName",
+            "DEDonorcode",
+            "RecipientName",
+            "DERecipientcode",
+            "meta_category",
+            "climate_class",
+        )
+        .build()
+    )
+
+
+def construct_mode_query(
+    map_mode: Literal["rio_oecd", "rio_climfinbert", "rio_diff"],
+    selected_type: Literal["donors", "recipients"],
+    selected_year: int,
+    selected_categories: str | list[str] | None = None,
+    selected_subcategories: str | list[str] | None = None,
+    selected_donor_types: str | list[str] | None = None,
+    selected_flow_types: str | list[str] | None = None,
+) -> ParameterizedQuery:
+    """Construct a query computing the data of a Rio marker map mode per country.
+
+    The country summary query becomes a CTE, so the OECD marker filter is
+    applied to the same grouped rows as in the pandas implementation. The outer
+    query then sums them up to one row per country.
+
+    Args:
+        map_mode: 'rio_oecd', 'rio_climfinbert' or 'rio_diff'
+        selected_type: Either 'donors' or 'recipients'
         selected_year: Year to filter by
         selected_categories: Categories to filter by
         selected_subcategories: Subcategories to filter by
@@ -274,77 +445,351 @@ def construct_country_summary_query(
         selected_flow_types: Flow types to filter by
 
     Returns:
-        SQL query string aggregated at the country level
+        Parameterized SQL query returning one row per country
+
+    Raises:
+        ValueError: If map_mode or selected_type is invalid
     """
+    code_column, name_column = _country_columns(selected_type)
+    measures, where = _mode_measures(map_mode, selected_categories)
+
+    summary = construct_country_summary_query(
+        selected_year=selected_year,
+        selected_categories=selected_categories,
+        selected_subcategories=selected_subcategories,
+        selected_donor_types=selected_donor_types,
+        selected_flow_types=selected_flow_types,
+    )
+    sql = f"""WITH summary AS (
+{summary.sql}
+)
+SELECT {code_column} AS CountryCode,
+       ANY_VALUE({name_column}) AS CountryName,
+       {measures}
+FROM summary{where}
+GROUP BY {code_column}
+ORDER BY {code_column}"""
+
+    return replace(summary, sql=sql)
+
+
+def construct_timeline_query(
+    map_mode: Literal["rio_oecd", "rio_climfinbert", "rio_diff"],
+    selected_type: Literal["donors", "recipients"],
+    selected_years: tuple[int, int],
+    selected_categories: str | list[str] | None = None,
+    selected_subcategories: str | list[str] | None = None,
+    selected_donor_types: str | list[str] | None = None,
+    selected_flow_types: str | list[str] | None = None,
+) -> ParameterizedQuery:
+    """Construct a query computing the map value of every year and country.
+
+    This is construct_mode_query for a range of years at once: the same
+    grouped rows are summed up to one row per year and country, so the whole
+    playback timeline is computed in a single query.
 
-    query = """
-        SELECT
-            Year,
-            DonorName,
-            DEDonorcode,
-            RecipientName,
-            DERecipientcode,
-            meta_category,
-            climate_class,
-            SUM(COALESCE(USD_Disbursement, 0)) AS USD_Disbursement,
-            SUM(COALESCE(ClimateMitigation, 0)) AS ClimateMitigation,
-            SUM(COALESCE(ClimateAdaptation, 0)) AS ClimateAdaptation,
-            SUM(COALESCE(Biodiversity, 0)) AS Biodiversity
-        FROM my_table
+    Args:
+        map_mode: 'rio_oecd', 'rio_climfinbert' or 'rio_diff'
+        selected_type: Either 'donors' or 'recipients'
+        selected_years: First and last year of the timeline
+        selected_categories: Categories to filter by
+        selected_subcategories: Subcategories to filter by
+        selected_donor_types: Donor types to filter by
+        selected_flow_types: Flow types to filter by
+
+    Returns:
+        Parameterized SQL query returning Year, CountryCode and the map value
+        as column 'value', ordered by year and country
+
+    Raises:
+        ValueError: If map_mode or selected_type is invalid
+    """
+    code_column, _ = _country_columns(selected_type)
+    measures, where = _mode_measures(map_mode, selected_categories)
+    value_column = (
+        "USD_Disbursement_diff" if map_mode == "rio_diff" else "USD_Disbursement"
+    )
+
+    summary = construct_country_summary_query(
+        selected_year=tuple(selected_years),
+        selected_categories=selected_categories,
+        selected_subcategories=selected_subcategories,
+        selected_donor_types=selected_donor_types,
+        selected_flow_types=selected_flow_types,
+        year_type="timespan",
+    )
+    sql = f"""WITH summary AS (
+{summary.sql}
+), modes AS (
+SELECT Year,
+       {code_column} AS CountryCode,
+       {measures}
+FROM summary{where}
+GROUP BY Year, {code_column}
+)
+SELECT Year, CountryCode, {value_column} AS value
+FROM modes
+ORDER BY Year, CountryCode"""
+
+    return replace(summary, sql=sql)
+
+
+def _country_columns(selected_type: str) -> tuple[str, str]:
+    """Return the country code and name columns of a view type.
+
+    Raises:
+        ValueError: If selected_type is not 'donors' or 'recipients'
+    """
+    country_columns = {
+        "donors": ("DEDonorcode", "DonorName"),
+        "recipients": ("DERecipientcode", "RecipientName"),
+    }
+    if selected_type not in country_columns:
+        raise ValueError(
+            "Invalid selected type. Please select either 'donors' or 'recipients'."
+        )
+    return country_columns[selected_type]
+
+
+def _mode_measures(
+    map_mode: str, selected_categories: str | list[str] | None
+) -> tuple[str, str]:
+    """Return the measures and WHERE clause computing a Rio marker map mode.
+
+    Raises:
+        ValueError: If map_mode cannot be computed in SQL
+    """
+    # Rows flagged by an OECD Rio marker of any selected category
+    selected_categories = ensure_list(selected_categories)
+    if selected_categories:
+        markers = [
+            f"{SchemaDefinition.RIO_MARKER_COLUMNS[category]} > 0"
+            for category in selected_categories
+            if category in SchemaDefinition.RIO_MARKER_COLUMNS
+        ]
+        oecd_condition = " OR ".join(markers) if markers else "FALSE"
+    else:
+        oecd_condition = "TRUE"
+
+    if map_mode == "rio_oecd":
+        measures = "SUM(USD_Disbursement) AS USD_Disbursement"
+        where = f"\nWHERE {oecd_condition}"
+    elif map_mode == "rio_climfinbert":
+        measures = "SUM(USD_Disbursement) AS USD_Disbursement"
+        where = ""
+    elif map_mode == "rio_diff":
+        oecd_sum = f"COALESCE(SUM(USD_Disbursement) FILTER (WHERE {oecd_condition}), 0)"
+        measures = f"""{oecd_sum} AS USD_Disbursement_OECD,
+       SUM(USD_Disbursement) AS USD_Disbursement_ClimFinBERT,
+       SUM(USD_Disbursement) - {oecd_sum} AS USD_Disbursement_diff"""
+        where = ""
+    else:
+        raise ValueError(f"Invalid map_mode for SQL computation: {map_mode}")
+
+    return measures, where
+
+
+@lru_cache(maxsize=128)
+def prepare_statement(sql: str) -> duckdb.Statement:
+    """Parse a SQL template once and reuse the parsed statement afterwards.
+
+    Args:
+        sql: SQL template with '?' placeholders
+
+    Returns:
+        The parsed DuckDB statement
+
+    Raises:
+        ValueError: If the template does not contain exactly one statement
+    """
+    statements = duckdb.extract_statements(sql)
+    if len(statements) != 1:
+        raise ValueError(f"Expected a single SQL statement, got {len(statements)}")
+    return statements[0]
+
+
+def execute_query(
+    cursor: duckdb.DuckDBPyConnection, query: str | ParameterizedQuery
+) -> duckdb.DuckDBPyConnection:
+    """Execute a plain or parameterized query on a cursor.
+
+    Args:
+        cursor: DuckDB cursor to execute the query on
+        query: SQL string or parameterized query
+
+    Returns:
+        The cursor holding the pending result
     """
+    if isinstance(query, ParameterizedQuery):
+        return cursor.execute(prepare_statement(query.sql), query.params)
+    return cursor.execute(query)
+
+
+def route_query(duckdb_db: str, query: ParameterizedQuery) -> ParameterizedQuery:
+    """Route a query on the fact table to the rollup table where possible.
+
+    A query is answered from the rollup if the rollup exists in the database
+    and holds every column the query references. Since the rollup sums the
+    measures per combination of its dimensions, summing them again yields the
+    same totals as aggregating the fact table.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file
+        query: Parameterized query to route
 
-    query = add_year_filter(query, "single_year", selected_year)
-
-    categories = ensure_list(selected_categories)
-    subcategories = ensure_list(selected_subcategories)
-    donor_types = ensure_list(selected_donor_types)
-    flow_types = ensure_list(selected_flow_types)
-
-    query = add_category_filter(query, categories)
-    query = add_subcategory_filter(query, subcategories)
-    query = add_flow_type_filter(query, flow_types)
-    query = add_donor_type_filter(query, donor_types)
-
-    query += """
-        GROUP BY
-            Year,
-            DonorName,
-            DEDonorcode,
-            RecipientName,
-            DERecipientcode,
-            meta_category,
-            climate_class
+    Returns:
+        The query reading from the rollup table, or the unchanged query
     """
+    rollup_columns = set(SchemaDefinition.ROLLUP_DIMENSIONS) | set(
+        SchemaDefinition.ROLLUP_MEASURES
+    )
+    if (
+        query.table != DatabaseTables.FACT
+        or query.columns is None
+        or not query.columns <= rollup_columns
+    ):
+        return query
+
+    if DatabaseTables.ROLLUP not in get_connection_manager(duckdb_db).tables():
+        return query
+
+    logger.info(f"Routing query to rollup table {DatabaseTables.ROLLUP}")
+    return query.retarget(DatabaseTables.ROLLUP)
 
-    return query
+
+def fetch_result(
+    result: duckdb.DuckDBPyConnection, result_format: ResultFormat
+) -> pd.DataFrame | pa.Table:
+    """Fetch the result of an executed query in the requested format.
+
+    Args:
+        result: Cursor holding the result of an executed query
+        result_format: 'pandas' for a DataFrame, 'arrow' for an Arrow table
+
+    Returns:
+        The query result
+
+    Raises:
+        ValueError: If the result format is unknown
+    """
+    if result_format == "pandas":
+        return result.fetchdf()
+    if result_format == "arrow":
+        # DuckDB 1.5 renamed fetch_arrow_table to to_arrow_table
+        to_table = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+        return to_table()
+    raise ValueError(f"Invalid result format: {result_format}")
 
 
 def query_duckdb(
     duckdb_db: str,
-    query: str,
-) -> pd.DataFrame:
+    query: str | ParameterizedQuery,
+    cache_key: Hashable | None = None,
+    result_format: ResultFormat = "pandas",
+) -> pd.DataFrame | pa.Table:
     """Execute a query against a DuckDB database.
 
     Args:
         duckdb_db: Path to the DuckDB database file
-        query: SQL query to execute
+        query: SQL query or parameterized query to execute
+        cache_key: Canonical key of the query (see make_filter_key); if given,
+            the result is served from and stored in the shared result cache.
+            Cached results are shared between callers and must not be modified.
+        result_format: 'pandas' for a DataFrame, 'arrow' for an Arrow table,
+            which skips the conversion into NumPy and Python objects
 
     Returns:
-        DataFrame with query results
+        DataFrame or Arrow table with query results
     """
+    if cache_key is not None:
+        return result_cache.get_or_compute(
+            (cache_key, result_format),
+            database_version(duckdb_db),
+            lambda: query_duckdb(duckdb_db, query, result_format=result_format),
+        )
+
     logger.info(f"Executing query on {duckdb_db}...")
     start = time.time()
 
-    # Connect to database, execute query, and close connection
-    con = duckdb.connect(database=duckdb_db)
-    result_df = con.execute(query).fetchdf()
-    con.close()
+    # Answer the query from the rollup table if it covers all needed columns
+    if isinstance(query, ParameterizedQuery):
+        query = route_query(duckdb_db, query)
+
+    # Reuse the shared connection of this worker with a thread-local cursor
+    manager = get_connection_manager(duckdb_db)
+    try:
+        result = fetch_result(execute_query(manager.cursor(), query), result_format)
+    except duckdb.ConnectionException:
+        # The shared connection went stale, reopen it and retry once
+        logger.warning(f"Connection to {duckdb_db} lost, reconnecting...")
+        manager.reset()
+        result = fetch_result(execute_query(manager.cursor(), query), result_format)
 
     # Log performance data
     end = time.time()
     logger.info(f"Query executed in {end - start:.2f} seconds")
 
-    return result_df
+    return result
+
+
+def query_with_progress(
+    duckdb_db: str,
+    query: ParameterizedQuery,
+    on_progress: Callable[[float], None],
+    poll_interval: float = JobSettings.PROGRESS_INTERVAL,
+    result_format: ResultFormat = "arrow",
+) -> pd.DataFrame | pa.Table:
+    """Execute a query while reporting its progress.
+
+    The query runs on a dedicated cursor in a helper thread, while the calling
+    thread polls DuckDB's progress estimate of the running query.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file
+        query: Parameterized query to execute
+        on_progress: Called with the completed percentage of the query
+        poll_interval: Seconds between two progress reports
+        result_format: 'pandas' for a DataFrame, 'arrow' for an Arrow table
+
+    Returns:
+        DataFrame or Arrow table with query results
+    """
+    logger.info(f"Executing query on {duckdb_db} with progress reports...")
+    start = time.time()
+    query = route_query(duckdb_db, query)
+
+    cursor = get_connection_manager(duckdb_db).connect().cursor()
+    cursor.execute("SET enable_progress_bar = true")
+    cursor.execute("SET enable_progress_bar_print = false")
+
+    outcome: dict[str, Any] = {}
+
+    def run() -> None:
+        try:
+            outcome["result"] = fetch_result(
+                execute_query(cursor, query), result_format
+            )
+        except Exception as e:  # noqa: BLE001 - re-raised in the calling thread
+            outcome["error"] = e
+
+    worker = threading.Thread(target=run, daemon=True)
+    try:
+        worker.start()
+        while worker.is_alive():
+            worker.join(poll_interval)
+            progress = cursor.query_progress()
+            if progress >= 0:
+                on_progress(progress)
+    finally:
+        worker.join()
+        cursor.close()
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    on_progress(100.0)
+    logger.info(f"Query executed in {time.time() - start:.2f} seconds")
+    return outcome["result"]
 
 
 if __name__ == "__main__":
@@ -361,7 +806,8 @@ if __name__ == "__main__":
     )
 
     print("Constructed query:")
-    print(test_query)
+    print(test_query.sql)
+    print(f"Parameters: {test_query.params}")
 
     # Execute the query
     result = query_duckdb(duckdb_db=DUCKDB_PATH, query=test_query)
@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+import duckdb
+
+from utils.duckdb_connection import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SupersededQueryError(Exception):
+    """Raised when a newer filter state of the same session replaced a query."""
+
+
+class QueryGenerations:
+    """Tracks the newest filter state of every session.
+
+    Each callback run for a session and channel (e.g. the stored data) starts
+    a new generation. Starting it interrupts the DuckDB queries still running
+    for older generations of the same session and channel, and results of
+    older generations are dropped instead of being returned.
+
+    Generations are tracked per worker process, so only queries running in
+    the same process as the newer request are interrupted.
+    """
+
+    def __init__(self, max_sessions: int = 10_000):
+        """Initialize an empty tracker.
+
+        Args:
+            max_sessions: Number of session channels whose generation is kept
+        """
+        self.max_sessions = max_sessions
+
+        self._generation = 0
+        self._latest: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._running: dict[tuple[str, str], dict[int, duckdb.DuckDBPyConnection]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, session_id: str, channel: str) -> int:
+        """Start a new generation and interrupt the queries of older ones.
+
+        Args:
+            session_id: Identifier of the browser session
+            channel: Name of the callback output the query feeds
+
+        Returns:
+            The new generation
+        """
+        key = (session_id, channel)
+        with self._lock:
+            self._generation += 1
+            self._latest[key] = self._generation
+            self._latest.move_to_end(key)
+            while len(self._latest) > self.max_sessions:
+                self._latest.popitem(last=False)
+
+            for generation, cursor in self._running.get(key, {}).items():
+                logger.info(f"Interrupting superseded {channel} query {generation}")
+                cursor.interrupt()
+
+            return self._generation
+
+    def is_current(self, session_id: str, channel: str, generation: int) -> bool:
+        """Check whether a generation is the newest of its session and channel.
+
+        Args:
+            session_id: Identifier of the browser session
+            channel: Name of the callback output the query feeds
+            generation: Generation returned by begin
+
+        Returns:
+            True if no newer generation has been started
+        """
+        with self._lock:
+            return self._latest.get((session_id, channel)) == generation
+
+    @contextmanager
+    def running(
+        self,
+        session_id: str,
+        channel: str,
+        generation: int,
+        cursor: duckdb.DuckDBPyConnection,
+    ) -> Iterator[None]:
+        """Register the cursor running the query of a generation.
+
+        Args:
+            session_id: Identifier of the browser session
+            channel: Name of the callback output the query feeds
+            generation: Generation returned by begin
+            cursor: Cursor the query is executed on
+        """
+        key = (session_id, channel)
+        with self._lock:
+            self._running.setdefault(key, {})[generation] = cursor
+        try:
+            yield
+        finally:
+            with self._lock:
+                running = self._running.get(key, {})
+                running.pop(generation, None)
+                if not running:
+                    self._running.pop(key, None)
+
+    def run_latest(
+        self,
+        session_id: str | None,
+        channel: str,
+        duckdb_db: str,
+        compute: Callable[[], T],
+    ) -> T:
+        """Run the queries of a callback for the newest filter state only.
+
+        The queries have to run in the calling thread, on the thread-local
+        cursor of the database (see query_duckdb).
+
+        Args:
+            session_id: Identifier of the browser session, None to skip tracking
+            channel: Name of the callback output the query feeds
+            duckdb_db: Path to the DuckDB database file
+            compute: Function running the queries
+
+        Returns:
+            The result of compute
+
+        Raises:
+            SupersededQueryError: If a newer generation was started meanwhile
+        """
+        if session_id is None:
+            return compute()
+
+        generation = self.begin(session_id, channel)
+        cursor = get_connection_manager(duckdb_db).cursor()
+        with self.running(session_id, channel, generation, cursor):
+            try:
+                result = compute()
+            except duckdb.InterruptException as e:
+                raise SupersededQueryError(channel) from e
+
+        if not self.is_current(session_id, channel, generation):
+            logger.info(f"Dropping the result of superseded {channel} query")
+            raise SupersededQueryError(channel)
+        return result
+
+
+# Generations of the sessions served by this worker process
+query_generations = QueryGenerations()
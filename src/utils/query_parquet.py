@@ -1,9 +1,11 @@
 import logging
+import os
 import time
 
-import duckdb
 import pandas as pd
 
+from utils.duckdb_connection import IN_MEMORY, get_connection_manager
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,8 +15,12 @@ def query_parquet_with_duckdb(
 ) -> pd.DataFrame:
     """Query a Parquet database using DuckDB.
 
+    A partitioned dataset directory is scanned through a glob of its files;
+    DuckDB detects the Hive partitioning and prunes partitions by the filters
+    of the query.
+
     Args:
-        parquet_db (str): The path to the Parquet database
+        parquet_db (str): The path to the Parquet file or dataset directory
         query (str): The SQL query to execute
 
     Returns:
@@ -23,9 +29,12 @@ def query_parquet_with_duckdb(
     logger.info(f"Executing query on {parquet_db}...")
     start = time.time()
 
-    con = duckdb.connect(database=":memory:")
+    if os.path.isdir(parquet_db):
+        parquet_db = os.path.join(parquet_db, "**", "*.parquet")
+
+    cursor = get_connection_manager(IN_MEMORY).cursor()
     formatted_query = query.format(parquet_db=parquet_db)
-    result_df = con.execute(formatted_query).fetchdf()
+    result_df = cursor.execute(formatted_query).fetchdf()
 
     end = time.time()
     logger.info(f"Query executed in {end - start:.2f} seconds")
@@ -0,0 +1,241 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import pandas as pd
+
+from components.constants import PIPELINE_VERSION, CacheSettings
+
+logger = logging.getLogger(__name__)
+
+
+def make_filter_key(
+    kind: str,
+    selected_year: int | tuple[int, int] | list[int],
+    selected_categories: str | list[str] | None = None,
+    selected_subcategories: str | list[str] | None = None,
+    selected_donor_types: str | list[str] | None = None,
+    selected_flow_types: str | list[str] | None = None,
+) -> tuple:
+    """Build a canonical cache key from a filter selection.
+
+    Multi-select values are sorted so that the same selection made in a
+    different order maps to the same key.
+
+    Args:
+        kind: Name of the query the filters are applied to
+        selected_year: Selected year or year range
+        selected_categories: Selected categories
+        selected_subcategories: Selected subcategories
+        selected_donor_types: Selected donor types
+        selected_flow_types: Selected flow types
+
+    Returns:
+        Hashable tuple identifying the filter selection
+    """
+
+    def normalize(values: str | list[str] | None) -> tuple[str, ...]:
+        if not values:
+            return ()
+        if isinstance(values, str):
+            return (values,)
+        return tuple(sorted(set(values)))
+
+    year = (
+        tuple(int(y) for y in selected_year)
+        if isinstance(selected_year, (list, tuple))
+        else int(selected_year)
+    )
+
+    return (
+        kind,
+        year,
+        normalize(selected_categories),
+        normalize(selected_subcategories),
+        normalize(selected_donor_types),
+        normalize(selected_flow_types),
+    )
+
+
+def database_version(duckdb_db: str) -> tuple[int | None, int]:
+    """Identify the current state of a database file.
+
+    A partitioned Parquet dataset is identified by its directory, which is
+    replaced as a whole whenever the dataset is rewritten.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file or Parquet dataset
+
+    Returns:
+        Tuple of the file's modification time and the pipeline version
+    """
+    try:
+        mtime = os.stat(duckdb_db).st_mtime_ns
+    except OSError:
+        mtime = None
+    return mtime, PIPELINE_VERSION
+
+
+def versioned_key(duckdb_db: str, key: Hashable) -> str:
+    """Derive a frame store key from a result key and the database state.
+
+    Results computed before the database was rebuilt get another key, so
+    they are not reused.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file or Parquet dataset
+        key: Canonical key of the result, e.g. from make_filter_key
+
+    Returns:
+        Hex digest usable as frame store key
+    """
+    state = repr((key, database_version(duckdb_db)))
+    return hashlib.sha256(state.encode("utf-8")).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value: Cached value
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return 0
+
+
+class ResultCache:
+    """Bounded LRU cache for query results, evicting by memory footprint.
+
+    All entries belong to one version of the database. When the version
+    changes, e.g. because the pipeline rebuilt the database file, the cache is
+    emptied before it is used again.
+    """
+
+    def __init__(self, max_bytes: int = CacheSettings.RESULT_CACHE_MAX_BYTES):
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes: Memory budget for all cached results
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.current_bytes = 0
+
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._version: Hashable | None = None
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Any | None:
+        """Look up a cached result.
+
+        Args:
+            key: Canonical key of the result
+            version: Version of the data the result must belong to
+
+        Returns:
+            The cached result or None if it is not cached
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """Store a result, evicting the least recently used entries if needed.
+
+        Results larger than the whole budget are not cached.
+
+        Args:
+            key: Canonical key of the result
+            version: Version of the data the result belongs to
+            value: Result to cache
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.info(f"Result of {size} bytes exceeds the cache budget, skipping")
+            return
+
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_or_compute(
+        self, key: Hashable, version: Hashable, compute: Callable[[], Any]
+    ) -> Any:
+        """Return a cached result or compute and cache it.
+
+        Args:
+            key: Canonical key of the result
+            version: Version of the data the result belongs to
+            compute: Function producing the result on a cache miss
+
+        Returns:
+            The cached or freshly computed result
+        """
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.put(key, version, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit/miss counters and the current memory usage.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _check_version(self, version: Hashable) -> None:
+        """Drop all entries if they belong to another data version."""
+        if version != self._version:
+            if self._entries:
+                logger.info("Data version changed, invalidating result cache")
+            self._entries.clear()
+            self.current_bytes = 0
+            self._version = version
+
+
+# Result cache shared by all callbacks of this worker process
+result_cache = ResultCache()
@@ -0,0 +1,174 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Literal
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Number of data versions whose statistics are kept
+MAX_CACHED_VERSIONS = 32
+
+
+class StyleStatistics:
+    """Summary statistics of the values shown on the map.
+
+    The values are sorted once on construction. Minimum, maximum and the class
+    breaks of any classification are then derived from the sorted array
+    without scanning the values again; class breaks are cached per
+    classification.
+    """
+
+    def __init__(self, values: Iterable[float] | np.ndarray):
+        """Sort the values and derive their range.
+
+        Args:
+            values: Values shown on the map
+        """
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        self.values = np.sort(np.asarray(values, dtype=float))
+        self.min = float(self.values[0]) if self.values.size else None
+        self.max = float(self.values[-1]) if self.values.size else None
+        self._breaks: dict[tuple[str, int], list[float]] = {}
+
+    @property
+    def count(self) -> int:
+        """Number of values."""
+        return int(self.values.size)
+
+    def breaks(
+        self, n_classes: int, method: Literal["quantile", "jenks"] = "quantile"
+    ) -> list[float]:
+        """Return the class breaks of a classification.
+
+        Args:
+            n_classes: Number of classes, e.g. 4 for quartiles or 10 for deciles
+            method: 'quantile' for equal-count classes, 'jenks' for natural breaks
+
+        Returns:
+            The n_classes + 1 break points from minimum to maximum, or an empty
+            list if there are no values
+
+        Raises:
+            ValueError: If the method is unknown or n_classes is not positive
+        """
+        if n_classes < 1:
+            raise ValueError(f"Invalid number of classes: {n_classes}")
+        if not self.values.size:
+            return []
+
+        key = (method, n_classes)
+        if key not in self._breaks:
+            if method == "quantile":
+                # all quantiles in one vectorised call
+                breaks = np.quantile(self.values, np.linspace(0, 1, n_classes + 1))
+            elif method == "jenks":
+                breaks = jenks_breaks(self.values, n_classes)
+            else:
+                raise ValueError(f"Invalid classification method: {method}")
+            self._breaks[key] = [float(b) for b in breaks]
+
+        return self._breaks[key]
+
+
+def jenks_breaks(sorted_values: np.ndarray, n_classes: int) -> list[float]:
+    """Compute Jenks natural breaks by minimising the within-class variance.
+
+    Uses the Fisher-Jenks dynamic programme on cumulative sums, which is
+    exact and fast enough for one value per country.
+
+    Args:
+        sorted_values: Values sorted in ascending order
+        n_classes: Number of classes
+
+    Returns:
+        The n_classes + 1 break points from minimum to maximum
+    """
+    n = sorted_values.size
+    n_classes = min(n_classes, n)
+
+    cumsum = np.concatenate([[0.0], np.cumsum(sorted_values)])
+    cumsum_sq = np.concatenate([[0.0], np.cumsum(sorted_values**2)])
+
+    def cost(start: np.ndarray, end: int) -> np.ndarray:
+        """Sum of squared deviations of the values start..end-1."""
+        count = end - start
+        total = cumsum[end] - cumsum[start]
+        return cumsum_sq[end] - cumsum_sq[start] - total**2 / count
+
+    # best[k, j]: minimal cost of splitting the first j values into k classes
+    best = np.full((n_classes + 1, n + 1), np.inf)
+    split = np.zeros((n_classes + 1, n + 1), dtype=int)
+    best[0, 0] = 0.0
+    for k in range(1, n_classes + 1):
+        for j in range(k, n + 1):
+            starts = np.arange(k - 1, j)
+            costs = best[k - 1, starts] + cost(starts, j)
+            index = int(np.argmin(costs))
+            best[k, j] = costs[index]
+            split[k, j] = starts[index]
+
+    # walk back the class boundaries
+    ends = [n]
+    for k in range(n_classes, 0, -1):
+        ends.append(split[k, ends[-1]])
+    ends.reverse()
+
+    upper_bounds = [float(sorted_values[end - 1]) for end in ends[1:]]
+    return [float(sorted_values[0])] + upper_bounds
+
+
+_statistics: OrderedDict[Hashable, StyleStatistics] = OrderedDict()
+_statistics_lock = threading.Lock()
+
+
+def map_values_version(mode_data: str, map_mode: str) -> str:
+    """Identify the map values derived from a version of the mode data.
+
+    Args:
+        mode_data: Frame store key of the mode data
+        map_mode: Map visualization mode the values are shown in
+
+    Returns:
+        Version of the map values, used to memoise their statistics
+    """
+    return f"{mode_data}_{map_mode}"
+
+
+def get_style_statistics(
+    version: Hashable | None, values: dict[str, float]
+) -> StyleStatistics:
+    """Return the statistics of a version of the map values, computing them once.
+
+    Args:
+        version: Identifier of the data the values were derived from, e.g. the
+            frame store key of the mode data; None disables memoisation
+        values: Mapping of country codes to map values
+
+    Returns:
+        Statistics of the values
+    """
+    if version is None:
+        return StyleStatistics(values.values())
+
+    with _statistics_lock:
+        statistics = _statistics.get(version)
+        if statistics is not None:
+            _statistics.move_to_end(version)
+            return statistics
+
+    statistics = StyleStatistics(values.values())
+    logger.info(
+        f"Computed style statistics for {statistics.count} values "
+        f"(min={statistics.min}, max={statistics.max})"
+    )
+
+    with _statistics_lock:
+        _statistics[version] = statistics
+        while len(_statistics) > MAX_CACHED_VERSIONS:
+            _statistics.popitem(last=False)
+
+    return statistics
@@ -0,0 +1,327 @@
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+
+from components.constants import TableSettings
+from utils.duckdb_connection import IN_MEMORY, get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Column holding the position of each row in the stored table
+ROW_ID = "__row"
+
+# Operators of the DataTable filter syntax and their SQL counterparts
+COMPARISONS = {
+    "=": "=",
+    "eq": "=",
+    "!=": "!=",
+    "ne": "!=",
+    "<": "<",
+    "lt": "<",
+    "<=": "<=",
+    "le": "<=",
+    ">": ">",
+    "gt": ">",
+    ">=": ">=",
+    "ge": ">=",
+}
+
+_FILTER_PATTERN = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s+(?P<case>[si]?)"
+    r"(?P<operator>contains|datestartswith|[a-z]{2}|[<>!=]=?)\s+(?P<value>.+)$"
+)
+
+
+@dataclass(frozen=True)
+class Page:
+    """One page of a server-side table."""
+
+    records: list[dict[str, Any]]
+    total_rows: int
+    page_count: int
+
+
+def _quote(column: str) -> str:
+    """Quote a column name as SQL identifier."""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _unquote(value: str) -> str:
+    """Strip the quotes the DataTable puts around filter values."""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+        return value[1:-1]
+    return value
+
+
+def _is_numeric(data_type: pa.DataType) -> bool:
+    """Check whether an Arrow type is compared numerically."""
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_decimal(data_type)
+    )
+
+
+def parse_filter_query(
+    filter_query: str | None, schema: pa.Schema
+) -> tuple[list[str], list[Any]]:
+    """Translate a DataTable filter query into SQL conditions.
+
+    Clauses are joined with '&&' and have the form '{column} operator value',
+    optionally with an 's' or 'i' prefix for case-sensitive or -insensitive
+    matching. Values are bound as parameters; clauses with unknown columns,
+    operators or values that do not fit the column type are skipped, like
+    invalid expressions in the native DataTable filter.
+
+    Args:
+        filter_query: Filter query of the DataTable
+        schema: Schema of the filtered table
+
+    Returns:
+        Tuple of (SQL conditions, parameters)
+    """
+    conditions: list[str] = []
+    params: list[Any] = []
+    if not filter_query:
+        return conditions, params
+
+    for clause in filter_query.split(" && "):
+        match = _FILTER_PATTERN.match(clause.strip())
+        if not match or match["column"] not in set(schema.names) - {ROW_ID}:
+            logger.warning(f"Skipping invalid filter clause: {clause}")
+            continue
+
+        column = _quote(match["column"])
+        numeric = _is_numeric(schema.field(match["column"]).type)
+        insensitive = match["case"] == "i"
+        operator = match["operator"]
+        value = _unquote(match["value"])
+
+        if operator == "contains":
+            if insensitive:
+                conditions.append(f"contains(lower({column}::VARCHAR), lower(?))")
+            else:
+                conditions.append(f"contains({column}::VARCHAR, ?)")
+            params.append(value)
+        elif operator == "datestartswith":
+            conditions.append(f"starts_with({column}::VARCHAR, ?)")
+            params.append(value)
+        elif operator in COMPARISONS:
+            if numeric:
+                try:
+                    params.append(float(value))
+                except ValueError:
+                    logger.warning(f"Skipping non-numeric filter value: {clause}")
+                    continue
+                conditions.append(f"{column} {COMPARISONS[operator]} ?")
+            elif insensitive:
+                conditions.append(f"lower({column}) {COMPARISONS[operator]} lower(?)")
+                params.append(value)
+            else:
+                conditions.append(f"{column} {COMPARISONS[operator]} ?")
+                params.append(value)
+        else:
+            logger.warning(f"Skipping unsupported filter operator: {clause}")
+
+    return conditions, params
+
+
+def parse_sort_by(
+    sort_by: list[dict[str, str]] | None, schema: pa.Schema
+) -> list[tuple[str, bool]]:
+    """Translate the DataTable sort state into sort keys.
+
+    The row position is always appended as the last key, which makes the
+    order total and allows keyset pagination.
+
+    Args:
+        sort_by: Sort state of the DataTable, e.g. [{'column_id': 'Year',
+            'direction': 'desc'}]
+        schema: Schema of the sorted table
+
+    Returns:
+        List of (column, descending) tuples
+    """
+    keys = [
+        (item["column_id"], item.get("direction") == "desc")
+        for item in sort_by or []
+        if item.get("column_id") in schema.names and item["column_id"] != ROW_ID
+    ]
+    return keys + [(ROW_ID, False)]
+
+
+def _keyset_condition(
+    sort_keys: list[tuple[str, bool]], anchor: tuple
+) -> tuple[str, list[Any]]:
+    """Build the condition selecting the rows ordered after an anchor row.
+
+    NULLs sort last, so rows with a NULL key follow any anchor value.
+
+    Args:
+        sort_keys: Sort keys of the query
+        anchor: Values of the sort keys of the last row of the previous page
+
+    Returns:
+        Tuple of (SQL condition, parameters)
+    """
+    alternatives = []
+    params: list[Any] = []
+    for i, (column, descending) in enumerate(sort_keys):
+        parts = [f"{_quote(col)} = ?" for col, _ in sort_keys[:i]]
+        params.extend(anchor[:i])
+        operator = "<" if descending else ">"
+        parts.append(f"({_quote(column)} {operator} ? OR {_quote(column)} IS NULL)")
+        params.append(anchor[i])
+        alternatives.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(alternatives) + ")", params
+
+
+def _anchor_value(value: Any) -> Any:
+    """Convert a sort key value of a fetched row into a query parameter."""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+class PageAnchors:
+    """Bounded memory of the last row of recently served pages.
+
+    Keyed by table, filter, sort and page size, each entry maps page numbers
+    to the sort key values of their last row, from which the next page is
+    found by keyset pagination instead of skipping all preceding rows.
+    """
+
+    def __init__(self, max_entries: int = TableSettings.MAX_ANCHOR_ENTRIES):
+        self.max_entries = max_entries
+        self._anchors: OrderedDict[Hashable, dict[int, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, page: int) -> tuple | None:
+        """Return the anchor of a page, None if unknown."""
+        with self._lock:
+            pages = self._anchors.get(key)
+            if pages is None:
+                return None
+            self._anchors.move_to_end(key)
+            return pages.get(page)
+
+    def set(self, key: Hashable, page: int, anchor: tuple) -> None:
+        """Remember the anchor of a page."""
+        with self._lock:
+            self._anchors.setdefault(key, {})[page] = anchor
+            self._anchors.move_to_end(key)
+            while len(self._anchors) > self.max_entries:
+                self._anchors.popitem(last=False)
+
+
+page_anchors = PageAnchors()
+
+
+def fetch_page(
+    table: pa.Table,
+    page_current: int,
+    page_size: int,
+    sort_by: list[dict[str, str]] | None = None,
+    filter_query: str | None = None,
+    table_key: Hashable | None = None,
+) -> Page:
+    """Fetch one page of a stored table, filtered and sorted in DuckDB.
+
+    Shallow pages are read with LIMIT/OFFSET. From KEYSET_MIN_OFFSET rows on,
+    the page following a previously served page is found by keyset
+    pagination on its last row, so DuckDB does not have to order all
+    skipped rows again.
+
+    Args:
+        table: Arrow table to page through
+        page_current: Zero-based page number
+        page_size: Rows per page
+        sort_by: Sort state of the DataTable
+        filter_query: Filter query of the DataTable
+        table_key: Identifier of the table (e.g. its frame store key), None
+            disables keyset pagination
+
+    Returns:
+        The requested page
+    """
+    start = time.time()
+    if ROW_ID not in table.schema.names:
+        row_ids = pa.array(range(table.num_rows), pa.int64())
+        table = table.append_column(ROW_ID, row_ids)
+
+    conditions, params = parse_filter_query(filter_query, table.schema)
+    sort_keys = parse_sort_by(sort_by, table.schema)
+    order_by = ", ".join(
+        f"{_quote(column)} {'DESC' if descending else 'ASC'} NULLS LAST"
+        for column, descending in sort_keys
+    )
+    view = f"frame_{uuid.uuid4().hex}"
+    anchor_key = (
+        (table_key, filter_query, tuple(sort_keys), page_size)
+        if table_key is not None
+        else None
+    )
+
+    cursor = get_connection_manager(IN_MEMORY, read_only=False).cursor()
+    cursor.register(view, table)
+    try:
+        where = f"\nWHERE {' AND '.join(conditions)}" if conditions else ""
+        total_rows = cursor.execute(
+            f"SELECT COUNT(*) FROM {view}{where}", params
+        ).fetchone()[0]
+        page_count = max(1, -(-total_rows // page_size))
+        page_current = min(max(page_current, 0), page_count - 1)
+
+        anchor = None
+        if anchor_key is not None and page_current * page_size >= (
+            TableSettings.KEYSET_MIN_OFFSET
+        ):
+            anchor = page_anchors.get(anchor_key, page_current - 1)
+
+        # keyset pagination needs non-NULL sort values of the anchor row
+        use_keyset = anchor is not None and None not in anchor
+        page_conditions, page_params = list(conditions), list(params)
+        if use_keyset:
+            keyset, keyset_params = _keyset_condition(sort_keys, anchor)
+            page_conditions.append(keyset)
+            page_params.extend(keyset_params)
+            offset = 0
+        else:
+            offset = page_current * page_size
+
+        sql = f"SELECT * FROM {view}"
+        if page_conditions:
+            sql += f"\nWHERE {' AND '.join(page_conditions)}"
+        sql += f"\nORDER BY {order_by}\nLIMIT ? OFFSET ?"
+        df_page = cursor.execute(sql, [*page_params, page_size, offset]).fetchdf()
+    finally:
+        cursor.unregister(view)
+
+    if anchor_key is not None and not df_page.empty:
+        last_row = df_page.iloc[-1]
+        page_anchors.set(
+            anchor_key,
+            page_current,
+            tuple(_anchor_value(last_row[column]) for column, _ in sort_keys),
+        )
+
+    logger.info(
+        f"Fetched page {page_current + 1}/{page_count} "
+        f"({'keyset' if use_keyset else 'offset'}) "
+        f"in {time.time() - start:.3f} seconds"
+    )
+    return Page(
+        records=df_page.drop(columns=[ROW_ID]).to_dict("records"),
+        total_rows=total_rows,
+        page_count=page_count,
+    )
@@ -0,0 +1,157 @@
+import logging
+import math
+import time
+from typing import Any
+
+import pyarrow as pa
+
+from components.constants import TimelineSettings
+from utils.data_operations import SQL_MAP_MODES
+from utils.map_styler import build_map_styling
+from utils.query_duckdb import construct_timeline_query, query_duckdb
+from utils.result_cache import make_filter_key
+from utils.style_statistics import StyleStatistics
+
+logger = logging.getLogger(__name__)
+
+# Map modes whose values of all years are computed in one query
+TIMELINE_MAP_MODES = SQL_MAP_MODES
+
+
+def timeline_enabled(map_mode: str) -> bool:
+    """Check whether playback of a map mode is driven by a timeline.
+
+    Args:
+        map_mode: Selected map visualization mode
+
+    Returns:
+        True if timeline mode is enabled and supports the map mode
+    """
+    return TimelineSettings.ENABLED and map_mode in TIMELINE_MAP_MODES
+
+
+def query_timeline(
+    duckdb_db: str,
+    map_mode: str,
+    selected_type: str,
+    selected_years: tuple[int, int],
+    selected_categories: list[str] | None = None,
+    selected_subcategories: list[str] | None = None,
+    selected_donor_types: list[str] | None = None,
+    selected_flow_types: list[str] | None = None,
+) -> pa.Table:
+    """Query the map value of every year and country in one grouped query.
+
+    Args:
+        duckdb_db: Path to the DuckDB database file
+        map_mode: 'rio_oecd', 'rio_climfinbert' or 'rio_diff'
+        selected_type: Either 'donors' or 'recipients'
+        selected_years: First and last year of the timeline
+        selected_categories: Selected climate finance categories
+        selected_subcategories: Selected climate finance subcategories
+        selected_donor_types: Selected donor types
+        selected_flow_types: Selected flow types
+
+    Returns:
+        Arrow table with the columns Year, CountryCode and value
+    """
+    query = construct_timeline_query(
+        map_mode=map_mode,
+        selected_type=selected_type,
+        selected_years=selected_years,
+        selected_categories=selected_categories,
+        selected_subcategories=selected_subcategories,
+        selected_donor_types=selected_donor_types,
+        selected_flow_types=selected_flow_types,
+    )
+    return query_duckdb(
+        duckdb_db=duckdb_db,
+        query=query,
+        cache_key=make_filter_key(
+            f"timeline_{map_mode}_{selected_type}",
+            tuple(selected_years),
+            selected_categories,
+            selected_subcategories,
+            selected_donor_types,
+            selected_flow_types,
+        ),
+        result_format="arrow",
+    )
+
+
+def build_timeline(
+    table: pa.Table,
+    map_mode: str,
+    selected_years: tuple[int, int],
+) -> dict[str, Any]:
+    """Build the timeline played in the browser from the values of all years.
+
+    The values are sent as a compact year x country matrix. Each year gets the
+    value range and class breaks of its own values, as when the year is
+    selected on the slider, so the browser only has to combine them with the
+    selected color mode (see src/assets/clientside.js).
+
+    Args:
+        table: Values of every year and country (see query_timeline)
+        map_mode: Selected map visualization mode
+        selected_years: First and last year of the timeline
+
+    Returns:
+        Dictionary with the years, the country codes, the value matrix with
+        one row per year and None for countries without a value, and the
+        styling of each year (see build_map_styling)
+    """
+    start = time.time()
+    years = list(range(selected_years[0], selected_years[1] + 1))
+    countries = sorted(set(table.column("CountryCode").to_pylist()))
+    row_of_year = {year: row for row, year in enumerate(years)}
+    column_of_country = {code: column for column, code in enumerate(countries)}
+
+    matrix: list[list[float | None]] = [[None] * len(countries) for _ in years]
+    for year, code, value in zip(
+        table.column("Year").to_pylist(),
+        table.column("CountryCode").to_pylist(),
+        table.column("value").to_pylist(),
+    ):
+        if year in row_of_year and value is not None and not math.isnan(value):
+            matrix[row_of_year[year]][column_of_country[code]] = float(value)
+
+    frames = [
+        build_map_styling(
+            map_mode, StyleStatistics(value for value in row if value is not None)
+        )
+        for row in matrix
+    ]
+
+    logger.info(
+        f"Built timeline of {len(years)} years and {len(countries)} countries "
+        f"in {time.time() - start:.2f} seconds"
+    )
+    return {
+        "years": years,
+        "countries": countries,
+        "values": matrix,
+        "frames": frames,
+    }
+
+
+def timeline_value(
+    timeline: dict[str, Any] | None, year: int, country_code: str
+) -> float | None:
+    """Look up the map value of a country in a played year of a timeline.
+
+    Args:
+        timeline: Timeline played in the browser (see build_timeline)
+        year: Year shown on the slider
+        country_code: ISO code of the country
+
+    Returns:
+        The map value, None if the timeline has no value for the country in
+        that year
+    """
+    if not timeline or year not in timeline["years"]:
+        return None
+    if country_code not in timeline["countries"]:
+        return None
+    row = timeline["values"][timeline["years"].index(year)]
+    return row[timeline["countries"].index(country_code)]
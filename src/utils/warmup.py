@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+
+import duckdb
+import requests
+
+from components.constants import (
+    QUERY_DATABASE,
+    DatabaseTables,
+    GeoJSONSettings,
+    StartupSettings,
+    get_geojson_base,
+    missing_geojson_levels,
+)
+from utils.country_metadata import load_country_metadata
+from utils.duckdb_connection import close_all_connections, get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+_warmed_up = False
+
+
+def warm_up(database: str = QUERY_DATABASE, close_connections: bool = True) -> None:
+    """Load the shared application state before the server forks its workers.
+
+    The GeoJSON levels and the country metadata are loaded into memory, so
+    the forked workers share them instead of each loading their own copy. The database is opened once
+    to fail early if it is missing, and closed again, since DuckDB handles
+    must not cross a fork; every worker opens its own on first use.
+
+    Args:
+        database: Path to the DuckDB database or partitioned Parquet dataset
+        close_connections: Whether to close the database again, only needed
+            if the process forks afterwards
+    """
+    global _warmed_up
+    start_time = time.time()
+
+    missing = missing_geojson_levels()
+    if missing:
+        logger.warning(
+            f"GeoJSON levels {', '.join(missing)} have not been built, serving "
+            "the full-resolution GeoJSON instead; run 'make geojson'"
+        )
+    try:
+        for level in GeoJSONSettings.LEVELS:
+            get_geojson_base(level)
+    except requests.RequestException as e:
+        logger.error(f"Could not preload the GeoJSON, loading it on demand: {e}")
+
+    try:
+        if DatabaseTables.FACT not in get_connection_manager(database).tables():
+            logger.warning(f"{database} has no table {DatabaseTables.FACT}")
+        else:
+            load_country_metadata(database)
+    except duckdb.Error as e:
+        logger.error(f"Could not open {database}: {e}")
+    finally:
+        if close_connections:
+            close_all_connections()
+
+    _warmed_up = True
+    logger.info(f"Warmed up in {time.time() - start_time:.2f} seconds")
+
+
+def start_warm_up(database: str = QUERY_DATABASE) -> threading.Thread | None:
+    """Warm up this process, in a background thread in startup budget mode.
+
+    By default the warm-up blocks until the shared state is loaded. With
+    StartupSettings.BACKGROUND_WARMUP the process serves requests at once and
+    loads the state in a daemon thread; it reports not ready until then and
+    requests arriving earlier load what they need on first use.
+
+    Args:
+        database: Path to the DuckDB database or partitioned Parquet dataset
+
+    Returns:
+        The running warm-up thread, None if the warm-up has already finished
+    """
+    if not StartupSettings.BACKGROUND_WARMUP:
+        warm_up(database)
+        return None
+
+    thread = threading.Thread(
+        target=warm_up, args=(database, False), name="warm-up", daemon=True
+    )
+    thread.start()
+    logger.info("Warming up in the background")
+    return thread
+
+
+def check_readiness(database: str = QUERY_DATABASE) -> tuple[bool, str]:
+    """Check whether this worker can serve requests.
+
+    Unlike the liveness check, the worker is only ready once the shared
+    state has been loaded and the fact table can be queried.
+
+    Args:
+        database: Path to the DuckDB database or partitioned Parquet dataset
+
+    Returns:
+        Whether the worker is ready and the reason if it is not
+    """
+    if not _warmed_up:
+        return False, "warming up"
+
+    try:
+        manager = get_connection_manager(database)
+        if DatabaseTables.FACT not in manager.tables():
+            return False, f"table {DatabaseTables.FACT} missing"
+        manager.cursor().execute(
+            f"SELECT 1 FROM {DatabaseTables.FACT} LIMIT 1"
+        ).fetchall()
+    except duckdb.Error as e:
+        return False, f"database unavailable: {e}"
+
+    return True, "ready"
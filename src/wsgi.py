@@ -0,0 +1,22 @@
+"""WSGI entry point for serving the application with gunicorn.
+
+Run from the src directory with:
+
+    gunicorn --config gunicorn.conf.py wsgi:server
+
+With preload_app enabled, this module is imported once by the master process
+before it forks the workers, so the layout, callbacks, categories and GeoJSON
+are loaded a single time and shared by all workers. With BACKGROUND_WARMUP
+the master skips the warm-up and every worker warms up in the background
+after the fork instead (see gunicorn.conf.py), trading memory for startup time.
+"""
+
+from app import create_app
+from components.constants import QUERY_DATABASE, StartupSettings
+from utils.warmup import warm_up
+
+app = create_app()
+if not StartupSettings.BACKGROUND_WARMUP:
+    warm_up(QUERY_DATABASE)
+
+server = app.server
@@ -76,6 +76,9 @@ def mock_duckdb_conn(monkeypatch):
             # return a mock cursor
             return MockCursor()
 
+        def cursor(self):
+            return self
+
         def close(self):
             pass
 
@@ -95,5 +98,49 @@ def mock_duckdb_conn(monkeypatch):
 
     import duckdb
 
+    from utils.duckdb_connection import close_all_connections
+
     monkeypatch.setattr(duckdb, "connect", lambda *args, **kwargs: MockConnection())
-    return MockConnection()
+    yield MockConnection()
+    close_all_connections()
+
+
+@pytest.fixture
+def crs_duckdb(tmp_path):
+    """Create a small DuckDB database with the CRS fact table schema."""
+    import duckdb
+
+    from components.constants import COLUMN_TYPES, DatabaseTables
+    from utils.duckdb_connection import close_all_connections
+
+    db_path = str(tmp_path / "crs.duckdb")
+    # fmt: off
+    rows = [
+        # Year, donor, recipient, flow, category, subcategory, donor type, USD, mitigation, adaptation, biodiversity
+        (2020, "USA", "United States", "IND", "India", "ODA Grants", "Mitigation", "Solar-energy", "Donor Country", 10.0, 2.0, 0.0, 0.0),
+        (2020, "USA", "United States", "IND", "India", "ODA Grants", "Mitigation", "Solar-energy", "Donor Country", 5.0, 0.0, 0.0, None),
+        (2020, "USA", "United States", "BRA", "Brazil", "ODA Loans", "Adaptation", "Adaptation", "Donor Country", 7.5, 0.0, 1.0, 0.0),
+        (2020, "DEU", "Germany", "BRA", "Brazil", "ODA Grants", "Environment", "Biodiversity", "Donor Country", 3.0, 0.0, 0.0, 2.0),
+        (2021, "DEU", "Germany", "IND", "India", "ODA Grants", "Mitigation", "Wind-energy", "Donor Country", 4.0, 1.0, 0.0, 0.0),
+        (2021, "GBR", "United Kingdom", "IND", "India", "Private Development Finance", "Mitigation", "Wind-energy", "Private Donor", 8.0, None, None, None),
+    ]
+    columns = [
+        "Year", "DEDonorcode", "DonorName", "DERecipientcode", "RecipientName",
+        "FlowName", "meta_category", "climate_class", "DonorType",
+        "USD_Disbursement", "ClimateMitigation", "ClimateAdaptation", "Biodiversity",
+    ]
+    # fmt: on
+
+    con = duckdb.connect(db_path)
+    columns_sql = ", ".join(f"{col} {dtype}" for col, dtype in COLUMN_TYPES.items())
+    con.execute(f"CREATE TABLE {DatabaseTables.FACT} ({columns_sql})")
+    placeholders = ", ".join("?" for _ in columns)
+    con.executemany(
+        f"INSERT INTO {DatabaseTables.FACT} ({', '.join(columns)}) VALUES ({placeholders})",
+        rows,
+    )
+    con.close()
+
+    yield db_path
+
+    close_all_connections()
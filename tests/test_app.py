@@ -43,3 +43,83 @@ def test_app_config_with_env_vars(monkeypatch):
     assert config["debug"] is True
     assert config["host"] == "0.0.0.0"
     assert config["port"] == 5000
+
+
+def test_readiness_endpoint(monkeypatch, crs_duckdb):
+    """Test that the readiness endpoint waits for the warm-up and the database."""
+    import app as app_module
+    from utils import warmup
+
+    monkeypatch.setattr(warmup, "_warmed_up", False)
+    monkeypatch.setattr(warmup, "get_geojson_base", lambda level=None: {})
+    monkeypatch.setattr(warmup, "missing_geojson_levels", list)
+    monkeypatch.setattr(app_module, "QUERY_DATABASE", crs_duckdb)
+    client = app_module.create_app().server.test_client()
+
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").status_code == 200
+
+    warmup.warm_up(crs_duckdb)
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == "ready"
+
+    monkeypatch.setattr(app_module, "QUERY_DATABASE", crs_duckdb + ".missing")
+    assert client.get("/ready").status_code == 503
+
+
+def test_background_warm_up(monkeypatch, crs_duckdb):
+    """Test that the startup budget mode warms up without blocking startup."""
+    from components.constants import StartupSettings
+    from utils import warmup
+
+    monkeypatch.setattr(warmup, "_warmed_up", False)
+    monkeypatch.setattr(warmup, "get_geojson_base", lambda level=None: {})
+    monkeypatch.setattr(warmup, "missing_geojson_levels", list)
+    monkeypatch.setattr(StartupSettings, "BACKGROUND_WARMUP", True)
+
+    thread = warmup.start_warm_up(crs_duckdb)
+    thread.join(timeout=30)
+
+    assert warmup.check_readiness(crs_duckdb) == (True, "ready")
+
+    monkeypatch.setattr(StartupSettings, "BACKGROUND_WARMUP", False)
+    assert warmup.start_warm_up(crs_duckdb) is None
+
+
+def test_missing_geojson_levels_fall_back_to_remote_geojson(
+    monkeypatch, tmp_path, crs_duckdb, caplog
+):
+    """Test that unbuilt GeoJSON levels are reported and downloaded once."""
+    import requests
+
+    from components import constants
+    from components.map import get_countries_url
+    from utils import warmup
+
+    downloads = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"type": "FeatureCollection", "features": [{"id": "DEU"}]}
+
+    def get(url, timeout):
+        downloads.append(url)
+        return Response()
+
+    monkeypatch.setattr(constants.GeoJSONSettings, "DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(constants, "_geojson_cache", {})
+    monkeypatch.setattr(requests, "get", get)
+    monkeypatch.setattr(warmup, "_warmed_up", False)
+
+    warmup.warm_up(crs_duckdb)
+
+    assert downloads == [constants.GEOJSON_URL]
+    assert constants.get_geojson_base("low")["features"] == [{"id": "DEU"}]
+    assert "low, medium, high have not been built" in caplog.text
+    assert get_countries_url("low") == constants.GEOJSON_URL
+    assert warmup.check_readiness(crs_duckdb) == (True, "ready")
@@ -0,0 +1,40 @@
+"""Tests for the Arrow table helpers."""
+
+import pyarrow as pa
+
+from utils.arrow_tables import slice_sorted, sum_by
+
+
+def test_slice_sorted_shares_buffers():
+    """Test that the rows of a country are sliced without copying."""
+    table = pa.table(
+        {
+            "CountryCode": ["BRA", "IND", "IND", "USA"],
+            "USD_Disbursement": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+    india = slice_sorted(table, "CountryCode", "IND")
+    missing = slice_sorted(table, "CountryCode", "DEU")
+
+    assert india["USD_Disbursement"].to_pylist() == [2.0, 3.0]
+    amounts = india["USD_Disbursement"].chunk(0)
+    assert amounts.buffers()[1].address == (
+        table["USD_Disbursement"].chunk(0).buffers()[1].address
+    )
+    assert missing.num_rows == 0
+
+
+def test_sum_by_skips_missing_keys():
+    """Test that sums match a pandas groupby sum."""
+    table = pa.table(
+        {
+            "CountryCode": ["USA", "USA", "DEU", None],
+            "USD_Disbursement": [1.0, 2.5, None, 3.0],
+        }
+    )
+
+    assert sum_by(table, "CountryCode", "USD_Disbursement") == {
+        "USA": 3.5,
+        "DEU": 0.0,
+    }
@@ -0,0 +1,64 @@
+"""Tests for the background jobs running download queries."""
+
+from utils import background_jobs
+from utils.background_jobs import run_query_job
+from utils.frame_store import FrameStore
+from utils.query_duckdb import construct_query, query_duckdb, query_with_progress
+from utils.result_cache import make_filter_key, versioned_key
+
+
+def _download_query():
+    return construct_query(
+        year_type="timespan",
+        selected_year=[2020, 2021],
+        selected_categories=["Mitigation", "Adaptation", "Environment"],
+    )
+
+
+def test_query_with_progress_matches_query(crs_duckdb):
+    """Test that a query run with progress reports returns the plain result."""
+    progress = []
+
+    result = query_with_progress(
+        crs_duckdb, _download_query(), progress.append, poll_interval=0.01
+    )
+
+    expected = query_duckdb(crs_duckdb, _download_query(), result_format="arrow")
+    assert result.equals(expected)
+    assert progress[-1] == 100.0
+
+
+def test_identical_job_reuses_stored_result(crs_duckdb, tmp_path, monkeypatch):
+    """Test that a job with the same filters reuses the stored result."""
+    calls = []
+
+    def counting_query(duckdb_db, query, on_progress):
+        calls.append(query)
+        return query_with_progress(duckdb_db, query, on_progress)
+
+    monkeypatch.setattr(background_jobs, "query_with_progress", counting_query)
+    filter_key = make_filter_key("download", [2020, 2021], ["Mitigation"])
+    job_store = FrameStore(spill_dir=str(tmp_path))
+
+    key = run_query_job(
+        crs_duckdb,
+        _download_query(),
+        filter_key,
+        lambda progress: None,
+        drop_columns=["labelled_bilateral"],
+        store=job_store,
+    )
+    reused = run_query_job(
+        crs_duckdb,
+        _download_query(),
+        filter_key,
+        lambda progress: None,
+        store=job_store,
+    )
+
+    # the result is read from the spill directory by the other worker processes
+    table = FrameStore(spill_dir=str(tmp_path)).get(key)
+    assert reused == key == versioned_key(crs_duckdb, filter_key)
+    assert len(calls) == 1
+    assert table.num_rows == 6
+    assert "labelled_bilateral" not in table.column_names
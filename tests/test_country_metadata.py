@@ -0,0 +1,65 @@
+"""Tests for the precomputed country metadata."""
+
+import duckdb
+import pytest
+
+from utils import country_metadata
+from utils.country_metadata import (
+    UNKNOWN_FLAG,
+    CountryMetadata,
+    build_country_metadata,
+    create_country_table,
+    get_country_metadata,
+    load_country_metadata,
+)
+
+
+def test_codes_resolve_to_alpha2_flag_name_and_region():
+    """Test that ISO codes resolve and CRS pseudo-codes share one fallback."""
+    metadata = build_country_metadata(
+        {"DEU": None, "BOL": "Bolivia", "XKX": None, "998": "Bilateral, unspecified"}
+    )
+
+    assert metadata["DEU"] == CountryMetadata("DE", "🇩🇪", "Germany", "Europe")
+    assert metadata["BOL"].name == "Bolivia"
+    assert metadata["BOL"].region == "Americas"
+    assert metadata["XKX"].alpha_2 == "XK"
+    assert metadata["998"] == CountryMetadata(
+        None, UNKNOWN_FLAG, "Bilateral, unspecified", None
+    )
+
+
+def test_country_table_covers_data_and_map_codes(crs_duckdb):
+    """Test that the table holds every data and map code as frozen mapping."""
+    create_country_table(crs_duckdb, country_ids=["FRA"])
+
+    metadata = load_country_metadata(crs_duckdb)
+
+    assert set(metadata) == {"USA", "DEU", "GBR", "IND", "BRA", "FRA"}
+    assert metadata["IND"].flag == "🇮🇳"
+    assert load_country_metadata(crs_duckdb) is metadata
+    with pytest.raises(TypeError):
+        metadata["XXX"] = metadata["IND"]
+    assert get_country_metadata("XXX", crs_duckdb).flag == UNKNOWN_FLAG
+
+
+def test_failed_load_is_retried_after_interval(monkeypatch):
+    """Test that a failing database is not queried again on every lookup."""
+    attempts = []
+    now = [1000.0]
+
+    def failing_read(database):
+        attempts.append(database)
+        raise duckdb.IOException("database locked")
+
+    monkeypatch.setattr(country_metadata, "_read_country_metadata", failing_read)
+    monkeypatch.setattr(country_metadata, "_failed_at", {})
+    monkeypatch.setattr(country_metadata.time, "time", lambda: now[0])
+
+    assert get_country_metadata("DEU", "broken.duckdb").flag == UNKNOWN_FLAG
+    assert load_country_metadata("broken.duckdb") == {}
+    assert attempts == ["broken.duckdb"]
+
+    now[0] += country_metadata.METADATA_RETRY_INTERVAL
+    load_country_metadata("broken.duckdb")
+    assert attempts == ["broken.duckdb", "broken.duckdb"]
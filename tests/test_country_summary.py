@@ -0,0 +1,58 @@
+"""Tests for the per-country infobox index."""
+
+import pyarrow as pa
+
+from utils import country_summary
+from utils.country_summary import build_country_summaries, get_country_summaries
+from utils.frame_store import frame_store
+
+STORED = pa.table(
+    {
+        "CountryCode": ["DEU", "DEU", "DEU", "USA", "USA"],
+        "meta_category": [
+            "Adaptation",
+            "Mitigation",
+            "Mitigation",
+            "Environment",
+            "Adaptation",
+        ],
+        "USD_Disbursement": [1.004, 2.0, 3.0, 4.0, None],
+    }
+)
+MODE = pa.table(
+    {
+        "CountryCode": ["DEU", "DEU", "USA"],
+        "USD_Disbursement": [1.0, 5.0, None],
+    }
+)
+
+
+def test_summaries_sum_total_and_categories_per_country():
+    """Test that the index holds the rounded total and category sums."""
+    summaries = build_country_summaries(STORED, MODE)
+
+    assert summaries == {
+        "DEU": {"total": 6.0, "adaptation": 1.0, "environment": 0.0, "mitigation": 5.0},
+        "USA": {"total": 0.0, "adaptation": 0.0, "environment": 4.0, "mitigation": 0.0},
+    }
+    assert build_country_summaries(STORED, MODE.drop_columns("USD_Disbursement")) == {}
+
+
+def test_summaries_are_built_once_per_data_version(monkeypatch):
+    """Test that hovers reuse the index of the same stored and mode data."""
+    stored_key = frame_store.put(STORED)
+    mode_key = frame_store.put(MODE)
+    builds = []
+
+    def build(table_data, table_mode):
+        builds.append(table_mode)
+        return {"DEU": {"total": 1.0}}
+
+    monkeypatch.setattr(country_summary, "build_country_summaries", build)
+
+    first = get_country_summaries(stored_key, mode_key)
+    second = get_country_summaries(stored_key, mode_key)
+
+    assert first is second
+    assert len(builds) == 1
+    assert get_country_summaries(stored_key, None) == {}
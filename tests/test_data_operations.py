@@ -1,9 +1,16 @@
 """Tests for data operations module."""
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 
-from utils.data_operations import reshape_by_type
+from utils.data_operations import (
+    build_value_map,
+    create_mode_data,
+    query_mode_data,
+    reshape_by_type,
+)
+from utils.query_duckdb import construct_country_summary_query, query_duckdb
 
 
 def test_reshape_by_type_donors(sample_finance_data):
@@ -48,3 +55,104 @@ def test_reshape_by_type_invalid():
 
     with pytest.raises(ValueError, match="Invalid selected type"):
         reshape_by_type(df, "invalid_type")
+
+
+def _pandas_country_totals(db_path, map_mode, selected_type, categories):
+    """Compute per-country mode values with the pandas implementation."""
+    stored = reshape_by_type(
+        query_duckdb(db_path, construct_country_summary_query(2020, categories)),
+        selected_type,
+    )
+    df_mode = create_mode_data(stored, map_mode, categories)
+    return df_mode.groupby("CountryCode")["USD_Disbursement"].sum().to_dict()
+
+
+@pytest.mark.parametrize("map_mode", ["rio_oecd", "rio_climfinbert"])
+@pytest.mark.parametrize("selected_type", ["donors", "recipients"])
+def test_query_mode_data_matches_pandas(crs_duckdb, map_mode, selected_type):
+    """Test that the SQL map modes match the pandas implementation."""
+    categories = ["Mitigation", "Adaptation"]
+
+    result = query_mode_data(crs_duckdb, map_mode, selected_type, 2020, categories)
+
+    assert result["CountryCode"].is_unique
+    assert dict(zip(result["CountryCode"], result["USD_Disbursement"])) == (
+        _pandas_country_totals(crs_duckdb, map_mode, selected_type, categories)
+    )
+
+
+@pytest.mark.parametrize("selected_type", ["donors", "recipients"])
+def test_query_mode_data_difference_matches_pandas(crs_duckdb, selected_type):
+    """Test that the SQL difference mode matches the pandas implementation."""
+    categories = ["Mitigation", "Adaptation"]
+    columns = [
+        "CountryCode",
+        "USD_Disbursement_OECD",
+        "USD_Disbursement_ClimFinBERT",
+        "USD_Disbursement_diff",
+    ]
+
+    result = query_mode_data(crs_duckdb, "rio_diff", selected_type, 2020, categories)
+    stored = reshape_by_type(
+        query_duckdb(crs_duckdb, construct_country_summary_query(2020, categories)),
+        selected_type,
+    )
+    expected = create_mode_data(stored, "rio_diff", categories)
+
+    pd.testing.assert_frame_equal(
+        result[columns].sort_values("CountryCode", ignore_index=True),
+        expected[columns].sort_values("CountryCode", ignore_index=True),
+        check_dtype=False,
+    )
+
+
+def test_query_mode_data_as_arrow(crs_duckdb):
+    """Test that Arrow results hold the same values as DataFrame results."""
+    categories = ["Mitigation", "Adaptation"]
+
+    df = query_mode_data(crs_duckdb, "rio_oecd", "donors", 2020, categories)
+    table = query_mode_data(
+        crs_duckdb, "rio_oecd", "donors", 2020, categories, result_format="arrow"
+    )
+
+    summary = construct_country_summary_query(2020, categories)
+    stored = reshape_by_type(
+        query_duckdb(crs_duckdb, summary, result_format="arrow"), "donors"
+    )
+
+    assert isinstance(table, pa.Table)
+    assert build_value_map(table, "rio_oecd") == build_value_map(df, "rio_oecd")
+    pd.testing.assert_frame_equal(
+        stored.to_pandas(), reshape_by_type(query_duckdb(crs_duckdb, summary), "donors")
+    )
+
+
+def test_query_mode_data_difference(crs_duckdb):
+    """Test that the SQL difference mode compares both totals per country."""
+    result = query_mode_data(crs_duckdb, "rio_diff", "recipients", 2021, ["Mitigation"])
+
+    # India: 12.0 classified as mitigation, of which 4.0 carry the OECD marker
+    assert result["CountryCode"].tolist() == ["IND"]
+    assert result["USD_Disbursement_OECD"].iloc[0] == 4.0
+    assert result["USD_Disbursement_ClimFinBERT"].iloc[0] == 12.0
+    assert result["USD_Disbursement_diff"].iloc[0] == 8.0
+
+
+def test_query_mode_data_returns_none_on_error(tmp_path):
+    """Test that a failing query signals the pandas fallback."""
+    missing_db = str(tmp_path / "missing.duckdb")
+
+    assert query_mode_data(missing_db, "rio_oecd", "donors", 2020) is None
+
+
+def test_build_value_map_sums_per_country():
+    """Test that the map values hold one value per country code."""
+    df = pd.DataFrame(
+        {
+            "CountryCode": ["USA", "USA", "DEU"],
+            "USD_Disbursement": [1.0, 2.5, None],
+        }
+    )
+
+    assert build_value_map(df, "rio_climfinbert") == {"USA": 3.5, "DEU": 0.0}
+    assert build_value_map(df, "base") == {}
@@ -0,0 +1,141 @@
+"""Tests for the shared DuckDB connection manager."""
+
+import threading
+import time
+
+import duckdb
+import pytest
+
+from utils.duckdb_connection import (
+    DuckDBConnectionManager,
+    close_all_connections,
+    get_connection_manager,
+)
+
+
+@pytest.fixture
+def duckdb_file(tmp_path):
+    """Create a small DuckDB database file for testing."""
+    db_path = str(tmp_path / "test.duckdb")
+    con = duckdb.connect(db_path)
+    con.execute("CREATE TABLE my_table AS SELECT range AS Year FROM range(2000, 2005)")
+    con.close()
+
+    yield db_path
+
+    close_all_connections()
+
+
+def test_manager_is_shared_per_database(duckdb_file):
+    """Test that the same manager is returned for the same database."""
+    assert get_connection_manager(duckdb_file) is get_connection_manager(duckdb_file)
+
+
+def test_cursor_is_reused_within_thread(duckdb_file):
+    """Test that a thread keeps its cursor across calls."""
+    manager = DuckDBConnectionManager(duckdb_file)
+
+    assert manager.cursor() is manager.cursor()
+    assert manager.cursor().execute("SELECT COUNT(*) FROM my_table").fetchone() == (5,)
+
+    manager.close()
+
+
+def test_cursor_differs_between_threads(duckdb_file):
+    """Test that each thread receives its own cursor on the shared handle."""
+    manager = DuckDBConnectionManager(duckdb_file)
+    cursors = []
+
+    thread = threading.Thread(target=lambda: cursors.append(manager.cursor()))
+    thread.start()
+    thread.join()
+
+    assert cursors[0] is not manager.cursor()
+
+    manager.close()
+
+
+def test_connection_is_read_only(duckdb_file):
+    """Test that the shared connection rejects writes."""
+    manager = DuckDBConnectionManager(duckdb_file)
+
+    with pytest.raises(duckdb.Error):
+        manager.cursor().execute("DELETE FROM my_table")
+
+    manager.close()
+
+
+def test_settings_are_applied(duckdb_file):
+    """Test that thread and memory settings are passed to DuckDB."""
+    manager = DuckDBConnectionManager(duckdb_file, threads=2, memory_limit="256MB")
+
+    threads = manager.cursor().execute("SELECT current_setting('threads')").fetchone()
+
+    assert threads == (2,)
+
+    manager.close()
+
+
+def test_reconnect_after_reset(duckdb_file):
+    """Test that a reset connection is reopened on the next access."""
+    manager = DuckDBConnectionManager(duckdb_file)
+    first_cursor = manager.cursor()
+
+    manager.reset()
+
+    assert manager.is_healthy()
+    assert manager.cursor() is not first_cursor
+
+
+def test_concurrent_threads_run_one_health_check(duckdb_file, monkeypatch):
+    """Test that a due health check is run by a single thread only."""
+    manager = DuckDBConnectionManager(duckdb_file, health_check_interval=60)
+    manager.cursor()
+    checks = []
+    monkeypatch.setattr(
+        manager, "ensure_healthy", lambda: checks.append(1) or time.sleep(0.1)
+    )
+    manager._last_health_check = time.monotonic() - 61
+    barrier = threading.Barrier(8)
+
+    def use_cursor():
+        barrier.wait()
+        manager.cursor()
+
+    threads = [threading.Thread(target=use_cursor) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(checks) == 1
+
+    manager.close()
+
+
+def test_reset_keeps_cursors_of_other_threads_open(duckdb_file):
+    """Test that a reset connection is closed once no thread uses it anymore."""
+    manager = DuckDBConnectionManager(duckdb_file)
+    old_cursor = manager.cursor()
+    other = {}
+
+    def reset_and_query():
+        other["cursor"] = manager.cursor()
+        manager.reset()
+        other["count"] = manager.cursor().execute("SELECT COUNT(*) FROM my_table")
+
+    thread = threading.Thread(target=reset_and_query)
+    thread.start()
+    thread.join()
+
+    # the connection of the cursor held by this thread stays open after reset
+    assert old_cursor.execute("SELECT COUNT(*) FROM my_table").fetchone() == (5,)
+    assert other["count"].fetchone() == (5,)
+
+    # once this thread moves on as well, the old connection is closed
+    assert manager.cursor() is not old_cursor
+    assert manager._retired == {}
+    with pytest.raises(duckdb.ConnectionException):
+        old_cursor.execute("SELECT 1")
+
+    manager.close()
@@ -0,0 +1,180 @@
+"""Tests for the DuckDB database setup and the rollup table."""
+
+import duckdb
+import pandas as pd
+
+from components.constants import COLUMN_TYPES, DatabaseTables, FlowTypes
+from utils.duckdb_connection import close_all_connections
+from utils.duckdb_setup import (
+    create_rollup_table,
+    current_enum_values,
+    ingest_incremental,
+    is_source_ingested,
+    parquet_to_duckdb,
+    row_group_selectivity,
+)
+from utils.query_duckdb import (
+    construct_country_summary_query,
+    construct_query,
+    query_duckdb,
+    route_query,
+)
+
+SUMMARY_FILTERS = {
+    "selected_year": 2020,
+    "selected_categories": ["Mitigation", "Adaptation"],
+    "selected_donor_types": ["Donor Country"],
+    "selected_flow_types": ["ODA Grants", "ODA Loans"],
+}
+
+
+def test_summary_query_not_routed_without_rollup(crs_duckdb):
+    """Test that queries stay on the fact table if no rollup exists."""
+    query = construct_country_summary_query(**SUMMARY_FILTERS)
+
+    assert route_query(crs_duckdb, query).table == DatabaseTables.FACT
+
+
+def test_summary_query_routed_to_rollup(crs_duckdb):
+    """Test that the summary query is answered from the rollup table."""
+    query = construct_country_summary_query(**SUMMARY_FILTERS)
+    expected = query_duckdb(crs_duckdb, query)
+    close_all_connections()
+
+    create_rollup_table(crs_duckdb)
+    routed = route_query(crs_duckdb, query)
+    result = query_duckdb(crs_duckdb, query)
+
+    assert routed.table == DatabaseTables.ROLLUP
+    assert f"FROM {DatabaseTables.ROLLUP}" in routed.sql
+    sort_columns = ["DEDonorcode", "DERecipientcode", "climate_class"]
+    assert (
+        result.sort_values(sort_columns)
+        .reset_index(drop=True)
+        .equals(expected.sort_values(sort_columns).reset_index(drop=True))
+    )
+
+
+def test_select_all_query_not_routed(crs_duckdb):
+    """Test that queries needing columns outside the rollup are not routed."""
+    create_rollup_table(crs_duckdb)
+    query = construct_query(year_type="single_year", selected_year=2020)
+
+    assert route_query(crs_duckdb, query).table == DatabaseTables.FACT
+
+
+def _write_source(path, rows):
+    """Write CRS rows (year, donor, amount) as a Parquet source file."""
+    df = pd.DataFrame(
+        {col: [None] * len(rows) for col in COLUMN_TYPES}
+        | {
+            "Year": [year for year, _, _ in rows],
+            "DEDonorcode": [donor for _, donor, _ in rows],
+            "DonorName": [donor for _, donor, _ in rows],
+            "USD_Disbursement": [amount for _, _, amount in rows],
+        }
+    )
+    df.to_parquet(path)
+    return str(path)
+
+
+def _rollup(db_path):
+    con = duckdb.connect(db_path)
+    result = con.execute(
+        f"SELECT Year, DEDonorcode, USD_Disbursement FROM {DatabaseTables.ROLLUP} "
+        "ORDER BY Year, DEDonorcode"
+    ).fetchall()
+    con.close()
+    return result
+
+
+def test_incremental_ingest_reloads_only_changed_years(tmp_path):
+    """Test that reruns replace changed years instead of duplicating rows."""
+    db_path = str(tmp_path / "crs.duckdb")
+    rows = [(2020, "USA", 1.0), (2020, "DEU", 2.0), (2021, "USA", 3.0)]
+    parquet_to_duckdb(_write_source(tmp_path / "v1.parquet", rows), db_path)
+    create_rollup_table(db_path)
+
+    # unchanged source: nothing is reloaded
+    source = _write_source(tmp_path / "v1.parquet", rows)
+    assert ingest_incremental(source, db_path) == []
+
+    # revised 2021 and a new year 2022
+    rows = rows[:2] + [(2021, "USA", 4.0), (2022, "GBR", 5.0)]
+    years = ingest_incremental(_write_source(tmp_path / "v2.parquet", rows), db_path)
+
+    assert years == [2021, 2022]
+    assert _rollup(db_path) == [
+        (2020, "DEU", 2.0),
+        (2020, "USA", 1.0),
+        (2021, "USA", 4.0),
+        (2022, "GBR", 5.0),
+    ]
+
+
+def test_incremental_ingest_keeps_years_missing_from_source(tmp_path):
+    """Test that a source holding only the latest year appends it."""
+    db_path = str(tmp_path / "crs.duckdb")
+    source = _write_source(tmp_path / "all.parquet", [(2020, "USA", 1.0)])
+    parquet_to_duckdb(source, db_path, source=("all.csv", "v1"))
+    create_rollup_table(db_path)
+
+    latest = _write_source(tmp_path / "new.parquet", [(2021, "DEU", 2.0)])
+    ingest_incremental(latest, db_path, source=("all.csv", "v2"))
+
+    assert _rollup(db_path) == [(2020, "USA", 1.0), (2021, "DEU", 2.0)]
+    assert is_source_ingested(db_path, "all.csv", "v2")
+    assert not is_source_ingested(db_path, "all.csv", "v1")
+
+
+def test_enum_columns_widened_by_incremental_ingest(tmp_path):
+    """Test that new dimension values extend the ENUM columns of both tables."""
+    db_path = str(tmp_path / "crs.duckdb")
+    parquet_to_duckdb(
+        _write_source(tmp_path / "v1.parquet", [(2020, "USA", 1.0)]), db_path
+    )
+    create_rollup_table(db_path)
+
+    rows = [(2020, "USA", 1.0), (2021, "GBR", 2.0)]
+    ingest_incremental(_write_source(tmp_path / "v2.parquet", rows), db_path)
+
+    con = duckdb.connect(db_path)
+    fact = current_enum_values(con, DatabaseTables.FACT)
+    rollup = current_enum_values(con, DatabaseTables.ROLLUP)
+    donors = con.execute(
+        f"SELECT DonorName FROM {DatabaseTables.ROLLUP} ORDER BY Year"
+    ).fetchdf()
+    con.close()
+
+    assert fact["DonorName"] == rollup["DonorName"] == ["GBR", "USA"]
+    assert fact["FlowName"] == sorted(FlowTypes.TYPES)
+    assert isinstance(donors["DonorName"].dtype, pd.CategoricalDtype)
+    assert donors["DonorName"].tolist() == ["USA", "GBR"]
+
+
+def test_fact_table_clustered_by_year(tmp_path):
+    """Test that single-year filters only have to scan a few row groups."""
+    source = str(tmp_path / "shuffled.parquet")
+    con = duckdb.connect()
+    columns = ", ".join(
+        f"CAST(NULL AS {dtype}) AS {col}"
+        for col, dtype in COLUMN_TYPES.items()
+        if col not in ("Year", "DERecipientcode")
+    )
+    con.execute(f"""
+        COPY (
+            SELECT 2000 + i % 10 AS Year, 'R' || i % 50 AS DERecipientcode, {columns}
+            FROM range(600000) t(i)
+            ORDER BY random()
+        ) TO '{source}' (FORMAT parquet)
+    """)
+    con.close()
+    db_path = str(tmp_path / "crs.duckdb")
+
+    parquet_to_duckdb(source, db_path)
+    selectivity = row_group_selectivity(db_path, columns=["Year", "DERecipientcode"])
+
+    # each year holds 60000 rows and spans at most two of the row groups
+    assert selectivity["Year"] <= 0.4
+    # recipients are sorted within each year
+    assert selectivity["DERecipientcode"] < 1
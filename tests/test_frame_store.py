@@ -0,0 +1,148 @@
+"""Tests for the server-side frame store."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+import utils
+from utils import frame_store as frame_store_module
+from utils.frame_store import SPILL_SWEEP_INTERVAL, FrameStore
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"CountryCode": ["USA"] * rows, "value": range(rows)})
+
+
+def test_put_returns_key_and_get_frame_roundtrips(tmp_path):
+    """Test that a stored frame is returned unchanged under its key."""
+    store = FrameStore(spill_dir=str(tmp_path))
+    df = _frame(10)
+
+    key = store.put(df)
+
+    assert isinstance(key, str)
+    pd.testing.assert_frame_equal(store.get_frame(key), df)
+
+
+def test_unknown_key_returns_none(tmp_path):
+    """Test that unknown or missing keys yield None."""
+    store = FrameStore(spill_dir=str(tmp_path))
+
+    assert store.get_frame("unknown") is None
+    assert store.get_frame(None) is None
+    assert store.get_frame([]) is None
+
+
+def test_frames_expire_after_ttl(tmp_path):
+    """Test that frames are dropped once their TTL has passed."""
+    store = FrameStore(ttl_seconds=0, spill_dir=str(tmp_path))
+
+    key = store.put(_frame(10), persist=True)
+    time.sleep(0.01)
+
+    assert store.get(key) is None
+    assert store.current_bytes == 0
+
+
+def test_spilled_frames_expire_from_the_time_they_were_stored(tmp_path, monkeypatch):
+    """Test that spilling a frame does not extend its TTL."""
+    clock = [1000.0]
+    monkeypatch.setattr(frame_store_module.time, "time", lambda: clock[0])
+    store = FrameStore(
+        ttl_seconds=100, max_memory_bytes=1, spill_dir=str(tmp_path), shared=False
+    )
+
+    first = store.put(_frame(100))
+    clock[0] = 1090.0
+    store.put(_frame(200))
+
+    assert os.path.getmtime(tmp_path / f"{first}.arrow") == 1000.0
+    assert store.get(first) is not None
+    clock[0] = 1101.0
+    assert store.get(first) is None
+
+
+def test_spill_directory_is_swept_periodically(tmp_path, monkeypatch):
+    """Test that puts do not list the spill directory every time."""
+    clock = [1000.0]
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(frame_store_module.time, "time", lambda: clock[0])
+    monkeypatch.setattr(
+        frame_store_module.os,
+        "scandir",
+        lambda path: scans.append(path) or scandir(path),
+    )
+    store = FrameStore(ttl_seconds=10, spill_dir=str(tmp_path))
+
+    expired = store.put(_frame(10))
+    for _ in range(5):
+        store.put(_frame(10))
+    clock[0] += SPILL_SWEEP_INTERVAL
+    store.put(_frame(10))
+
+    assert len(scans) == 2
+    assert not os.path.exists(tmp_path / f"{expired}.arrow")
+
+
+def test_frames_over_budget_are_spilled_and_memory_mapped(tmp_path):
+    """Test that the least recently used frame moves to the spill directory."""
+    store = FrameStore(max_memory_bytes=1, spill_dir=str(tmp_path))
+
+    first = store.put(_frame(100))
+    second = store.put(_frame(200))
+
+    assert os.path.exists(tmp_path / f"{first}.arrow")
+    assert len(store._entries) == 1
+    pd.testing.assert_frame_equal(store.get_frame(first), _frame(100))
+    pd.testing.assert_frame_equal(store.get_frame(second), _frame(200))
+
+
+def test_persisted_frames_are_shared_between_stores(tmp_path):
+    """Test that persisted frames are readable by another process's store."""
+    writer = FrameStore(spill_dir=str(tmp_path))
+    reader = FrameStore(spill_dir=str(tmp_path))
+
+    key = writer.put(_frame(10), persist=True)
+
+    pd.testing.assert_frame_equal(reader.get_frame(key), _frame(10))
+
+
+def test_frames_are_found_by_other_worker_processes(tmp_path):
+    """Test that a frame stored by one worker process is read by another one."""
+    script = (
+        "import pandas as pd\n"
+        "from utils.frame_store import frame_store\n"
+        "print(frame_store.put(pd.DataFrame({'CountryCode': ['USA'], 'value': [1]})))"
+    )
+    src_dir = os.path.dirname(os.path.dirname(utils.__file__))
+    worker = subprocess.run(
+        [sys.executable, "-c", script],
+        env={
+            **os.environ,
+            "PYTHONPATH": src_dir,
+            "FRAME_STORE_SPILL_DIR": str(tmp_path),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    key = worker.stdout.strip()
+
+    table = FrameStore(spill_dir=str(tmp_path)).get(key)
+
+    assert table is not None
+    assert table.to_pydict() == {"CountryCode": ["USA"], "value": [1]}
+
+
+def test_unshared_frames_stay_in_memory(tmp_path):
+    """Test that a store that is not shared only writes frames over budget."""
+    store = FrameStore(spill_dir=str(tmp_path), shared=False)
+
+    key = store.put(_frame(10))
+
+    assert not os.path.exists(tmp_path / f"{key}.arrow")
+    assert FrameStore(spill_dir=str(tmp_path)).get(key) is None
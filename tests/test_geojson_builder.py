@@ -0,0 +1,78 @@
+"""Tests for the simplified GeoJSON builder."""
+
+import json
+
+from components.constants import GeoJSONSettings
+from utils.geojson_builder import build_levels, simplify_features, simplify_line
+
+
+def _feature(country_id: str, ring: list[list[float]]) -> dict:
+    return {
+        "type": "Feature",
+        "id": country_id,
+        "properties": {"name": country_id},
+        "geometry": {"type": "Polygon", "coordinates": [ring]},
+    }
+
+
+def _neighbours() -> dict:
+    """Two squares sharing a wiggly border along x = 1."""
+    border = [[1 + (0.001 if i % 2 else 0), i / 10] for i in range(11)]
+    west = [[0, 0]] + border + [[0, 1], [0, 0]]
+    east = border[::-1] + [[2, 0], [2, 1]]
+    east = [[1, 1]] + east[1:] + [[1, 1]]
+    return {
+        "type": "FeatureCollection",
+        "features": [_feature("WST", west), _feature("EST", east)],
+    }
+
+
+def test_simplify_line_keeps_endpoints_and_drops_small_deviations():
+    """Test that Douglas-Peucker removes points within the tolerance."""
+    line = [(0, 0), (1, 0.01), (2, -0.01), (3, 0)]
+
+    assert simplify_line(line, tolerance=0.1) == [(0, 0), (3, 0)]
+    assert simplify_line(line, tolerance=0.001) == line
+
+
+def test_shared_borders_stay_identical():
+    """Test that neighbouring countries keep exactly the same border."""
+    result = simplify_features(_neighbours(), tolerance=0.01, precision=4)
+
+    west, east = (f["geometry"]["coordinates"][0] for f in result["features"])
+    west_border = {tuple(p) for p in west if p[0] >= 1}
+    east_border = {tuple(p) for p in east if p[0] <= 1.001}
+
+    assert west_border == east_border
+    assert len(west) < 15
+
+
+def test_collapsed_countries_are_kept():
+    """Test that a country smaller than the tolerance does not disappear."""
+    tiny = [[5, 5], [5.001, 5], [5.001, 5.001], [5, 5.001], [5, 5]]
+    geojson = {"type": "FeatureCollection", "features": [_feature("TNY", tiny)]}
+
+    result = simplify_features(geojson, tolerance=1, precision=2)
+
+    assert result["features"][0]["geometry"]["coordinates"] == [tiny]
+
+
+def test_build_levels_writes_one_file_per_level(tmp_path):
+    """Test that every simplification level is written."""
+    source = tmp_path / "countries.geo.json"
+    source.write_text(json.dumps(_neighbours()))
+
+    written = build_levels(source=str(source), output_dir=str(tmp_path / "out"))
+
+    assert set(written) == set(GeoJSONSettings.LEVELS)
+    for path in written.values():
+        with open(path) as f:
+            assert len(json.load(f)["features"]) == 2
+
+
+def test_get_level_picks_smallest_adequate_level():
+    """Test that each zoom level maps to the coarsest sufficient level."""
+    assert GeoJSONSettings.get_level(2) == "low"
+    assert GeoJSONSettings.get_level(3) == "medium"
+    assert GeoJSONSettings.get_level(5) == "high"
+    assert GeoJSONSettings.get_level(None) == "high"
@@ -0,0 +1,45 @@
+"""Tests for the import time report."""
+
+from utils.import_profile import (
+    format_report,
+    parse_importtime,
+    profile_imports,
+    total_seconds,
+)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       300 |        300 |     numpy.core
+import time:       200 |        500 |   numpy
+import time:       100 |        600 | pandas
+import time:        50 |         50 | json
+"""
+
+
+def test_parse_and_report_import_times():
+    """Test that the report sums the own time of every package."""
+    entries = parse_importtime(IMPORTTIME.splitlines())
+
+    assert [(entry.module, entry.depth) for entry in entries] == [
+        ("numpy.core", 2),
+        ("numpy", 1),
+        ("pandas", 0),
+        ("json", 0),
+    ]
+    assert total_seconds(entries) == 0.00065
+
+    report = format_report(entries, top=2).splitlines()
+    assert report[0] == "Imported 4 modules in 0.001 seconds"
+    assert report[3:5] == ["       0.5 ms  numpy", "       0.1 ms  pandas"]
+    assert report[-2:] == ["       0.6 ms  pandas", "       0.5 ms  numpy"]
+
+
+def test_heavy_packages_are_not_imported_with_the_constants():
+    """Test that constants and map styling defer pandas, matplotlib and HTTP."""
+    modules = {
+        entry.module
+        for entry in profile_imports("components.constants, utils.map_styler")
+    }
+
+    assert "components.constants" in modules
+    assert not {"pandas", "matplotlib", "requests", "pycountry"} & modules
@@ -0,0 +1,109 @@
+"""Tests for the map styling helpers."""
+
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from components.widgets import color_mode
+from utils.map_styler import (
+    CLASSIFICATIONS,
+    VALUES_STYLE_HANDLER,
+    build_map_styling,
+    interpolate_colors,
+    style_map,
+)
+from utils.style_statistics import StyleStatistics, get_style_statistics
+
+
+def test_style_map_uses_value_range():
+    """Test that the continuous color range spans the map values."""
+    statistics = StyleStatistics([1.0, 4.0])
+    style_info = style_map("rio_oecd", "continuous", statistics)
+
+    assert style_info["min"] == 1.0
+    assert style_info["max"] == 4.0
+    assert style_info["style_handle"]["variable"].endswith(VALUES_STYLE_HANDLER)
+
+
+def test_countries_without_value_are_not_interactive():
+    """Test that the served style handler hides value-less countries entirely."""
+    path = os.path.join(
+        os.path.dirname(__file__), "..", "src", "assets", "dashExtensions_default.js"
+    )
+    with open(path, encoding="utf-8") as f:
+        handler = f.read().split(f"{VALUES_STYLE_HANDLER}:")[1]
+
+    assert "interactive: false" in handler
+
+
+def test_styling_covers_every_color_mode():
+    """Test that the styling holds the class breaks of every selectable mode."""
+    values = {"USA": 1.0, "DEU": 2.0, "IND": 3.0, "BRA": 4.0}
+
+    styling = build_map_styling("rio_oecd", StyleStatistics(values.values()))
+
+    assert (styling["min"], styling["max"]) == (1.0, 4.0)
+    assert set(styling["classifications"]) == {"quartile"}
+    quartile = styling["classifications"]["quartile"]
+    assert len(quartile["class_breaks"]) == 5
+    assert len(quartile["class_colors"]) == 4
+    assert build_map_styling("base")["classifications"] == {}
+
+
+def test_classifications_match_the_color_mode_selector():
+    """Test that exactly the selectable classified color modes are computed."""
+    options = color_mode._create_radio_items().options
+
+    assert {option["value"] for option in options} == {"continuous"} | set(
+        CLASSIFICATIONS
+    )
+
+
+def test_interpolated_colors_match_matplotlib():
+    """Test that class colors equal those of a matplotlib colormap."""
+    colorscale = ["#00BFFF", "#FFFF00", "#FF4500"]
+
+    assert interpolate_colors(colorscale, 4) == [
+        "#00bfff",
+        "#aaea55",
+        "#ffc100",
+        "#ff4500",
+    ]
+    assert interpolate_colors(colorscale, 5) == [
+        "#00bfff",
+        "#80df80",
+        "#ffff00",
+        "#ffa200",
+        "#ff4500",
+    ]
+    assert interpolate_colors(colorscale, 1) == ["#ff4500"]
+    assert interpolate_colors(colorscale, 3) == colorscale
+
+
+def test_breaks_use_one_quantile_call_for_any_class_count():
+    """Test that quantile breaks are computed in a single vectorised call."""
+    statistics = StyleStatistics(np.arange(101, dtype=float))
+
+    with patch("utils.style_statistics.np.quantile", wraps=np.quantile) as quantile:
+        deciles = statistics.breaks(10)
+        statistics.breaks(10)
+
+    assert quantile.call_count == 1
+    assert deciles == pytest.approx(list(range(0, 101, 10)))
+
+
+def test_jenks_breaks_separate_clusters():
+    """Test that natural breaks fall between clearly separated clusters."""
+    statistics = StyleStatistics([1, 2, 3, 50, 51, 52, 100, 101, 102])
+
+    assert statistics.breaks(3, "jenks") == [1.0, 3.0, 52.0, 102.0]
+
+
+def test_statistics_are_memoised_per_version():
+    """Test that the statistics are computed once per data version."""
+    first = get_style_statistics("key_rio_oecd", {"USA": 1.0, "DEU": 4.0})
+
+    assert get_style_statistics("key_rio_oecd", {}) is first
+    assert get_style_statistics("other_rio_oecd", {"USA": 2.0}).max == 2.0
@@ -0,0 +1,70 @@
+"""Tests for the partitioned Parquet dataset and its query backend."""
+
+import os
+
+import duckdb
+import pyarrow.parquet as pq
+import pytest
+
+from components.constants import DatabaseTables
+from utils.duckdb_connection import close_all_connections, get_connection_manager
+from utils.parquet_converter import convert_to_partitioned_parquet
+from utils.query_duckdb import construct_country_summary_query, query_duckdb
+
+
+@pytest.fixture
+def crs_parquet(crs_duckdb, tmp_path):
+    """Export the fact table of the test database to a Parquet file."""
+    parquet_path = str(tmp_path / "crs.parquet")
+    con = duckdb.connect(crs_duckdb, read_only=True)
+    con.execute(f"COPY {DatabaseTables.FACT} TO '{parquet_path}' (FORMAT parquet)")
+    con.close()
+    return parquet_path
+
+
+def test_dataset_partitioned_and_sorted(crs_parquet, tmp_path):
+    """Test that each year and donor type gets its own sorted partition."""
+    dataset_dir = str(tmp_path / "dataset")
+
+    files = convert_to_partitioned_parquet(
+        crs_parquet, dataset_dir, partition_by=("Year", "DonorType")
+    )
+
+    assert files == 3
+    assert sorted(os.listdir(dataset_dir)) == ["Year=2020", "Year=2021"]
+    assert sorted(os.listdir(os.path.join(dataset_dir, "Year=2021"))) == [
+        "DonorType=Donor%20Country",
+        "DonorType=Private%20Donor",
+    ]
+    partition = pq.read_table(
+        os.path.join(dataset_dir, "Year=2020", "DonorType=Donor%20Country")
+    )
+    donors = partition.column("DEDonorcode").to_pylist()
+    assert donors == sorted(donors)
+
+
+def test_dataset_backend_matches_database(crs_duckdb, crs_parquet, tmp_path):
+    """Test that the dataset answers queries like the database, with pruning."""
+    dataset_dir = str(tmp_path / "dataset")
+    convert_to_partitioned_parquet(crs_parquet, dataset_dir)
+    query = construct_country_summary_query(
+        selected_year=2020, selected_donor_types=["Donor Country"]
+    )
+    expected = query_duckdb(crs_duckdb, query)
+    close_all_connections()
+
+    result = query_duckdb(dataset_dir, query)
+    plan = (
+        get_connection_manager(dataset_dir)
+        .cursor()
+        .execute(f"EXPLAIN ANALYZE {query.sql}", query.params)
+        .fetchall()[0][1]
+    )
+
+    sort_columns = ["DEDonorcode", "DERecipientcode", "climate_class"]
+    assert (
+        result.sort_values(sort_columns)
+        .reset_index(drop=True)
+        .equals(expected.sort_values(sort_columns).reset_index(drop=True))
+    )
+    assert "Total Files Read: 1" in plan
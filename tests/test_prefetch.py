@@ -0,0 +1,89 @@
+"""Tests for the playback prefetcher."""
+
+import time
+
+from callbacks import data_callbacks
+from utils.duckdb_connection import get_connection_manager
+from utils.frame_store import FrameStore
+from utils.prefetch import PlaybackPrefetcher, upcoming_years
+from utils.style_statistics import _statistics, map_values_version
+
+SLOW_QUERY = "SELECT count(DISTINCT range % 1000003 * range) FROM range(500000000)"
+
+
+def _wait_until_idle(prefetcher, timeout=10.0):
+    deadline = time.time() + timeout
+    while prefetcher.active_runs() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_upcoming_years_loop_back_to_first_year():
+    """Test that the upcoming years follow playback, including the loop."""
+    assert upcoming_years(2010, 2000, 2021, 3) == [2011, 2012, 2013]
+    assert upcoming_years(2020, 2000, 2021, 3) == [2021, 2000, 2001]
+    assert upcoming_years(2000, 2000, 2001, 3) == [2001]
+
+
+def test_prefetcher_warms_queued_years_within_budget(crs_duckdb):
+    """Test that queued years are warmed in order until the budget is used up."""
+    prefetcher = PlaybackPrefetcher(crs_duckdb, max_bytes=25)
+    warmed = []
+
+    def warm(year):
+        warmed.append(year)
+        return 10
+
+    prefetcher.schedule("session", "filters", [2001, 2002, 2003, 2004], warm)
+    prefetcher.schedule("session", "filters", [2002, 2003, 2004, 2005], warm)
+    _wait_until_idle(prefetcher)
+
+    assert warmed == [2001, 2002, 2003]
+    assert prefetcher.active_runs() == 0
+
+
+def test_cancel_interrupts_running_prefetch(crs_duckdb):
+    """Test that stopping playback interrupts the query of the prefetch run."""
+    prefetcher = PlaybackPrefetcher(crs_duckdb)
+    warmed = []
+
+    def warm(year):
+        get_connection_manager(crs_duckdb).cursor().execute(SLOW_QUERY).fetchall()
+        warmed.append(year)
+        return 0
+
+    prefetcher.schedule("session", "filters", [2001, 2002], warm)
+    time.sleep(0.3)
+    start = time.time()
+    prefetcher.cancel("session")
+    _wait_until_idle(prefetcher)
+    time.sleep(0.1)
+
+    assert time.time() - start < 5
+    assert warmed == []
+
+
+def test_warm_year_prepares_callback_results(crs_duckdb, tmp_path, monkeypatch):
+    """Test that a warmed year is reused by the data callbacks."""
+    monkeypatch.setattr(data_callbacks, "QUERY_DATABASE", crs_duckdb)
+    monkeypatch.setattr(data_callbacks, "frame_store", FrameStore(spill_dir=None))
+    filters = (2020, None, ["Mitigation", "Adaptation"], None, None)
+
+    added = data_callbacks.warm_year("rio_oecd", "donors", *filters)
+
+    stored = data_callbacks.build_stored_data("donors", *filters)
+    mode = data_callbacks.build_mode_data("rio_oecd", stored, "donors", *filters)
+    assert added > 0
+    assert data_callbacks.warm_year("rio_oecd", "donors", *filters) == 0
+    assert stored == data_callbacks.stored_data_key("donors", *filters)
+    assert map_values_version(mode, "rio_oecd") in _statistics
+
+
+def test_warm_year_skips_tables_dropped_by_the_frame_store(crs_duckdb, monkeypatch):
+    """Test that warming does not fail if a built table is no longer stored."""
+    monkeypatch.setattr(data_callbacks, "QUERY_DATABASE", crs_duckdb)
+    monkeypatch.setattr(
+        data_callbacks, "frame_store", FrameStore(ttl_seconds=-1, spill_dir=None)
+    )
+    filters = (2020, None, ["Mitigation", "Adaptation"], None, None)
+
+    assert data_callbacks.warm_year("rio_oecd", "donors", *filters) == 0
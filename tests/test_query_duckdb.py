@@ -3,7 +3,14 @@
 import pytest
 
 from components.widgets.donor_type import DONOR_TYPE_MAP
-from utils.query_duckdb import ensure_list, format_value_list, validate_donor_types
+from utils.query_duckdb import (
+    construct_country_summary_query,
+    construct_query,
+    ensure_list,
+    execute_query,
+    format_value_list,
+    validate_donor_types,
+)
 
 
 def test_ensure_list_none():
@@ -49,3 +56,63 @@ def test_query_duckdb_connection(mock_duckdb_conn):
     assert len(result_df) > 0
     assert "DEDonorcode" in result_df.columns
     assert "DonorName" in result_df.columns
+
+
+def test_format_value_list_escapes_quotes():
+    """Test that format_value_list escapes embedded quotes."""
+    assert format_value_list(["Cote d'Ivoire"]) == "'Cote d''Ivoire'"
+
+
+def test_construct_query_binds_filter_values():
+    """Test that filter values are bound as parameters instead of inlined."""
+    query = construct_query(
+        year_type="timespan",
+        selected_year=(2018, 2020),
+        selected_categories=["Adaptation"],
+        selected_donor_types="Donor Country",
+    )
+
+    assert "Adaptation" not in query.sql
+    assert "Donor Country" not in query.sql
+    assert query.params == [2018, 2020, ["Adaptation"], ["Donor Country"]]
+
+
+def test_construct_query_template_is_stable():
+    """Test that filter selections of the same shape share one SQL template."""
+    first = construct_country_summary_query(2018, ["Adaptation"], ["Adaptation"])
+    second = construct_country_summary_query(
+        2020, ["Mitigation", "Environment"], ["Solar-energy"]
+    )
+
+    assert first.sql == second.sql
+    assert first.params != second.params
+
+
+def test_construct_query_invalid_year_type():
+    """Test that an invalid year type is rejected."""
+    with pytest.raises(ValueError, match="Invalid year_type"):
+        construct_query(year_type="decade", selected_year=2020)
+
+
+def test_parameterized_query_execution():
+    """Test that a parameterized query runs against DuckDB."""
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute(
+        "CREATE TABLE my_table AS SELECT * FROM (VALUES "
+        "(2020, 'Adaptation', 'Donor Country'), "
+        "(2020, 'Mitigation', 'Donor Country'), "
+        "(2021, 'Adaptation', 'Private Donor')) "
+        "t(Year, meta_category, DonorType)"
+    )
+    query = construct_query(
+        year_type="single_year",
+        selected_year=2020,
+        selected_categories=["Adaptation", "O'Brien"],
+        selected_donor_types=["Donor Country"],
+    )
+
+    result = execute_query(con, query).fetchall()
+
+    assert result == [(2020, "Adaptation", "Donor Country")]
@@ -0,0 +1,101 @@
+"""Tests for the cancellation of superseded queries."""
+
+import threading
+import time
+
+import duckdb
+import pytest
+
+from callbacks import data_callbacks
+from utils import data_operations
+from utils.duckdb_connection import get_connection_manager
+from utils.frame_store import FrameStore
+from utils.query_generations import QueryGenerations, SupersededQueryError
+
+SLOW_QUERY = "SELECT count(DISTINCT range % 1000003 * range) FROM range(500000000)"
+
+
+def test_newer_generation_interrupts_running_query(crs_duckdb):
+    """Test that a newer filter state interrupts the query of the older one."""
+    generations = QueryGenerations()
+    outcome = {}
+
+    def run_old():
+        start = time.time()
+        try:
+            generations.run_latest(
+                "session",
+                "stored-data",
+                crs_duckdb,
+                lambda: (
+                    get_connection_manager(crs_duckdb)
+                    .cursor()
+                    .execute(SLOW_QUERY)
+                    .fetchall()
+                ),
+            )
+        except SupersededQueryError as e:
+            outcome["error"] = e
+        outcome["seconds"] = time.time() - start
+
+    old = threading.Thread(target=run_old)
+    old.start()
+    while not generations._running:
+        time.sleep(0.01)
+    time.sleep(0.1)
+
+    result = generations.run_latest("session", "stored-data", crs_duckdb, lambda: 42)
+    old.join()
+
+    assert result == 42
+    assert isinstance(outcome["error"], SupersededQueryError)
+    assert outcome["seconds"] < 5
+    assert not generations._running
+
+
+def test_stale_result_dropped_per_session_and_channel(crs_duckdb):
+    """Test that only results of the newest generation are returned."""
+    generations = QueryGenerations()
+
+    def compute_while_superseded():
+        generations.begin("session", "stored-data")
+        return "stale"
+
+    with pytest.raises(SupersededQueryError):
+        generations.run_latest(
+            "session", "stored-data", crs_duckdb, compute_while_superseded
+        )
+
+    # other sessions, other channels and untracked requests are unaffected
+    assert generations.run_latest("other", "stored-data", crs_duckdb, lambda: 1) == 1
+    assert generations.run_latest("session", "mode-data", crs_duckdb, lambda: 2) == 2
+    assert generations.run_latest(None, "stored-data", crs_duckdb, lambda: 3) == 3
+
+
+def test_interrupted_mode_query_skips_pandas_fallback(crs_duckdb, monkeypatch):
+    """Test that an interrupted mode query is superseded, not recomputed."""
+    generations = QueryGenerations()
+    fallbacks = []
+
+    def interrupted_query(**kwargs):
+        raise duckdb.InterruptException("INTERRUPT Error: Interrupted!")
+
+    monkeypatch.setattr(data_callbacks, "QUERY_DATABASE", crs_duckdb)
+    monkeypatch.setattr(data_callbacks, "frame_store", FrameStore(spill_dir=None))
+    monkeypatch.setattr(data_operations, "query_duckdb", interrupted_query)
+    monkeypatch.setattr(
+        data_callbacks, "create_mode_data", lambda *args: fallbacks.append(args)
+    )
+    filters = (2020, None, ["Mitigation", "Adaptation"], None, None)
+    stored = data_callbacks.build_stored_data("donors", *filters)
+
+    with pytest.raises(SupersededQueryError):
+        generations.run_latest(
+            "session",
+            "mode-data",
+            crs_duckdb,
+            lambda: data_callbacks.build_mode_data(
+                "rio_oecd", stored, "donors", *filters
+            ),
+        )
+    assert fallbacks == []
@@ -0,0 +1,72 @@
+"""Tests for the query result cache."""
+
+import pandas as pd
+
+from utils.result_cache import ResultCache, estimate_size, make_filter_key
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"value": range(rows)})
+
+
+def test_make_filter_key_is_order_insensitive():
+    """Test that the same selection in another order yields the same key."""
+    first = make_filter_key(
+        "summary", 2020, ["Mitigation", "Adaptation"], None, "Donor Country", []
+    )
+    second = make_filter_key(
+        "summary", 2020, ["Adaptation", "Mitigation"], [], ["Donor Country"], None
+    )
+
+    assert first == second
+    assert first != make_filter_key("summary", 2021, ["Adaptation", "Mitigation"])
+
+
+def test_cache_counts_hits_and_misses():
+    """Test that the cache serves stored results and counts lookups."""
+    cache = ResultCache(max_bytes=10**6)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _frame(10)
+
+    cache.get_or_compute("key", "v1", compute)
+    cache.get_or_compute("key", "v1", compute)
+
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    """Test that the cache stays within its memory budget."""
+    size = estimate_size(_frame(100))
+    cache = ResultCache(max_bytes=2 * size)
+
+    cache.put("a", "v1", _frame(100))
+    cache.put("b", "v1", _frame(100))
+    cache.get("a", "v1")
+    cache.put("c", "v1", _frame(100))
+
+    assert cache.get("a", "v1") is not None
+    assert cache.get("b", "v1") is None
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_cache_skips_oversized_results():
+    """Test that results larger than the budget are not cached."""
+    cache = ResultCache(max_bytes=10)
+
+    cache.put("big", "v1", _frame(100))
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_invalidated_on_version_change():
+    """Test that a new data version empties the cache."""
+    cache = ResultCache(max_bytes=10**6)
+    cache.put("key", "v1", _frame(10))
+
+    assert cache.get("key", "v2") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,77 @@
+"""Tests for the timeline played in the browser."""
+
+import pyarrow as pa
+import pytest
+
+from utils.data_operations import build_value_map, query_mode_data
+from utils.timeline import build_timeline, query_timeline, timeline_value
+
+
+@pytest.mark.parametrize("map_mode", ["rio_oecd", "rio_climfinbert", "rio_diff"])
+def test_timeline_matches_values_of_each_year(crs_duckdb, map_mode):
+    """Test that the grouped query yields the map values of every single year."""
+    categories = ["Mitigation", "Adaptation"]
+    years = (2019, 2022)
+
+    table = query_timeline(crs_duckdb, map_mode, "recipients", years, categories)
+    timeline = build_timeline(table, map_mode, years)
+
+    assert timeline["years"] == [2019, 2020, 2021, 2022]
+    assert any(value is not None for row in timeline["values"] for value in row)
+    for year, row in zip(timeline["years"], timeline["values"]):
+        values = {
+            code: value
+            for code, value in zip(timeline["countries"], row)
+            if value is not None
+        }
+        mode_data = query_mode_data(
+            crs_duckdb, map_mode, "recipients", year, categories
+        )
+        assert values == build_value_map(mode_data, map_mode)
+
+
+def test_timeline_styles_each_year():
+    """Test that every year gets the value range of its own values."""
+    table = pa.table(
+        {
+            "Year": [2020, 2020, 2021],
+            "CountryCode": ["DEU", "USA", "USA"],
+            "value": [1.0, 3.0, 5.0],
+        }
+    )
+
+    timeline = build_timeline(table, "rio_oecd", (2020, 2022))
+
+    assert timeline["countries"] == ["DEU", "USA"]
+    assert timeline["values"] == [[1.0, 3.0], [None, 5.0], [None, None]]
+    assert [(f["min"], f["max"]) for f in timeline["frames"]] == [
+        (1.0, 3.0),
+        (5.0, 5.0),
+        (0, 1000),
+    ]
+    assert timeline["frames"][0]["classifications"]["quartile"]["class_breaks"] == [
+        1.0,
+        1.5,
+        2.0,
+        2.5,
+        3.0,
+    ]
+
+
+def test_timeline_value_of_played_year():
+    """Test that the value of a country is looked up in the played year."""
+    table = pa.table(
+        {
+            "Year": [2020, 2021],
+            "CountryCode": ["DEU", "USA"],
+            "value": [1.0, 5.0],
+        }
+    )
+    timeline = build_timeline(table, "rio_climfinbert", (2020, 2021))
+
+    assert timeline_value(timeline, 2020, "DEU") == 1.0
+    assert timeline_value(timeline, 2021, "USA") == 5.0
+    assert timeline_value(timeline, 2021, "DEU") is None
+    assert timeline_value(timeline, 2022, "USA") is None
+    assert timeline_value(timeline, 2020, "FRA") is None
+    assert timeline_value(None, 2020, "DEU") is None